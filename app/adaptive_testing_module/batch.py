@@ -0,0 +1,400 @@
+# app/ef_ads/batch.py
+
+"""
+Multi-session batched engine for EF-ADS.
+
+SessionBatch holds N sessions over one CompiledItemBank as arrays:
+- posteriors          : (N, M, G) theta posteriors (M modules, G grid points)
+- p_weak/p_strong/entropy, ability estimates, counts, RT sums : (N, M)
+- remaining           : (N, K) mask of items still available (K bank items)
+
+and applies the equivalent of process_response (Bayesian + RT update,
+stopping rules, module choice and entropy-based item selection) to all
+sessions in one vectorised call. Intended for Monte Carlo simulation, bulk
+re-scoring and server ticks that handle many sessions at once; single
+sessions keep using orchestration_engine.
+
+Items are kept in ascending id order, the same tie-break order as
+RemainingItems, so decisions match the per-session engine.
+"""
+
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import config
+from . import bayes_vec
+from .compiled_bank import CompiledItemBank
+from .state import ModuleStats, RemainingItems, SessionState
+
+NO_ITEM = -1
+
+# app/ef_ads/batch.py (append)
+
+
+class SessionBatch:
+    """
+    N adaptive sessions advanced in lock-step with array operations.
+    """
+
+    def __init__(
+        self,
+        num_sessions: int,
+        bank: CompiledItemBank,
+        module_item_ids: Optional[Dict[str, List[int]]] = None,
+        cfg: Optional[config.EngineConfig] = None,
+    ) -> None:
+        self.cfg = cfg = config.resolve(cfg)
+        if not bank.is_current(cfg):
+            raise ValueError("Item bank was compiled for a different theta grid or discrimination")
+        if cfg.rt_model:
+            raise ValueError("SessionBatch does not support the joint RT model (cfg.rt_model)")
+        if cfg.joint_theta_posterior:
+            raise ValueError(
+                "SessionBatch does not support the joint module posterior (cfg.joint_theta_posterior)"
+            )
+        self.bank = bank
+        self.modules: List[str] = list(cfg.modules)
+        n, m, g = num_sessions, len(self.modules), len(cfg.theta_nodes)
+
+        # Columns in ascending item id order (selection tie-break order)
+        order = np.argsort(bank.item_ids, kind="stable")
+        self.item_ids = bank.item_ids[order]
+        self.p_correct = bank.p_correct[order]
+        module_pos = {module_id: i for i, module_id in enumerate(self.modules)}
+        self.item_module = np.array(
+            [module_pos.get(bank.module_ids[row], -1) for row in order], dtype=np.int64
+        )
+        self.max_time = np.array(
+            [bank[int(item_id)].max_time_seconds for item_id in self.item_ids], dtype=np.float64
+        )
+        self._column = {int(item_id): col for col, item_id in enumerate(self.item_ids)}
+
+        # Items available per module (defaults to every bank item of the module)
+        available = np.zeros(len(self.item_ids), dtype=bool)
+        if module_item_ids is None:
+            available[:] = self.item_module >= 0
+        else:
+            for module_id, ids in module_item_ids.items():
+                if module_id not in module_pos:
+                    continue
+                for item_id in ids:
+                    col = self._column.get(item_id)
+                    if col is not None and self.item_module[col] == module_pos[module_id]:
+                        available[col] = True
+
+        self.posteriors = np.tile(np.asarray(cfg.theta_prior, dtype=np.float64), (n, m, 1))
+        self.p_weak = np.full((n, m), 0.5)
+        self.p_strong = np.full((n, m), 0.5)
+        self.entropy = np.ones((n, m))
+        prior_estimates = bayes_vec.theta_estimates(cfg.theta_prior, cfg)
+        self.theta_eap = np.full((n, m), prior_estimates.eap)
+        self.theta_map = np.full((n, m), prior_estimates.map)
+        self.theta_sd = np.full((n, m), prior_estimates.sd)
+        self.num_items = np.zeros((n, m), dtype=np.int64)
+        self.correct = np.zeros((n, m), dtype=np.int64)
+        self.slow_correct = np.zeros((n, m), dtype=np.int64)
+        self.rapid_guess = np.zeros((n, m), dtype=np.int64)
+        self.sum_rt = np.zeros((n, m))
+        self.remaining = np.tile(available, (n, 1))
+        self.total_time_seconds = np.zeros(n)
+        self.current_module_index = np.zeros(n, dtype=np.int64)
+        self.stopped = np.zeros(n, dtype=bool)
+
+        # Base gains for the current posteriors (see base_gains)
+        self._gains: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.posteriors.shape[0]
+
+    # ---- Helpers ----------------------------------------------------------
+
+    def columns(self, item_ids: np.ndarray) -> np.ndarray:
+        """
+        Map item ids (NO_ITEM allowed) to internal column indices (-1).
+        """
+        return np.array(
+            [self._column.get(int(i), -1) if i != NO_ITEM else -1 for i in item_ids],
+            dtype=np.int64,
+        )
+
+    def settled(self) -> np.ndarray:
+        """
+        (N, M) mask equivalent to stopping.is_module_settled.
+        """
+        return (
+            (self.num_items >= self.cfg.min_items_per_module)
+            & (self.entropy <= self.cfg.entropy_threshold)
+            & (np.maximum(self.p_weak, self.p_strong) >= self.cfg.p_confident)
+        )
+
+    def base_gains(self) -> np.ndarray:
+        """
+        (N, K) base information gain of every bank item for every session,
+        under the posterior of the item's module (0 for unknown modules).
+        Cached until the next apply_responses.
+        """
+        if self._gains is not None:
+            return self._gains
+
+        n = len(self)
+        valid = self.item_module >= 0
+        module_idx = np.where(valid, self.item_module, 0)
+
+        priors = self.posteriors[:, module_idx, :]                 # (N, K, G)
+        p_c_rows = self.p_correct[np.newaxis, :, :]               # (1, K, G)
+
+        p_correct = np.minimum(np.maximum(np.sum(priors * p_c_rows, axis=-1), 0.0), 1.0)
+        p_incorrect = 1.0 - p_correct
+
+        posteriors = bayes_vec.normalise(
+            priors[np.newaxis] * np.stack([p_c_rows, 1.0 - p_c_rows])
+        )                                                          # (2, N, K, G)
+        p_weak, p_strong = bayes_vec.derive_weak_strong_probs(posteriors, self.cfg)
+        h_correct, h_incorrect = bayes_vec.entropy_weak_strong(p_weak, p_strong)
+
+        expected = p_correct * h_correct + p_incorrect * h_incorrect
+        degenerate = (p_correct < 1e-12) | (p_incorrect < 1e-12)
+        expected = np.where(
+            degenerate,
+            np.where(p_correct >= p_incorrect, h_correct, h_incorrect),
+            expected,
+        )
+
+        current = self.entropy[np.arange(n)[:, np.newaxis], module_idx[np.newaxis, :]]
+        gains = np.maximum(0.0, current - expected)
+        self._gains = np.where(valid[np.newaxis, :], gains, 0.0)
+        return self._gains
+
+    def fatigue_factors(self) -> np.ndarray:
+        """
+        Vectorised rt_fatigue.compute_fatigue_factor.
+        """
+        raw = 1.0 - self.cfg.fatigue_slope * (self.total_time_seconds / 60.0)
+        return np.maximum(self.cfg.min_fatigue_factor, np.minimum(1.0, raw))
+
+    # ---- Engine steps -----------------------------------------------------
+
+    def apply_responses(
+        self,
+        item_ids: np.ndarray,
+        is_correct: np.ndarray,
+        rt_seconds: np.ndarray,
+        elapsed_seconds: np.ndarray,
+        p_correct: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Steps 1-4 of process_response for every session that answered an
+        item (item id NO_ITEM = no response this tick): time, posterior,
+        RT statistics and removal from the remaining items.
+
+        p_correct, if given, is an (N, G) matrix of P(correct | theta) for
+        the answered items, used instead of their rows in the bank (e.g. an
+        item replayed under the difficulty it was answered at).
+        """
+        cols = self.columns(np.asarray(item_ids))
+        active = (cols >= 0) & ~self.stopped
+        if not np.any(active):
+            return
+
+        rows = np.nonzero(active)[0]
+        cols = cols[rows]
+        mods = self.item_module[cols]
+        correct = np.asarray(is_correct, dtype=bool)[rows]
+        rts = np.asarray(rt_seconds, dtype=np.float64)[rows]
+
+        self.total_time_seconds[rows] = np.maximum(
+            0.0, np.asarray(elapsed_seconds, dtype=np.float64)[rows]
+        )
+
+        # Bayesian update of the answered module only
+        p_c = self.p_correct[cols] if p_correct is None else np.asarray(p_correct, dtype=np.float64)[rows]
+        likelihood = np.where(correct[:, np.newaxis], p_c, 1.0 - p_c)
+        posterior = bayes_vec.normalise(self.posteriors[rows, mods] * likelihood)
+        self.posteriors[rows, mods] = posterior
+        p_weak, p_strong = bayes_vec.derive_weak_strong_probs(posterior, self.cfg)
+        self.p_weak[rows, mods] = p_weak
+        self.p_strong[rows, mods] = p_strong
+        self.entropy[rows, mods] = bayes_vec.entropy_weak_strong(p_weak, p_strong)
+        estimates = bayes_vec.theta_estimates(posterior, self.cfg)
+        self.theta_eap[rows, mods] = estimates.eap
+        self.theta_map[rows, mods] = estimates.map
+        self.theta_sd[rows, mods] = estimates.sd
+        self.num_items[rows, mods] += 1
+
+        # RT statistics (rt_fatigue.update_module_rt_stats)
+        max_time = self.max_time[cols]
+        has_limit = max_time > 0
+        slow = correct & has_limit & (rts > self.cfg.slow_rt_factor * max_time)
+        rapid = ~correct & has_limit & (rts < self.cfg.rapid_guess_fraction * max_time)
+        # (correct is counted by both bayes and rt_fatigue in process_response)
+        self.sum_rt[rows, mods] += rts
+        self.correct[rows, mods] += 2 * correct
+        self.slow_correct[rows, mods] += slow
+        self.rapid_guess[rows, mods] += rapid
+
+        self.remaining[rows, cols] = False
+        self._gains = None
+
+    def should_stop(self) -> np.ndarray:
+        """
+        (N,) vectorised stopping.should_stop_globally.
+        """
+        stop = self.num_items.sum(axis=1) >= self.cfg.max_items_total
+        stop |= self.total_time_seconds / 60.0 >= self.cfg.max_test_time_min
+
+        settled = self.settled()
+        if "phonemic_awareness" in self.modules and "ran" in self.modules:
+            pa = self.modules.index("phonemic_awareness")
+            ran = self.modules.index("ran")
+            stop |= settled[:, pa] & settled[:, ran]
+
+        undecided = ~stop & ~self.stopped
+        if np.any(undecided):
+            gains = self.base_gains()
+            valid = self.item_module >= 0
+            module_idx = np.where(valid, self.item_module, 0)
+            unsettled_item = ~settled[:, module_idx] & valid[np.newaxis, :]
+            usable = self.remaining & unsettled_item
+            max_gain = np.where(usable, gains, 0.0).max(axis=1, initial=0.0)
+            stop |= undecided & (max_gain < self.cfg.min_info_gain)
+
+        return stop
+
+    def choose_next_modules(self, active: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        (N,) vectorised orchestration_engine.choose_next_module; -1 = none.
+
+        Only sessions in `active` (default: all) are considered; for those
+        where a module is found, current_module_index is updated.
+        """
+        n, m = len(self), len(self.modules)
+        if active is None:
+            active = np.ones(n, dtype=bool)
+
+        settled = self.settled()
+        has_items = np.zeros((n, m), dtype=bool)
+        for idx in range(m):
+            has_items[:, idx] = (self.remaining & (self.item_module == idx)).any(axis=1)
+        open_modules = ~settled & has_items
+
+        chosen = np.full(n, -1, dtype=np.int64)
+        rows = np.arange(n)
+        for offset in range(m):
+            idx = (self.current_module_index + offset) % m
+            hit = active & (chosen < 0) & open_modules[rows, idx]
+            chosen[hit] = idx[hit]
+
+        found = chosen >= 0
+        self.current_module_index[found] = chosen[found]
+        return chosen
+
+    def select_next_items(self, modules: np.ndarray) -> np.ndarray:
+        """
+        (N,) vectorised selection.select_next_item_for_module for the given
+        module per session; returns item ids or NO_ITEM.
+        """
+        gains = self.base_gains() * self.fatigue_factors()[:, np.newaxis]
+        candidate = (
+            self.remaining
+            & (self.item_module[np.newaxis, :] == modules[:, np.newaxis])
+            & (modules[:, np.newaxis] >= 0)
+        )
+        eligible = candidate & (gains >= self.cfg.min_info_gain) & (gains > 0.0)
+
+        best = np.argmax(np.where(eligible, gains, -np.inf), axis=1)
+        any_eligible = eligible.any(axis=1)
+        return np.where(any_eligible, self.item_ids[best], NO_ITEM)
+
+    def start(self) -> np.ndarray:
+        """
+        Vectorised start_new_test: first item id per session (or NO_ITEM).
+        """
+        self.current_module_index[:] = 0
+        first_items = self.select_next_items(self.choose_next_modules())
+        self.stopped |= first_items == NO_ITEM
+        return first_items
+
+    def step(
+        self,
+        item_ids: np.ndarray,
+        is_correct: np.ndarray,
+        rt_seconds: np.ndarray,
+        elapsed_seconds: np.ndarray,
+    ) -> np.ndarray:
+        """
+        Vectorised process_response for all sessions.
+
+        Parameters
+        ----------
+        item_ids        : (N,) answered item id per session (NO_ITEM = none)
+        is_correct      : (N,) correctness
+        rt_seconds      : (N,) response times
+        elapsed_seconds : (N,) time since each session started
+
+        Returns
+        -------
+        (N,) next item id per session; NO_ITEM for sessions that did not
+        answer, or that stop on this step (self.stopped is then set).
+        """
+        item_ids = np.asarray(item_ids)
+        answered = (self.columns(item_ids) >= 0) & ~self.stopped
+        self.apply_responses(item_ids, is_correct, rt_seconds, elapsed_seconds)
+
+        stop = answered & self.should_stop()
+        modules = self.choose_next_modules(active=answered & ~stop)
+        stop |= answered & (modules < 0)
+
+        next_items = np.full(len(self), NO_ITEM, dtype=np.int64)
+        proceed = answered & ~stop
+        if np.any(proceed):
+            picked = self.select_next_items(np.where(proceed, modules, -1))
+            next_items = np.where(proceed, picked, NO_ITEM)
+            stop |= proceed & (picked == NO_ITEM)
+
+        self.stopped |= stop
+        return next_items
+
+    # ---- Interop ----------------------------------------------------------
+
+    def to_session_state(
+        self,
+        index: int,
+        test_id: int = 0,
+        started_at: Optional[datetime] = None,
+    ) -> SessionState:
+        """
+        Materialise one session as a SessionState (e.g. for
+        risk.compute_global_risk or persistence).
+        """
+        started_at = started_at or datetime.utcnow()
+        modules: Dict[str, ModuleStats] = {}
+        for m, module_id in enumerate(self.modules):
+            cols = self.remaining[index] & (self.item_module == m)
+            modules[module_id] = ModuleStats(
+                theta_posterior=self.posteriors[index, m].copy(),
+                p_weak=float(self.p_weak[index, m]),
+                p_strong=float(self.p_strong[index, m]),
+                entropy=float(self.entropy[index, m]),
+                theta_eap=float(self.theta_eap[index, m]),
+                theta_map=float(self.theta_map[index, m]),
+                theta_sd=float(self.theta_sd[index, m]),
+                num_items=int(self.num_items[index, m]),
+                items_remaining=RemainingItems(int(i) for i in self.item_ids[cols]),
+                sum_rt=float(self.sum_rt[index, m]),
+                slow_correct=int(self.slow_correct[index, m]),
+                correct=int(self.correct[index, m]),
+                rapid_guess=int(self.rapid_guess[index, m]),
+            )
+
+        return SessionState(
+            test_id=test_id,
+            started_at=started_at,
+            last_update_at=started_at + timedelta(seconds=float(self.total_time_seconds[index])),
+            total_time_seconds=float(self.total_time_seconds[index]),
+            current_module_index=int(self.current_module_index[index]),
+            stopped=bool(self.stopped[index]),
+            modules=modules,
+        )
@@ -4,31 +4,36 @@
 Bayesian ability estimation for EF-ADS.
 
 - Maintains posterior over a discrete theta grid per module.
-- Uses a 2PL-like item response model:
-    P(correct | theta, a, b) = 1 / (1 + exp(-a * (theta - b))).
+- Uses a 2PL-like item response model (3PL with an item guessing parameter c):
+    P(correct | theta, a, b, c) = c + (1 - c) / (1 + exp(-a * (theta - b))).
+  a is the item's own discrimination, or the module's
+  config.ITEM_DISCRIMINATION when the item has none; c defaults to 0.
 - Updates posterior after each item response.
 - Derives weak/strong probabilities and entropy from the posterior.
 """
 
 from __future__ import annotations
-from math import exp, log2
-from typing import List, Dict
+from bisect import insort
+from math import exp, log2, sqrt
+from typing import List, Dict, Optional, Tuple
 
 from . import config
+from . import bayes_vec
 
 from .state import ModuleStats
 
 # app/ef_ads/bayes.py (append)
 
-def prob_correct(theta: float, a: float, b: float) -> float:
+def prob_correct(theta: float, a: float, b: float, c: float = 0.0) -> float:
     """
-    2PL-like item response function.
+    2PL-like item response function (3PL when c > 0).
 
     Parameters
     ----------
     theta : latent ability
     a     : discrimination parameter
     b     : item difficulty parameter
+    c     : guessing parameter (lower asymptote)
 
     Returns
     -------
@@ -36,7 +41,7 @@ def prob_correct(theta: float, a: float, b: float) -> float:
     """
     # Avoid overflow in exp by clamping the exponent if necessary (later if needed)
     exponent = -a * (theta - b)
-    return 1.0 / (1.0 + exp(exponent))
+    return c + (1.0 - c) / (1.0 + exp(exponent))
 
 # app/ef_ads/bayes.py (append)
 
@@ -45,30 +50,37 @@ def update_theta_posterior_for_item(
     module_id: str,
     item_difficulty: float,
     is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
+    discrimination: Optional[float] = None,
+    guessing: float = 0.0,
 ) -> List[float]:
     """
     Update the posterior over theta for a single item response in a given module.
 
     Parameters
     ----------
-    theta_posterior : current posterior over config.THETA_GRID
+    theta_posterior : current posterior over the theta grid
     module_id       : module identifier (e.g. "phonemic_awareness")
     item_difficulty : item difficulty parameter b_j
     is_correct      : True if response correct, False otherwise
+    cfg             : engine configuration (default: config.default_config())
+    discrimination  : item discrimination a_j (default: the module's)
+    guessing        : item guessing parameter c_j
 
     Returns
     -------
     new_theta_posterior : updated, normalised posterior
     """
-    a = config.ITEM_DISCRIMINATION.get(module_id, 1.0)
-    theta_grid = config.THETA_GRID
+    cfg = config.resolve(cfg)
+    a = cfg.discrimination(module_id) if discrimination is None else discrimination
+    theta_grid = cfg.theta_nodes
 
     new_posterior: List[float] = []
     total = 0.0
 
     # Compute unnormalised posterior
     for p_prior, theta in zip(theta_posterior, theta_grid):
-        p_c = prob_correct(theta, a, item_difficulty)
+        p_c = prob_correct(theta, a, item_difficulty, guessing)
         likelihood = p_c if is_correct else (1.0 - p_c)
         posterior_val = p_prior * likelihood
         new_posterior.append(posterior_val)
@@ -76,9 +88,8 @@ def update_theta_posterior_for_item(
 
     # Handle edge case: total ~ 0 (e.g. numerical underflow)
     if total <= 0.0:
-        # Fall back to uniform prior to avoid degenerate state
-        num = len(theta_grid)
-        return [1.0 / num] * num
+        # Fall back to the (uniform) prior to avoid degenerate state
+        return list(cfg.theta_prior)
 
     # Normalise
     new_posterior = [p / total for p in new_posterior]
@@ -86,7 +97,10 @@ def update_theta_posterior_for_item(
 
 # app/ef_ads/bayes.py (append)
 
-def derive_weak_strong_probs(theta_posterior: List[float]) -> Dict[str, float]:
+def derive_weak_strong_probs(
+    theta_posterior: List[float],
+    cfg: Optional[config.EngineConfig] = None,
+) -> Dict[str, float]:
     """
     Derive weak/strong probabilities from a theta posterior by thresholding.
 
@@ -97,8 +111,9 @@ def derive_weak_strong_probs(theta_posterior: List[float]) -> Dict[str, float]:
         "p_strong": float,
     }
     """
-    threshold = config.THETA_WEAK_THRESHOLD
-    theta_grid = config.THETA_GRID
+    cfg = config.resolve(cfg)
+    threshold = cfg.theta_weak_threshold
+    theta_grid = cfg.theta_nodes
 
     p_weak = 0.0
     p_strong = 0.0
@@ -157,42 +172,255 @@ def entropy_weak_strong(p_weak: float, p_strong: float) -> float:
 
 # app/ef_ads/bayes.py (append)
 
+def theta_estimates(
+    theta_posterior: List[float],
+    cfg: Optional[config.EngineConfig] = None,
+) -> bayes_vec.ThetaEstimates:
+    """
+    Ability point estimates of a normalised theta posterior.
+
+    Returns
+    -------
+    ThetaEstimates(eap, map, sd): posterior mean, most probable grid point
+    (lowest on ties) and posterior standard deviation.
+    """
+    cfg = config.resolve(cfg)
+
+    mean = 0.0
+    second = 0.0
+    theta_map, p_map = cfg.theta_nodes[0], -1.0
+    for theta, p in zip(cfg.theta_nodes, theta_posterior):
+        mean += p * theta
+        second += p * theta * theta
+        if p > p_map:
+            theta_map, p_map = theta, p
+
+    return bayes_vec.ThetaEstimates(mean, theta_map, sqrt(max(second - mean * mean, 0.0)))
+
+# app/ef_ads/bayes.py (append)
+
+_WEAK_FLAGS_CACHE: Dict[Tuple, Tuple[bool, ...]] = {}
+
+
+def _weak_flags(cfg: config.EngineConfig) -> Tuple[bool, ...]:
+    """
+    Per grid point: theta < theta_weak_threshold (cached per grid/threshold).
+    """
+    key = (cfg.theta_nodes, cfg.theta_weak_threshold)
+    flags = _WEAK_FLAGS_CACHE.get(key)
+    if flags is None:
+        flags = tuple(theta < cfg.theta_weak_threshold for theta in cfg.theta_nodes)
+        _WEAK_FLAGS_CACHE[key] = flags
+    return flags
+
+
+def update_and_summarise(
+    theta_posterior: List[float],
+    module_id: str,
+    item_difficulty: float,
+    is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
+    discrimination: Optional[float] = None,
+    guessing: float = 0.0,
+) -> bayes_vec.PosteriorSummary:
+    """
+    Fused update_theta_posterior_for_item + derive_weak_strong_probs +
+    entropy_weak_strong.
+
+    One pass over the grid accumulates the unnormalised posterior, its
+    total and its weak mass; the weak/strong split then needs no second
+    walk and no intermediate dict.
+
+    Returns
+    -------
+    PosteriorSummary(posterior, p_weak, p_strong, entropy, reset)
+    """
+    cfg = config.resolve(cfg)
+    a = cfg.discrimination(module_id) if discrimination is None else discrimination
+
+    unnormalised: List[float] = []
+    total = 0.0
+    weak = 0.0
+    for p_prior, theta, is_weak in zip(theta_posterior, cfg.theta_nodes, _weak_flags(cfg)):
+        p_c = prob_correct(theta, a, item_difficulty, guessing)
+        value = p_prior * (p_c if is_correct else (1.0 - p_c))
+        unnormalised.append(value)
+        total += value
+        if is_weak:
+            weak += value
+
+    if total <= 0.0:
+        # Same prior fallback as update_theta_posterior_for_item
+        posterior = list(cfg.theta_prior)
+        ws = derive_weak_strong_probs(posterior, cfg)
+        p_weak, p_strong = ws["p_weak"], ws["p_strong"]
+    else:
+        posterior = [value / total for value in unnormalised]
+        p_weak = weak / total
+        p_strong = (total - weak) / total
+
+    return bayes_vec.PosteriorSummary(
+        posterior, p_weak, p_strong, entropy_weak_strong(p_weak, p_strong), total <= 0.0
+    )
+
+
+def outcome_entropies(
+    theta_posterior: List[float],
+    module_id: str,
+    item_difficulty: float,
+    cfg: Optional[config.EngineConfig] = None,
+    discrimination: Optional[float] = None,
+    guessing: float = 0.0,
+) -> Tuple[float, float, float]:
+    """
+    Both hypothetical outcomes of an item in one pass over the grid.
+
+    Only the total and weak mass of each outcome's unnormalised posterior
+    are needed for its weak/strong entropy, so neither posterior is built.
+
+    Returns
+    -------
+    (p_correct, H_correct, H_incorrect)
+    """
+    cfg = config.resolve(cfg)
+    a = cfg.discrimination(module_id) if discrimination is None else discrimination
+
+    total_c = weak_c = total_i = weak_i = 0.0
+    for p_prior, theta, is_weak in zip(theta_posterior, cfg.theta_nodes, _weak_flags(cfg)):
+        p_c = prob_correct(theta, a, item_difficulty, guessing)
+        joint_c = p_prior * p_c
+        joint_i = p_prior * (1.0 - p_c)
+        total_c += joint_c
+        total_i += joint_i
+        if is_weak:
+            weak_c += joint_c
+            weak_i += joint_i
+
+    entropies = []
+    for total, weak in ((total_c, weak_c), (total_i, weak_i)):
+        if total <= 0.0:
+            # Uniform fallback, as in update_theta_posterior_for_item
+            flags = _weak_flags(cfg)
+            total, weak = float(len(flags)), float(sum(flags))
+        entropies.append(entropy_weak_strong(weak / total, (total - weak) / total))
+
+    return total_c, entropies[0], entropies[1]
+
+# app/ef_ads/bayes.py (append)
+
 def update_module_stats_for_item(
     module_stats: ModuleStats,
     module_id: str,
     item_difficulty: float,
     is_correct: bool,
+    likelihood: Optional[bayes_vec.ArrayLike] = None,
+    log_likelihood: Optional[bayes_vec.ArrayLike] = None,
+    speed_likelihood: Optional[bayes_vec.ArrayLike] = None,
+    cfg: Optional[config.EngineConfig] = None,
+    discrimination: Optional[float] = None,
+    guessing: float = 0.0,
 ) -> None:
     """
     In-place update of ModuleStats for a single item response in a module.
 
+    Uses the vectorised backend in bayes_vec.py unless
+    cfg.posterior_backend is "python". A precomputed likelihood row
+    (e.g. CompiledItemBank.likelihood) skips re-evaluating the 2PL curve;
+    otherwise it is evaluated with the item's discrimination (default:
+    the module's) and guessing parameter.
+
+    With cfg.log_space_posterior enabled, the update is carried out on
+    module_stats.log_theta_posterior (log-likelihood addition + log-sum-exp)
+    and theta_posterior is refreshed from it.
+
+    With a speed_likelihood (the RT likelihood over cfg.speed_grid, see
+    bayes_vec.rt_likelihood; given when cfg.rt_model is enabled) the
+    joint (theta, speed) posterior module_stats.joint_posterior is updated
+    instead, and theta_posterior becomes its theta marginal.
+
+    Each path uses a fused kernel that returns the posterior together with
+    p_weak, p_strong and entropy (bayes_vec.PosteriorSummary).
+
     Steps:
     - Update theta posterior via 2PL-like model.
     - Derive weak/strong probabilities.
     - Update entropy.
+    - Update the ability estimates (EAP, MAP, posterior SD).
     - Increment num_items and correct count.
+    - Add the response to the module's history signature (dropped if the
+      posterior fell back to the prior).
     """
-    # Update theta posterior
-    new_posterior = update_theta_posterior_for_item(
-        module_stats.theta_posterior,
-        module_id=module_id,
-        item_difficulty=item_difficulty,
-        is_correct=is_correct,
-    )
-    module_stats.theta_posterior = new_posterior
-
-    # Derive weak/strong probabilities
-    ws = derive_weak_strong_probs(new_posterior)
-    module_stats.p_weak = ws["p_weak"]
-    module_stats.p_strong = ws["p_strong"]
-
-    # Compute entropy
-    module_stats.entropy = entropy_weak_strong(
-        module_stats.p_weak,
-        module_stats.p_strong,
-    )
+    cfg = config.resolve(cfg)
+    a = cfg.discrimination(module_id) if discrimination is None else discrimination
+    if speed_likelihood is not None:
+        # Joint speed-accuracy path (probability domain, renormalised)
+        if likelihood is None:
+            p_c = bayes_vec.prob_correct_grid(a, item_difficulty, cfg, guessing)
+            likelihood = p_c if is_correct else 1.0 - p_c
+        joint = module_stats.joint_posterior
+        if joint is None:
+            joint = bayes_vec.joint_prior(module_stats.theta_posterior, module_id, cfg)
+        joint, summary = bayes_vec.update_joint_and_summarise(
+            joint, likelihood, speed_likelihood, cfg
+        )
+        module_stats.joint_posterior = joint
+        if cfg.log_space_posterior:
+            module_stats.log_theta_posterior = bayes_vec.log_posterior_from(summary.posterior)
+        if cfg.posterior_backend == "python":
+            summary = summary._replace(posterior=summary.posterior.tolist())
+    elif cfg.log_space_posterior:
+        # Log-domain path: no renormalisation underflow, no uniform resets
+        if log_likelihood is None:
+            log_likelihood = bayes_vec.log_prob_correct_grid(
+                a, item_difficulty, is_correct, cfg, guessing
+            )
+
+        log_prior = module_stats.log_theta_posterior
+        if log_prior is None:
+            log_prior = bayes_vec.log_posterior_from(module_stats.theta_posterior)
+
+        log_post, new_posterior = bayes_vec.update_log_posterior(log_prior, log_likelihood)
+        module_stats.log_theta_posterior = log_post
+        summary = bayes_vec.summarise_posterior(new_posterior, cfg)
+    elif cfg.posterior_backend == "numpy":
+        # Vectorised path: posterior stays a NumPy array
+        if likelihood is None:
+            p_c = bayes_vec.prob_correct_grid(a, item_difficulty, cfg, guessing)
+            likelihood = p_c if is_correct else 1.0 - p_c
+        summary = bayes_vec.update_and_summarise(module_stats.theta_posterior, likelihood, cfg)
+    else:
+        summary = update_and_summarise(
+            module_stats.theta_posterior,
+            module_id=module_id,
+            item_difficulty=item_difficulty,
+            is_correct=is_correct,
+            cfg=cfg,
+            discrimination=a,
+            guessing=guessing,
+        )
+
+    module_stats.theta_posterior = summary.posterior
+    module_stats.p_weak = summary.p_weak
+    module_stats.p_strong = summary.p_strong
+    module_stats.entropy = summary.entropy
+    if cfg.posterior_backend == "python":
+        estimates = theta_estimates(summary.posterior, cfg)
+    else:
+        estimates = bayes_vec.theta_estimates(summary.posterior, cfg)
+    module_stats.theta_eap = estimates.eap
+    module_stats.theta_map = estimates.map
+    module_stats.theta_sd = estimates.sd
 
     # Update counts
     module_stats.num_items += 1
     if is_correct:
         module_stats.correct += 1
+
+    if speed_likelihood is not None or summary.reset:
+        # The posterior now depends on response times, or was reset to the
+        # prior: it is no longer determined by the history signature
+        module_stats.history = None
+    elif module_stats.history is not None:
+        history = list(module_stats.history)
+        insort(history, (float(item_difficulty), float(a), float(guessing), bool(is_correct)))
+        module_stats.history = tuple(history)
@@ -0,0 +1,615 @@
+# app/ef_ads/bayes_vec.py
+
+"""
+Vectorised posterior backend for EF-ADS.
+
+NumPy counterparts of the list-based routines in bayes.py:
+- posteriors are kept as float64 arrays over the configured theta grid,
+- the 2PL likelihood is evaluated for the whole grid in one call,
+- weak/strong probabilities and entropy are computed with array ops.
+
+All functions accept either a single posterior (shape (G,)) or a stack of
+posteriors (shape (..., G)); the grid is always the last axis. The list-based
+functions in bayes.py remain the reference implementation.
+"""
+
+from __future__ import annotations
+import math
+from typing import NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from . import config
+
+ArrayLike = Union[Sequence[float], np.ndarray]
+
+# app/ef_ads/bayes_vec.py (append)
+
+# Read-only grid arrays per theta grid / (grid, threshold); a handful of
+# configurations at most, so the cache is not bounded
+_GRID_CACHE: dict = {}
+_MASK_CACHE: dict = {}
+_SPLIT_CACHE: dict = {}
+_PRIOR_CACHE: dict = {}
+_MOMENT_CACHE: dict = {}
+
+
+def theta_grid_array(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    The configured theta grid (EngineConfig.theta_nodes) as a (read-only)
+    float64 array.
+    """
+    grid = config.resolve(cfg).theta_nodes
+    theta = _GRID_CACHE.get(grid)
+    if theta is None:
+        theta = np.asarray(grid, dtype=np.float64)
+        theta.flags.writeable = False
+        _GRID_CACHE[grid] = theta
+    return theta
+
+
+def prior_array(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    Prior mass over the theta grid (EngineConfig.theta_prior) as a
+    (read-only) float64 array.
+    """
+    prior = config.resolve(cfg).theta_prior
+    arr = _PRIOR_CACHE.get(prior)
+    if arr is None:
+        arr = np.asarray(prior, dtype=np.float64)
+        arr.flags.writeable = False
+        _PRIOR_CACHE[prior] = arr
+    return arr
+
+
+def weak_mask(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    0/1 float mask over the theta grid marking the 'weak' region
+    (theta < theta_weak_threshold), ready for dot products.
+    """
+    cfg = config.resolve(cfg)
+    key = (cfg.theta_nodes, cfg.theta_weak_threshold)
+    mask = _MASK_CACHE.get(key)
+    if mask is None:
+        mask = (theta_grid_array(cfg) < cfg.theta_weak_threshold).astype(np.float64)
+        mask.flags.writeable = False
+        _MASK_CACHE[key] = mask
+    return mask
+
+
+def weak_strong_split(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    (G, 2) matrix [weak_mask, 1 - weak_mask]: one product with a (stack
+    of) unnormalised posterior(s) gives the weak and strong mass together.
+    """
+    cfg = config.resolve(cfg)
+    key = (cfg.theta_nodes, cfg.theta_weak_threshold)
+    split = _SPLIT_CACHE.get(key)
+    if split is None:
+        mask = weak_mask(cfg)
+        split = np.stack([mask, 1.0 - mask], axis=-1)
+        split.flags.writeable = False
+        _SPLIT_CACHE[key] = split
+    return split
+
+# app/ef_ads/bayes_vec.py (append)
+
+def prob_correct_grid(
+    a: ArrayLike,
+    b: ArrayLike,
+    cfg: Optional[config.EngineConfig] = None,
+    c: ArrayLike = 0.0,
+) -> np.ndarray:
+    """
+    Vectorised 2PL (3PL for c > 0) item response function over the theta grid.
+
+    Parameters
+    ----------
+    a : discrimination parameter, or an array of shape (K,)
+    b : item difficulty, or an array of difficulties of shape (K,)
+    c : guessing parameter, or an array of shape (K,)
+
+    Returns
+    -------
+    P(correct | theta) with shape (G,) for scalar parameters, (K, G) otherwise.
+    """
+    a_arr = np.asarray(a, dtype=np.float64)[..., np.newaxis]
+    b_arr = np.asarray(b, dtype=np.float64)
+    c_arr = np.asarray(c, dtype=np.float64)[..., np.newaxis]
+    theta = theta_grid_array(cfg)
+    exponent = -a_arr * (theta - b_arr[..., np.newaxis])
+    return c_arr + (1.0 - c_arr) / (1.0 + np.exp(exponent))
+
+# app/ef_ads/bayes_vec.py (append)
+
+def normalise(unnormalised: np.ndarray) -> np.ndarray:
+    """
+    Normalise posterior(s) along the grid axis.
+
+    Rows whose total mass is not positive fall back to a uniform posterior,
+    mirroring bayes.update_theta_posterior_for_item.
+    """
+    total = unnormalised.sum(axis=-1, keepdims=True)
+    if np.all(total > 0.0):
+        return unnormalised / total
+
+    uniform = np.full_like(unnormalised, 1.0 / unnormalised.shape[-1])
+    safe_total = np.where(total > 0.0, total, 1.0)
+    return np.where(total > 0.0, unnormalised / safe_total, uniform)
+
+def update_with_likelihood(theta_posterior: ArrayLike, likelihood: np.ndarray) -> np.ndarray:
+    """
+    Multiply posterior(s) by a likelihood row over the grid and normalise.
+    """
+    prior = np.asarray(theta_posterior, dtype=np.float64)
+    return normalise(prior * likelihood)
+
+
+def update_theta_posterior_for_item(
+    theta_posterior: ArrayLike,
+    module_id: str,
+    item_difficulty: float,
+    is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
+    discrimination: Optional[float] = None,
+    guessing: float = 0.0,
+) -> np.ndarray:
+    """
+    Array version of bayes.update_theta_posterior_for_item.
+
+    Returns
+    -------
+    new_theta_posterior : updated, normalised posterior as a float64 array
+    """
+    cfg = config.resolve(cfg)
+    a = cfg.discrimination(module_id) if discrimination is None else discrimination
+
+    p_c = prob_correct_grid(a, item_difficulty, cfg, guessing)
+    likelihood = p_c if is_correct else 1.0 - p_c
+
+    return update_with_likelihood(theta_posterior, likelihood)
+
+# app/ef_ads/bayes_vec.py (append)
+
+def derive_weak_strong_probs(
+    theta_posterior: ArrayLike,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Array version of bayes.derive_weak_strong_probs.
+
+    Returns
+    -------
+    (p_weak, p_strong) : scalars for a single posterior, arrays of shape
+                         (...,) for a stack of posteriors.
+    """
+    post = np.asarray(theta_posterior, dtype=np.float64)
+    mask = weak_mask(cfg)
+
+    p_weak = post @ mask
+    p_strong = post @ (1.0 - mask)
+
+    total = p_weak + p_strong
+    positive = total > 0.0
+    safe_total = np.where(positive, total, 1.0)
+    p_weak = np.where(positive, p_weak / safe_total, 0.5)
+    p_strong = np.where(positive, p_strong / safe_total, 0.5)
+
+    return p_weak, p_strong
+
+# app/ef_ads/bayes_vec.py (append)
+
+def entropy_weak_strong(p_weak: ArrayLike, p_strong: ArrayLike) -> np.ndarray:
+    """
+    Array version of bayes.entropy_weak_strong (base-2 entropy in bits).
+    """
+    eps = 1e-12
+    p_w = np.minimum(np.maximum(np.asarray(p_weak, dtype=np.float64), 0.0), 1.0)
+    p_s = np.minimum(np.maximum(np.asarray(p_strong, dtype=np.float64), 0.0), 1.0)
+
+    total = p_w + p_s
+    positive = total > 0.0
+    safe_total = np.where(positive, total, 1.0)
+    p_w = p_w / safe_total
+    p_s = p_s / safe_total
+
+    h_w = np.where(p_w > eps, -p_w * np.log2(np.maximum(p_w, eps)), 0.0)
+    h_s = np.where(p_s > eps, -p_s * np.log2(np.maximum(p_s, eps)), 0.0)
+
+    return np.where(positive, h_w + h_s, 1.0)
+
+# app/ef_ads/bayes_vec.py (append)
+
+class PosteriorSummary(NamedTuple):
+    """
+    Result of a fused posterior update: the normalised posterior and the
+    weak/strong probabilities and entropy derived from it. reset is True
+    when the update had no positive mass and the posterior fell back to
+    the prior.
+    """
+    posterior: ArrayLike
+    p_weak: float
+    p_strong: float
+    entropy: float
+    reset: bool = False
+
+
+def _weak_strong_from_joint(
+    joint: np.ndarray,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (total, p_weak, p_strong) of unnormalised posterior(s) `joint`, from a
+    single product with the weak/strong split matrix.
+
+    Rows without positive mass get the values of the prior (uniform on the
+    default grid), as normalise + derive_weak_strong_probs would give them.
+    """
+    masses = joint @ weak_strong_split(cfg)
+    weak = masses[..., 0]
+    strong = masses[..., 1]
+    total = weak + strong
+
+    if np.all(total > 0.0):
+        return total, weak / total, strong / total
+
+    prior_weak = float(prior_array(cfg) @ weak_mask(cfg))
+    positive = total > 0.0
+    safe_total = np.where(positive, total, 1.0)
+    p_weak = np.where(positive, weak / safe_total, prior_weak)
+    p_strong = np.where(positive, strong / safe_total, 1.0 - prior_weak)
+    return total, p_weak, p_strong
+
+
+def update_and_summarise(
+    theta_posterior: ArrayLike,
+    likelihood: np.ndarray,
+    cfg: Optional[config.EngineConfig] = None,
+) -> PosteriorSummary:
+    """
+    Fused update_with_likelihood + derive_weak_strong_probs +
+    entropy_weak_strong for a single posterior.
+
+    The unnormalised posterior is formed once; its total and weak/strong
+    mass come from one product with the split matrix, so the grid is not
+    walked again for normalisation and thresholding.
+    """
+    joint = np.asarray(theta_posterior, dtype=np.float64) * likelihood
+    total, p_weak, p_strong = _weak_strong_from_joint(joint, cfg)
+    reset = not total > 0.0
+    if reset:
+        posterior = prior_array(cfg).copy()
+    else:
+        posterior = joint / total
+
+    p_weak = float(p_weak)
+    p_strong = float(p_strong)
+    return PosteriorSummary(posterior, p_weak, p_strong, _binary_entropy(p_weak, p_strong), reset)
+
+
+def summarise_posterior(
+    theta_posterior: ArrayLike,
+    cfg: Optional[config.EngineConfig] = None,
+) -> PosteriorSummary:
+    """
+    PosteriorSummary of an already normalised posterior (log-space path).
+    """
+    post = np.asarray(theta_posterior, dtype=np.float64)
+    _, p_weak, p_strong = _weak_strong_from_joint(post, cfg)
+    p_weak = float(p_weak)
+    p_strong = float(p_strong)
+    return PosteriorSummary(post, p_weak, p_strong, _binary_entropy(p_weak, p_strong))
+
+
+def _binary_entropy(p_weak: float, p_strong: float) -> float:
+    """
+    Scalar entropy_weak_strong for probabilities that already sum to 1.
+    """
+    entropy = 0.0
+    if p_weak > 1e-12:
+        entropy -= p_weak * math.log2(p_weak)
+    if p_strong > 1e-12:
+        entropy -= p_strong * math.log2(p_strong)
+    return entropy
+
+# app/ef_ads/bayes_vec.py (append)
+
+class ThetaEstimates(NamedTuple):
+    """
+    Ability point estimates of a posterior: expected a posteriori (eap),
+    maximum a posteriori grid point (map) and posterior standard
+    deviation (sd), on the theta scale. Floats for a single posterior,
+    arrays of shape (...) for a stack.
+    """
+    eap: Union[float, np.ndarray]
+    map: Union[float, np.ndarray]
+    sd: Union[float, np.ndarray]
+
+
+def theta_moments(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    (G, 2) matrix [theta, theta**2] over the theta grid: one product with
+    a (stack of) posterior(s) gives the first two moments together.
+    """
+    cfg = config.resolve(cfg)
+    moments = _MOMENT_CACHE.get(cfg.theta_nodes)
+    if moments is None:
+        theta = theta_grid_array(cfg)
+        moments = np.stack([theta, theta * theta], axis=-1)
+        moments.flags.writeable = False
+        _MOMENT_CACHE[cfg.theta_nodes] = moments
+    return moments
+
+
+def theta_estimates(
+    theta_posterior: ArrayLike,
+    cfg: Optional[config.EngineConfig] = None,
+) -> ThetaEstimates:
+    """
+    EAP, MAP and posterior SD of normalised posterior(s) over the theta
+    grid (last axis). Ties for the MAP go to the lowest grid point.
+    """
+    cfg = config.resolve(cfg)
+    post = np.asarray(theta_posterior, dtype=np.float64)
+    moments = post @ theta_moments(cfg)
+    if post.ndim == 1:
+        # Per-step path: scalar arithmetic on the two moments
+        eap, second = moments.tolist()
+        return ThetaEstimates(
+            eap, cfg.theta_nodes[int(post.argmax())], math.sqrt(max(second - eap * eap, 0.0))
+        )
+    eap = moments[..., 0]
+    sd = np.sqrt(np.maximum(moments[..., 1] - eap * eap, 0.0))
+    return ThetaEstimates(eap, theta_grid_array(cfg)[np.argmax(post, axis=-1)], sd)
+
+# app/ef_ads/bayes_vec.py (append)
+
+def expected_entropy_after_item(
+    theta_posterior: ArrayLike,
+    module_id: str,
+    item_difficulty: float,
+    cfg: Optional[config.EngineConfig] = None,
+    discrimination: Optional[float] = None,
+    guessing: float = 0.0,
+) -> float:
+    """
+    Array version of the expected weak/strong entropy computation used by
+    selection.expected_entropy_after_item.
+    """
+    cfg = config.resolve(cfg)
+    a = cfg.discrimination(module_id) if discrimination is None else discrimination
+    p_correct_row = prob_correct_grid(a, item_difficulty, cfg, guessing)
+    return expected_entropy_for_row(theta_posterior, p_correct_row, cfg)
+
+
+def expected_entropy_for_row(
+    theta_posterior: ArrayLike,
+    p_correct_row: np.ndarray,
+    cfg: Optional[config.EngineConfig] = None,
+) -> float:
+    """
+    Expected weak/strong entropy after an item whose P(correct | theta) row
+    over the grid is p_correct_row (e.g. taken from a CompiledItemBank).
+    """
+    rows = np.asarray(p_correct_row, dtype=np.float64)[np.newaxis, :]
+    return float(expected_entropy_batch(theta_posterior, rows, cfg)[0])
+
+
+def expected_entropy_batch(
+    theta_posterior: ArrayLike,
+    p_correct_rows: np.ndarray,
+    cfg: Optional[config.EngineConfig] = None,
+) -> np.ndarray:
+    """
+    Expected weak/strong entropy after each of K candidate items, in one pass.
+
+    Parameters
+    ----------
+    theta_posterior : current module posterior, shape (G,)
+    p_correct_rows  : P(correct | theta) per candidate, shape (K, G)
+
+    Returns
+    -------
+    Array of shape (K,) with P(c)*H(correct) + P(i)*H(incorrect) per item.
+    Both hypothetical outcomes are evaluated as one (2, K, G) stack, and
+    each outcome's posterior is reduced to its weak/strong mass in a single
+    product; the total mass of the 'correct' branch is P(correct).
+    """
+    prior = np.asarray(theta_posterior, dtype=np.float64)
+    p_c_rows = np.asarray(p_correct_rows, dtype=np.float64)
+
+    likelihoods = np.stack([p_c_rows, 1.0 - p_c_rows])
+    totals, p_weak, p_strong = _weak_strong_from_joint(prior * likelihoods, cfg)
+    h_correct, h_incorrect = entropy_weak_strong(p_weak, p_strong)
+
+    p_correct = np.minimum(np.maximum(totals[0], 0.0), 1.0)
+    p_incorrect = 1.0 - p_correct
+
+    expected = p_correct * h_correct + p_incorrect * h_incorrect
+
+    # Guard against degenerate case: entropy dominated by the likely outcome
+    degenerate = (p_correct < 1e-12) | (p_incorrect < 1e-12)
+    if np.any(degenerate):
+        dominant = np.where(p_correct >= p_incorrect, h_correct, h_incorrect)
+        expected = np.where(degenerate, dominant, expected)
+
+    return expected
+
+# app/ef_ads/bayes_vec.py (append)
+
+def log_prob_correct_grid(
+    a: ArrayLike,
+    b: ArrayLike,
+    is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
+    c: ArrayLike = 0.0,
+) -> np.ndarray:
+    """
+    log P(correct | theta) (or log P(incorrect | theta)) over the theta grid,
+    computed as -log(1 + exp(-x)) so it never underflows to -inf. With a
+    guessing parameter c: log(c + (1 - c) P*) and log(1 - c) + log(1 - P*).
+    """
+    a_arr = np.asarray(a, dtype=np.float64)[..., np.newaxis]
+    b_arr = np.asarray(b, dtype=np.float64)
+    c_arr = np.asarray(c, dtype=np.float64)[..., np.newaxis]
+    x = a_arr * (theta_grid_array(cfg) - b_arr[..., np.newaxis])
+    log_p = -np.logaddexp(0.0, -x if is_correct else x)
+    log_slope = np.log1p(-c_arr)
+    if not is_correct:
+        return log_slope + log_p
+    with np.errstate(divide="ignore"):
+        return np.logaddexp(np.log(c_arr), log_slope + log_p)
+
+
+def logsumexp(values: np.ndarray) -> np.ndarray:
+    """
+    log(sum(exp(values))) along the grid axis, shifted by the maximum.
+    """
+    peak = np.max(values, axis=-1, keepdims=True)
+    peak = np.where(np.isfinite(peak), peak, 0.0)
+    return (peak + np.log(np.sum(np.exp(values - peak), axis=-1, keepdims=True)))[..., 0]
+
+
+def update_log_posterior(
+    log_theta_posterior: ArrayLike,
+    log_likelihood: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Log-domain posterior update: add the log-likelihood, then normalise with
+    log-sum-exp. Evidence is never discarded, however small the likelihoods.
+
+    Returns
+    -------
+    (log_posterior, posterior) : normalised log posterior and its exp
+    """
+    log_post = np.asarray(log_theta_posterior, dtype=np.float64) + log_likelihood
+    log_post = log_post - logsumexp(log_post)[..., np.newaxis]
+    return log_post, np.exp(log_post)
+
+
+def log_posterior_from(theta_posterior: ArrayLike) -> np.ndarray:
+    """
+    Log of a probability-domain posterior. Zero mass is clamped to the
+    smallest positive float so the result stays finite (and JSON-safe).
+    """
+    post = np.asarray(theta_posterior, dtype=np.float64)
+    return np.log(np.maximum(post, np.finfo(np.float64).tiny))
+
+# app/ef_ads/bayes_vec.py (append)
+
+# Shortest RT the lognormal model accepts (log of 0 is undefined)
+MIN_RT_SECONDS = 0.05
+
+_SPEED_GRID_CACHE: dict = {}
+_SPEED_PRIOR_CACHE: dict = {}
+
+
+def speed_grid_array(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    The configured speed grid as a (read-only) float64 array.
+    """
+    grid = config.resolve(cfg).speed_grid
+    speed = _SPEED_GRID_CACHE.get(grid)
+    if speed is None:
+        speed = np.asarray(grid, dtype=np.float64)
+        speed.flags.writeable = False
+        _SPEED_GRID_CACHE[grid] = speed
+    return speed
+
+
+def speed_given_theta(module_id: str, cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    (G, H) matrix of the prior P(speed_h | theta_g) for a module: a normal
+    with mean rho * SD * theta and variance SD^2 (1 - rho^2), discretised
+    on the speed grid (each row sums to 1). Read-only, cached.
+    """
+    cfg = config.resolve(cfg)
+    rho = cfg.speed_correlation(module_id)
+    key = (cfg.theta_nodes, cfg.speed_grid, cfg.speed_prior_sd, rho)
+    prior = _SPEED_PRIOR_CACHE.get(key)
+    if prior is None:
+        sd = cfg.speed_prior_sd
+        mean = rho * sd * theta_grid_array(cfg)[:, np.newaxis]
+        z = (speed_grid_array(cfg)[np.newaxis, :] - mean) / (sd * math.sqrt(max(1.0 - rho * rho, 1e-6)))
+        prior = np.exp(-0.5 * z * z)
+        prior /= prior.sum(axis=1, keepdims=True)
+        prior.flags.writeable = False
+        _SPEED_PRIOR_CACHE[key] = prior
+    return prior
+
+
+def joint_prior(
+    theta_posterior: ArrayLike,
+    module_id: str,
+    cfg: Optional[config.EngineConfig] = None,
+) -> np.ndarray:
+    """
+    Joint (theta, speed) posterior whose theta marginal is theta_posterior
+    and whose speed follows the module's prior given theta.
+    """
+    post = np.asarray(theta_posterior, dtype=np.float64)
+    return post[..., np.newaxis] * speed_given_theta(module_id, cfg)
+
+
+def rt_likelihood(
+    rt_seconds: ArrayLike,
+    max_time_seconds: ArrayLike,
+    module_id: str,
+    cfg: Optional[config.EngineConfig] = None,
+) -> np.ndarray:
+    """
+    Lognormal RT likelihood f(RT | speed) over the speed grid, up to a
+    constant factor (which cancels in normalisation). The item's time
+    intensity is log(RT_TIME_INTENSITY_FRACTION * max_time_seconds).
+
+    Broadcasts: arrays of RTs give a (..., H) stack.
+    """
+    cfg = config.resolve(cfg)
+    log_rt = np.log(np.maximum(np.asarray(rt_seconds, dtype=np.float64), MIN_RT_SECONDS))
+    intensity = np.log(
+        cfg.rt_time_intensity_fraction * np.asarray(max_time_seconds, dtype=np.float64)
+    )
+    z = (log_rt - intensity)[..., np.newaxis] + speed_grid_array(cfg)
+    z /= cfg.rt_sd(module_id)
+    return np.exp(-0.5 * z * z)
+
+
+def update_joint_and_summarise(
+    joint_posterior: ArrayLike,
+    likelihood: np.ndarray,
+    speed_likelihood: np.ndarray,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Tuple[np.ndarray, PosteriorSummary]:
+    """
+    Joint speed-accuracy update of a (..., G, H) posterior with the
+    accuracy likelihood over theta (..., G) and the RT likelihood over
+    speed (..., H), plus the PosteriorSummary of the theta marginal.
+
+    If the evidence has no mass on the grid, the RT term is dropped; if
+    that still leaves none, the posterior resets to the theta prior times a
+    uniform speed (as in update_and_summarise).
+
+    Returns
+    -------
+    (joint posterior, summary of its theta marginal)
+    """
+    prior = np.asarray(joint_posterior, dtype=np.float64)
+    likelihood = np.asarray(likelihood, dtype=np.float64)[..., np.newaxis]
+    joint = prior * likelihood * np.asarray(speed_likelihood, dtype=np.float64)[..., np.newaxis, :]
+    total = joint.sum(axis=(-2, -1), keepdims=True)
+    if np.all(total > 0.0):
+        joint = joint / total
+    else:
+        accuracy_only = prior * likelihood
+        accuracy_total = accuracy_only.sum(axis=(-2, -1), keepdims=True)
+        joint = np.where(total > 0.0, joint, accuracy_only)
+        total = np.where(total > 0.0, total, accuracy_total)
+        positive = total > 0.0
+        reset = prior_array(cfg)[:, np.newaxis] / joint.shape[-1]
+        joint = np.where(positive, joint / np.where(positive, total, 1.0), reset)
+
+    marginal = joint.sum(axis=-1)
+    if marginal.ndim == 1:
+        return joint, summarise_posterior(marginal, cfg)
+    _, p_weak, p_strong = _weak_strong_from_joint(marginal, cfg)
+    return joint, PosteriorSummary(marginal, p_weak, p_strong, entropy_weak_strong(p_weak, p_strong))
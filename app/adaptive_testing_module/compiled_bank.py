@@ -0,0 +1,197 @@
+# app/ef_ads/compiled_bank.py
+
+"""
+Compiled item bank for EF-ADS.
+
+A CompiledItemBank is built once per item bank version and holds:
+- the CandidateItem objects (it is a read-only Mapping item_id -> CandidateItem,
+  so it can be passed anywhere an item_pool dict is expected),
+- a dense |items| x |THETA_GRID| matrix of P(correct | theta) and its
+  complement, computed with the 2PL model used in bayes.py (3PL for items
+  that carry a guessing parameter).
+
+Engine functions detect a compiled bank passed as item_pool and look the
+likelihood rows up by item id instead of re-evaluating the 2PL curve.
+The arrays are marked read-only so one bank can be shared by every session
+in the process.
+"""
+
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+import numpy as np
+
+from . import config
+from . import bayes_vec
+from . import selection
+
+# app/ef_ads/compiled_bank.py (append)
+
+
+class CompiledItemBank(Mapping[int, "selection.CandidateItem"]):
+    """
+    Immutable, array-backed view of an item bank.
+
+    Attributes
+    ----------
+    version         : caller-supplied bank version (e.g. the item_bank_version row)
+    item_ids        : int64 array of item ids, in bank order
+    module_ids      : module id per row
+    difficulties    : float64 array of difficulties b_j
+    discriminations : float64 array of discriminations a_j (the item's own,
+                      else the module default)
+    guessing        : float64 array of guessing parameters c_j
+    theta_grid      : grid the likelihood matrices were evaluated on
+                      (EngineConfig.theta_nodes)
+    p_correct       : (K, G) matrix of P(correct | theta_g) per item
+    p_incorrect     : (K, G) complement matrix
+    log_p_correct   : (K, G) log P(correct | theta), computed without underflow
+    log_p_incorrect : (K, G) log P(incorrect | theta)
+    """
+
+    def __init__(
+        self,
+        items: Iterable[selection.CandidateItem],
+        version: int = 0,
+        cfg: Optional[config.EngineConfig] = None,
+    ) -> None:
+        cfg = config.resolve(cfg)
+        self.version = version
+        self._items: Dict[int, selection.CandidateItem] = {}
+        for item in items:
+            self._items[item.id] = item
+
+        ordered = list(self._items.values())
+        self._index: Dict[int, int] = {item.id: row for row, item in enumerate(ordered)}
+
+        self.item_ids = np.array([item.id for item in ordered], dtype=np.int64)
+        self.module_ids: List[str] = [item.module_id for item in ordered]
+        self.difficulties = np.array([item.difficulty for item in ordered], dtype=np.float64)
+        self.discriminations = np.array(
+            [selection.item_parameters(item, cfg)[1] for item in ordered],
+            dtype=np.float64,
+        )
+        self.guessing = np.array([item.guessing for item in ordered], dtype=np.float64)
+
+        # Remember which configuration the matrices were compiled against
+        self._grid_source = cfg.theta_nodes
+        self._discrimination_source = cfg.item_discrimination
+
+        self.theta_grid = bayes_vec.theta_grid_array(cfg).copy()
+        logits = self.discriminations[:, np.newaxis] * (
+            self.theta_grid[np.newaxis, :] - self.difficulties[:, np.newaxis]
+        )
+        c = self.guessing[:, np.newaxis]
+        self.p_correct = c + (1.0 - c) / (1.0 + np.exp(-logits))
+        self.p_incorrect = 1.0 - self.p_correct
+        log_slope = np.log1p(-c)
+        with np.errstate(divide="ignore"):
+            self.log_p_correct = np.logaddexp(np.log(c), log_slope - np.logaddexp(0.0, -logits))
+        self.log_p_incorrect = log_slope - np.logaddexp(0.0, logits)
+
+        for arr in (
+            self.item_ids,
+            self.difficulties,
+            self.discriminations,
+            self.guessing,
+            self.theta_grid,
+            self.p_correct,
+            self.p_incorrect,
+            self.log_p_correct,
+            self.log_p_incorrect,
+        ):
+            arr.flags.writeable = False
+
+    # ---- Mapping protocol -------------------------------------------------
+
+    def __getitem__(self, item_id: int) -> selection.CandidateItem:
+        return self._items[item_id]
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item_id: object) -> bool:
+        return item_id in self._items
+
+    def get(self, item_id: int, default: Optional[selection.CandidateItem] = None) -> Optional[selection.CandidateItem]:
+        return self._items.get(item_id, default)
+
+    # ---- Lookups ----------------------------------------------------------
+
+    def row(self, item_id: int) -> int:
+        """
+        Row index of an item in the likelihood matrices.
+        """
+        return self._index[item_id]
+
+    def rows(self, item_ids: Iterable[int]) -> np.ndarray:
+        """
+        Row indices for several item ids, as an int array.
+        """
+        return np.fromiter((self._index[i] for i in item_ids), dtype=np.int64)
+
+    def likelihood(self, item_id: int, is_correct: bool) -> np.ndarray:
+        """
+        Likelihood row over the theta grid for an observed response.
+        """
+        row = self._index[item_id]
+        return self.p_correct[row] if is_correct else self.p_incorrect[row]
+
+    def log_likelihood(self, item_id: int, is_correct: bool) -> np.ndarray:
+        """
+        Log-likelihood row over the theta grid for an observed response.
+        """
+        row = self._index[item_id]
+        return self.log_p_correct[row] if is_correct else self.log_p_incorrect[row]
+
+    def module_item_ids(self) -> Dict[str, List[int]]:
+        """
+        Group item ids by module, in bank order (as used by SessionState.initialise).
+        """
+        mapping: Dict[str, List[int]] = {}
+        for item_id, module_id in zip(self._items, self.module_ids):
+            mapping.setdefault(module_id, []).append(item_id)
+        return mapping
+
+    def is_current(self, cfg: Optional[config.EngineConfig] = None) -> bool:
+        """
+        True if the bank was compiled against the theta grid and
+        discrimination parameters of cfg (default: the active configuration).
+        """
+        cfg = config.resolve(cfg)
+        return (
+            self._grid_source == cfg.theta_nodes
+            and self._discrimination_source == cfg.item_discrimination
+        )
+
+    @classmethod
+    def from_item_pool(
+        cls,
+        item_pool: Mapping[int, selection.CandidateItem],
+        version: int = 0,
+        cfg: Optional[config.EngineConfig] = None,
+    ) -> "CompiledItemBank":
+        """
+        Compile an existing item_pool mapping.
+        """
+        return cls(item_pool.values(), version=version, cfg=cfg)
+
+# app/ef_ads/compiled_bank.py (append)
+
+def bank_for(
+    item_pool: object,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Optional[CompiledItemBank]:
+    """
+    Return item_pool if it is a compiled bank usable by the vectorised
+    backend under cfg (default: the active configuration), otherwise None.
+    """
+    if not isinstance(item_pool, CompiledItemBank):
+        return None
+    cfg = config.resolve(cfg)
+    if cfg.posterior_backend == "numpy" and item_pool.is_current(cfg):
+        return item_pool
+    return None
@@ -8,7 +8,13 @@ They can be tuned later based on simulations and supervisor feedback.
 """
 
 from __future__ import annotations
-from typing import Dict, List
+import copy
+import dataclasses
+import sys
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from . import quadrature
 
 
 # -------------------------------------------------
@@ -43,6 +49,16 @@ THETA_GRID : List[float] = [-2.0, -1.5, -1.0, -0.5, 0.0, 0.5, 1.0, 1.5, 2.0]
 # e.g., theta < 0 => weak, theta >= 0 => strong
 THETA_WEAK_THRESHOLD: float = 0.0
 
+# Posterior computation backend:
+#   "numpy"  -> vectorised array ops (bayes_vec.py), posteriors kept as arrays
+#   "python" -> list-based reference implementation (bayes.py)
+POSTERIOR_BACKEND: str = "numpy"
+
+# Keep a log-domain copy of each module posterior (ModuleStats.log_theta_posterior)
+# and update it by log-likelihood addition + log-sum-exp normalisation.
+# Avoids the uniform-prior reset on underflow for long sessions / fine grids.
+LOG_SPACE_POSTERIOR: bool = False
+
 
 # -------------------------------------------------
 # Item response model (2PL-like, per module)
@@ -57,10 +73,33 @@ ITEM_DISCRIMINATION: Dict[str, float] = {"phonemic_awareness": 1.4, "ran": 1.35,
 #     "object_recognition": 1.0,
 # }
 
-# Prior mean and variance for theta (for documentation purposes)
+# Prior mean and variance for theta (for documentation purposes; with
+# quadrature enabled they set where the grid is refined)
 THETA_PRIOR_MEAN: float = 0.0
 THETA_PRIOR_VAR: float = 1.0
 
+# High-resolution quadrature (quadrature.py): 0 keeps THETA_GRID as the
+# posterior grid; 41..201 replaces it by that many nodes over the same
+# range, refined adaptively where the ability distribution above puts its
+# mass and split at THETA_WEAK_THRESHOLD. THETA_QUADRATURE_FLOOR is the
+# uniform share of the refinement target (keeps resolution in the tails).
+THETA_QUADRATURE_POINTS: int = 0
+THETA_QUADRATURE_FLOOR: float = 0.2
+
+# Joint posterior across modules (multidim.py): one tensor over the
+# abilities of all MODULES instead of independent per-module posteriors, so
+# a response in one module also moves the correlated ones. The prior keeps
+# the uniform per-module marginals and couples them through a Gaussian
+# copula with the correlations below (pairs not listed: 0). Runs on the
+# numpy backend; not combined with RT_MODEL or SessionBatch, and limited to
+# grids of at most 41 points (multidim.JOINT_THETA_MAX_CELLS).
+JOINT_THETA_POSTERIOR: bool = False
+MODULE_THETA_CORRELATION: Dict[Tuple[str, str], float] = {
+    ("phonemic_awareness", "ran"): 0.5,
+    ("phonemic_awareness", "object_recognition"): 0.2,
+    ("ran", "object_recognition"): 0.2,
+}
+
 
 # -------------------------------------------------
 # Response time and fatigue
@@ -75,6 +114,36 @@ RAPID_GUESS_FRACTION: float = 0.25
 FATIGUE_SLOPE: float = 0.05   # rate of decay per minute
 MIN_FATIGUE_FACTOR: float = 0.4  # lower bound on information scaling[web:366][web:513]
 
+# Joint speed-accuracy model (hierarchical, lognormal RT): when enabled each
+# module keeps a posterior over THETA_GRID x SPEED_GRID and every response
+# updates it with P(correct | theta) * f(RT | speed), where
+#   log RT ~ Normal(log(RT_TIME_INTENSITY_FRACTION * max_time_seconds) - speed,
+#                   RT_LOG_SD[module]^2)
+# and speed | theta ~ Normal(rho * SPEED_PRIOR_SD * theta, SPEED_PRIOR_SD^2 (1 - rho^2))
+# with rho = SPEED_ABILITY_CORRELATION[module]. theta_posterior is the theta
+# marginal, so RT moves the weak/strong decision through rho.
+RT_MODEL: bool = False
+
+# Speed grid (log-seconds; higher = faster than the item's typical time)
+SPEED_GRID: List[float] = [-1.2, -1.0, -0.8, -0.6, -0.4, -0.2, 0.0, 0.2, 0.4, 0.6, 0.8, 1.0, 1.2]
+SPEED_PRIOR_SD: float = 0.4
+
+# Prior correlation between ability and speed. RAN is a speed construct; for
+# the other modules RT is tracked but does not move theta (rho = 0). In
+# simulation the RT model classifies RAN more accurately, but it needs its
+# own (looser) P_CONFIDENT / ENTROPY_THRESHOLD to also use fewer items.
+SPEED_ABILITY_CORRELATION: Dict[str, float] = {
+    "phonemic_awareness": 0.0,
+    "ran": 0.7,
+    "object_recognition": 0.0,
+}
+
+# Residual SD of log RT per module
+RT_LOG_SD: Dict[str, float] = {"phonemic_awareness": 0.45, "ran": 0.35, "object_recognition": 0.45}
+
+# Typical RT of an average-speed child, as a fraction of item.max_time_seconds
+RT_TIME_INTENSITY_FRACTION: float = 0.5
+
 
 # -------------------------------------------------
 # Stopping rules
@@ -99,6 +168,11 @@ ENTROPY_THRESHOLD: float = 0.75  # lower entropy => higher certainty[web:509][we
 # MIN_INFO_GAIN: float = 0.01     # will be tuned later[web:509][web:515]
 MIN_INFO_GAIN: float = 0.02     # will be tuned later[web:509][web:515]
 
+# Process-wide memo of base information gains keyed by module response
+# history (selection.SharedGainMemo): number of module histories kept.
+# 0 disables it. Does not change results, so it is not part of EngineConfig.
+SHARED_GAIN_MEMO_SIZE: int = 8192
+
 
 # -------------------------------------------------
 # Global risk classification
@@ -132,3 +206,222 @@ RISK_SCORE_MODERATE = 0.55
 # -------------------------------------------------
 
 DEBUG_LOGGING: bool = False  # can be toggled to trace algorithm behaviour in logs
+
+
+# -------------------------------------------------
+# Immutable engine configuration
+# -------------------------------------------------
+# Engine functions take an optional `cfg: EngineConfig`. When omitted they
+# use default_config(), a snapshot of the module constants above, so
+# existing callers (and code that still assigns the constants) keep working.
+# Passing explicit EngineConfig values lets several configurations (tuning
+# candidates, tenants, A/B arms) run side by side in one process.
+
+# EngineConfig field -> module constant it defaults to
+CONFIG_CONSTANTS: Dict[str, str] = {
+    "modules": "MODULES",
+    "module_labels": "MODULE_LABELS",
+    "theta_grid": "THETA_GRID",
+    "theta_weak_threshold": "THETA_WEAK_THRESHOLD",
+    "theta_prior_mean": "THETA_PRIOR_MEAN",
+    "theta_prior_var": "THETA_PRIOR_VAR",
+    "theta_quadrature_points": "THETA_QUADRATURE_POINTS",
+    "theta_quadrature_floor": "THETA_QUADRATURE_FLOOR",
+    "joint_theta_posterior": "JOINT_THETA_POSTERIOR",
+    "module_theta_correlation": "MODULE_THETA_CORRELATION",
+    "posterior_backend": "POSTERIOR_BACKEND",
+    "log_space_posterior": "LOG_SPACE_POSTERIOR",
+    "item_discrimination": "ITEM_DISCRIMINATION",
+    "slow_rt_factor": "SLOW_RT_FACTOR",
+    "rapid_guess_fraction": "RAPID_GUESS_FRACTION",
+    "fatigue_slope": "FATIGUE_SLOPE",
+    "min_fatigue_factor": "MIN_FATIGUE_FACTOR",
+    "rt_model": "RT_MODEL",
+    "speed_grid": "SPEED_GRID",
+    "speed_prior_sd": "SPEED_PRIOR_SD",
+    "speed_ability_correlation": "SPEED_ABILITY_CORRELATION",
+    "rt_log_sd": "RT_LOG_SD",
+    "rt_time_intensity_fraction": "RT_TIME_INTENSITY_FRACTION",
+    "min_items_per_module": "MIN_ITEMS_PER_MODULE",
+    "max_items_total": "MAX_ITEMS_TOTAL",
+    "max_test_time_min": "MAX_TEST_TIME_MIN",
+    "p_confident": "P_CONFIDENT",
+    "entropy_threshold": "ENTROPY_THRESHOLD",
+    "min_info_gain": "MIN_INFO_GAIN",
+    "module_weights": "MODULE_WEIGHTS",
+    "risk_score_high": "RISK_SCORE_HIGH",
+    "risk_score_moderate": "RISK_SCORE_MODERATE",
+}
+
+# Fields given as mappings; stored as tuples of (key, value) pairs
+_MAPPING_FIELDS = (
+    "module_labels",
+    "item_discrimination",
+    "module_weights",
+    "speed_ability_correlation",
+    "rt_log_sd",
+    "module_theta_correlation",
+)
+_SEQUENCE_FIELDS = ("modules", "theta_grid", "speed_grid")
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    """
+    Frozen, hashable set of engine hyperparameters.
+
+    Field names are the lower-case module constant names (see
+    CONFIG_CONSTANTS). Mapping fields accept dicts and are stored as
+    tuples of pairs; use discrimination(), module_weight(),
+    module_label(), speed_correlation(), rt_sd() and
+    module_correlation() to read them.
+
+    The posterior lives on theta_nodes with prior mass theta_prior: the
+    theta_grid itself with a uniform prior, or the refined quadrature when
+    theta_quadrature_points > 0.
+    """
+    modules: Tuple[str, ...]
+    module_labels: Tuple[Tuple[str, str], ...]
+    theta_grid: Tuple[float, ...]
+    theta_weak_threshold: float
+    theta_prior_mean: float
+    theta_prior_var: float
+    theta_quadrature_points: int
+    theta_quadrature_floor: float
+    joint_theta_posterior: bool
+    module_theta_correlation: Tuple[Tuple[Tuple[str, str], float], ...]
+    posterior_backend: str
+    log_space_posterior: bool
+    item_discrimination: Tuple[Tuple[str, float], ...]
+    slow_rt_factor: float
+    rapid_guess_fraction: float
+    fatigue_slope: float
+    min_fatigue_factor: float
+    rt_model: bool
+    speed_grid: Tuple[float, ...]
+    speed_prior_sd: float
+    speed_ability_correlation: Tuple[Tuple[str, float], ...]
+    rt_log_sd: Tuple[Tuple[str, float], ...]
+    rt_time_intensity_fraction: float
+    min_items_per_module: int
+    max_items_total: int
+    max_test_time_min: float
+    p_confident: float
+    entropy_threshold: float
+    min_info_gain: float
+    module_weights: Tuple[Tuple[str, float], ...]
+    risk_score_high: float
+    risk_score_moderate: float
+
+    def __post_init__(self) -> None:
+        for name in _SEQUENCE_FIELDS:
+            object.__setattr__(self, name, tuple(getattr(self, name)))
+        for name in _MAPPING_FIELDS:
+            value = getattr(self, name)
+            pairs = value.items() if isinstance(value, Mapping) else value
+            object.__setattr__(self, name, tuple(sorted((k, v) for k, v in pairs)))
+        # Dict views for the accessors (not fields: excluded from eq/hash)
+        object.__setattr__(self, "_discrimination", dict(self.item_discrimination))
+        object.__setattr__(self, "_weights", dict(self.module_weights))
+        object.__setattr__(self, "_labels", dict(self.module_labels))
+        object.__setattr__(self, "_speed_correlation", dict(self.speed_ability_correlation))
+        object.__setattr__(self, "_rt_log_sd", dict(self.rt_log_sd))
+        object.__setattr__(self, "_module_correlation", dict(self.module_theta_correlation))
+        # Posterior grid and prior mass (not fields: derived from the above)
+        if self.theta_quadrature_points:
+            quad = quadrature.build_quadrature(
+                self.theta_grid,
+                self.theta_weak_threshold,
+                self.theta_quadrature_points,
+                self.theta_prior_mean,
+                self.theta_prior_var,
+                self.theta_quadrature_floor,
+            )
+            nodes, prior = quad.nodes, quad.weights
+        else:
+            nodes, prior = self.theta_grid, (1.0 / len(self.theta_grid),) * len(self.theta_grid)
+        object.__setattr__(self, "_theta_nodes", nodes)
+        object.__setattr__(self, "_theta_prior", prior)
+        # Hashed on every memo lookup (selection.SharedGainMemo): compute once
+        object.__setattr__(
+            self, "_hash", hash(tuple(getattr(self, f.name) for f in dataclasses.fields(self)))
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    @property
+    def theta_nodes(self) -> Tuple[float, ...]:
+        return self._theta_nodes
+
+    @property
+    def theta_prior(self) -> Tuple[float, ...]:
+        return self._theta_prior
+
+    @classmethod
+    def from_module(cls) -> "EngineConfig":
+        """
+        Snapshot of the current module constants.
+        """
+        module = sys.modules[__name__]
+        return cls(**{f: getattr(module, c) for f, c in CONFIG_CONSTANTS.items()})
+
+    def replace(self, **changes: Any) -> "EngineConfig":
+        """
+        Copy with some fields changed. Accepts field names or the module
+        constant names (e.g. MIN_INFO_GAIN=0.02, as used by tuning grids).
+        """
+        by_constant = {c: f for f, c in CONFIG_CONSTANTS.items()}
+        return dataclasses.replace(
+            self, **{by_constant.get(k, k): v for k, v in changes.items()}
+        )
+
+    def discrimination(self, module_id: str) -> float:
+        return self._discrimination.get(module_id, 1.0)
+
+    def module_weight(self, module_id: str) -> float:
+        return self._weights.get(module_id, 0.0)
+
+    def module_label(self, module_id: str) -> str:
+        return self._labels.get(module_id, module_id)
+
+    def speed_correlation(self, module_id: str) -> float:
+        return self._speed_correlation.get(module_id, 0.0)
+
+    def rt_sd(self, module_id: str) -> float:
+        return self._rt_log_sd.get(module_id, 0.45)
+
+    def module_correlation(self, module_a: str, module_b: str) -> float:
+        if module_a == module_b:
+            return 1.0
+        value = self._module_correlation.get((module_a, module_b))
+        if value is None:
+            value = self._module_correlation.get((module_b, module_a), 0.0)
+        return value
+
+
+_default_cache: List[Tuple[Tuple, EngineConfig]] = []
+
+
+def default_config() -> EngineConfig:
+    """
+    EngineConfig for the current module constants.
+
+    Cached; rebuilt only when a constant has been reassigned or mutated
+    since the last call.
+    """
+    module = sys.modules[__name__]
+    key = tuple(getattr(module, c) for c in CONFIG_CONSTANTS.values())
+    if _default_cache and _default_cache[0][0] == key:
+        return _default_cache[0][1]
+    cfg = EngineConfig.from_module()
+    # Deep-copy the key so later in-place edits of list/dict constants are seen
+    _default_cache[:] = [(copy.deepcopy(key), cfg)]
+    return cfg
+
+
+def resolve(cfg: Optional[EngineConfig]) -> EngineConfig:
+    """
+    cfg if given, else default_config().
+    """
+    return cfg if cfg is not None else default_config()
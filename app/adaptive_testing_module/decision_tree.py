@@ -0,0 +1,306 @@
+# app/ef_ads/decision_tree.py
+
+"""
+Precompiled adaptive decision tree for EF-ADS.
+
+With a fixed item bank, fixed configuration and a uniform prior, the item
+sequence produced by start_new_test + process_response depends only on the
+history of correct/incorrect answers, except for elapsed time, which enters
+through:
+- the fatigue factor (scales gains against MIN_INFO_GAIN in selection),
+- the MAX_TEST_TIME_MIN hard cap in stopping.
+
+The compiler enumerates this tree with time frozen at zero, sharing nodes
+between answer paths that lead to the same session state (memoisation) and
+pruning at stop decisions. Each node stores the item to issue, the module
+index to move to and the item's base information gain, so the serving side
+can check the time-dependent rules cheaply and fall back to live
+evaluation when they would change the outcome.
+"""
+
+from __future__ import annotations
+import copy
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from . import config
+from . import orchestration_engine
+from . import rt_fatigue
+from . import selection
+from . import compiled_bank
+from .selection import CandidateItem
+from .state import SessionState
+
+# Child pointer values
+STOP = -1       # the test stops after this answer
+UNKNOWN = -2    # not compiled (depth limit); evaluate live
+
+TREE_FORMAT_VERSION = 1
+
+# app/ef_ads/decision_tree.py (append)
+
+def engine_fingerprint(
+    item_pool: Mapping[int, CandidateItem],
+    cfg: Optional[config.EngineConfig] = None,
+) -> str:
+    """
+    Hash of everything the tree depends on: the item bank and the engine
+    hyperparameters (of cfg, default: the active config) that influence
+    selection and stopping.
+    """
+    cfg = config.resolve(cfg)
+    payload = {
+        "items": sorted(
+            (it.id, it.module_id, it.difficulty, it.max_time_seconds)
+            + ((it.discrimination, it.guessing) if it.discrimination is not None or it.guessing else ())
+            for it in item_pool.values()
+        ),
+        "modules": list(cfg.modules),
+        "theta_grid": list(cfg.theta_nodes),
+        "theta_weak_threshold": cfg.theta_weak_threshold,
+        "item_discrimination": list(cfg.item_discrimination),
+        "min_items_per_module": cfg.min_items_per_module,
+        "max_items_total": cfg.max_items_total,
+        "p_confident": cfg.p_confident,
+        "entropy_threshold": cfg.entropy_threshold,
+        "min_info_gain": cfg.min_info_gain,
+        "log_space_posterior": cfg.log_space_posterior,
+    }
+    if cfg.theta_quadrature_points:
+        payload["theta_prior"] = list(cfg.theta_prior)
+    if cfg.joint_theta_posterior:
+        payload["module_theta_correlation"] = [list(pair) for pair in cfg.module_theta_correlation]
+    if cfg.rt_model:
+        payload["rt_model"] = True
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+# app/ef_ads/decision_tree.py (append)
+
+@dataclass
+class DecisionTree:
+    """
+    Flat array representation of the compiled tree.
+
+    Node i is the state in which item_ids[i] is issued; module_index[i] is
+    the session.current_module_index for that item and gains[i] its base
+    information gain. child_correct[i] / child_incorrect[i] give the next
+    node after each answer (or STOP / UNKNOWN). Node 0 is the opening item.
+    """
+    fingerprint: str
+    item_ids: List[int] = field(default_factory=list)
+    module_index: List[int] = field(default_factory=list)
+    gains: List[float] = field(default_factory=list)
+    child_correct: List[int] = field(default_factory=list)
+    child_incorrect: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.item_ids)
+
+    def child(self, node: int, is_correct: bool) -> int:
+        return self.child_correct[node] if is_correct else self.child_incorrect[node]
+
+    def is_valid_for(
+        self,
+        item_pool: Mapping[int, CandidateItem],
+        cfg: Optional[config.EngineConfig] = None,
+    ) -> bool:
+        return self.fingerprint == engine_fingerprint(item_pool, cfg)
+
+    # ---- Serialisation ----------------------------------------------------
+
+    def to_dict(self) -> Dict:
+        return {
+            "format": TREE_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "item_ids": self.item_ids,
+            "module_index": self.module_index,
+            "gains": self.gains,
+            "child_correct": self.child_correct,
+            "child_incorrect": self.child_incorrect,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "DecisionTree":
+        if data.get("format") != TREE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported decision tree format: {data.get('format')}")
+        return cls(
+            fingerprint=data["fingerprint"],
+            item_ids=list(data["item_ids"]),
+            module_index=list(data["module_index"]),
+            gains=list(data["gains"]),
+            child_correct=list(data["child_correct"]),
+            child_incorrect=list(data["child_incorrect"]),
+        )
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "DecisionTree":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+# app/ef_ads/decision_tree.py (append)
+
+def _state_key(
+    session: SessionState,
+    history: Dict[str, Tuple],
+    modules: Tuple[str, ...],
+) -> Tuple:
+    """
+    Canonical key of a session state for memoisation: the module the
+    engine will continue from plus, per module, the multiset of
+    (item_id, correct) answers seen so far.
+    """
+    return (
+        session.current_module_index,
+        tuple(history.get(module_id, ()) for module_id in modules),
+    )
+
+
+def compile_decision_tree(
+    item_pool: Mapping[int, CandidateItem],
+    module_item_ids: Optional[Dict[str, List[int]]] = None,
+    max_depth: Optional[int] = None,
+    cfg: Optional[config.EngineConfig] = None,
+) -> DecisionTree:
+    """
+    Enumerate the adaptive decision tree for a bank and a configuration.
+
+    Parameters
+    ----------
+    item_pool       : item bank (a CompiledItemBank is fastest)
+    module_item_ids : items available per module; defaults to all items
+    max_depth       : number of items to compile (defaults to
+                      cfg.max_items_total); deeper answers are UNKNOWN.
+                      With cfg.rt_model only the opening item is compiled:
+                      later items depend on response times
+    cfg             : engine configuration (default: config.default_config())
+
+    Returns
+    -------
+    DecisionTree; empty if the engine issues no first item.
+    """
+    cfg = config.resolve(cfg)
+    if module_item_ids is None:
+        module_item_ids = {}
+        for item in item_pool.values():
+            module_item_ids.setdefault(item.module_id, []).append(item.id)
+    if max_depth is None:
+        max_depth = cfg.max_items_total
+    if cfg.rt_model:
+        max_depth = 0
+
+    tree = DecisionTree(fingerprint=engine_fingerprint(item_pool, cfg))
+    bank = compiled_bank.bank_for(item_pool, cfg)
+    started_at = datetime(2000, 1, 1)
+
+    start = orchestration_engine.start_new_test(
+        test_id=0,
+        module_item_ids=module_item_ids,
+        item_pool=item_pool,
+        started_at=started_at,
+        cfg=cfg,
+    )
+    if start.first_item is None:
+        return tree
+
+    # Each pending entry: (node index, session before answering, history, depth)
+    memo: Dict[Tuple, int] = {}
+
+    def add_node(session: SessionState, item: CandidateItem) -> int:
+        stats = session.modules[item.module_id]
+        gain = selection.cached_information_gain(stats, item.module_id, item, bank=bank, cfg=cfg)
+        tree.item_ids.append(item.id)
+        tree.module_index.append(session.current_module_index)
+        tree.gains.append(gain)
+        tree.child_correct.append(UNKNOWN)
+        tree.child_incorrect.append(UNKNOWN)
+        return len(tree.item_ids) - 1
+
+    root = add_node(start.session, start.first_item)
+    pending = [(root, start.session, {}, 1)]
+
+    while pending:
+        node, session, history, depth = pending.pop()
+        if depth > max_depth:
+            continue
+        item = item_pool[tree.item_ids[node]]
+
+        for is_correct in (True, False):
+            branch = copy.deepcopy(session)
+            result = orchestration_engine.process_response(
+                branch,
+                module_id=item.module_id,
+                item=item,
+                is_correct=is_correct,
+                rt_seconds=0.0,
+                response_timestamp=started_at,
+                item_pool=item_pool,
+                cfg=cfg,
+            )
+
+            if result.should_stop:
+                child = STOP
+            else:
+                branch_history = dict(history)
+                branch_history[item.module_id] = tuple(
+                    sorted(history.get(item.module_id, ()) + ((item.id, is_correct),))
+                )
+                key = _state_key(branch, branch_history, cfg.modules)
+                child = memo.get(key)
+                if child is None:
+                    child = add_node(branch, result.next_item)
+                    memo[key] = child
+                    pending.append((child, branch, branch_history, depth + 1))
+
+            if is_correct:
+                tree.child_correct[node] = child
+            else:
+                tree.child_incorrect[node] = child
+
+    return tree
+
+# app/ef_ads/decision_tree.py (append)
+
+def lookup_next(
+    tree: DecisionTree,
+    session: SessionState,
+    node: int,
+    is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Tuple[Optional[int], bool]:
+    """
+    Serve the decision after answering the item of `node`.
+
+    Must be called after the session's time has been updated.
+
+    Returns
+    -------
+    (child_node, resolved):
+      - (STOP, True)     : the test stops,
+      - (child, True)    : issue tree.item_ids[child],
+      - (None, False)    : the tree cannot answer (not compiled, time cap,
+                           or fatigue would drop the gain below
+                           MIN_INFO_GAIN); evaluate live.
+    """
+    child = tree.child(node, is_correct)
+    if child == STOP:
+        return STOP, True
+    if child == UNKNOWN:
+        return None, False
+
+    cfg = config.resolve(cfg)
+    if session.total_time_seconds / 60.0 >= cfg.max_test_time_min:
+        return None, False
+
+    fatigue_factor = rt_fatigue.compute_fatigue_factor(session.total_time_seconds, cfg)
+    if tree.gains[child] * fatigue_factor < cfg.min_info_gain:
+        return None, False
+
+    return child, True
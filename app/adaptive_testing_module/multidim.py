@@ -0,0 +1,242 @@
+# app/ef_ads/multidim.py
+
+"""
+Joint posterior across modules for EF-ADS (config.JOINT_THETA_POSTERIOR).
+
+Instead of one independent posterior per module, the session keeps a
+single tensor over the abilities of all modules, one axis per module in
+cfg.modules order (shape (G,) * M, SessionState.joint_theta_posterior):
+
+- Prior: the per-module priors (EngineConfig.theta_prior) coupled by a
+  Gaussian copula with the configured module correlations
+  (EngineConfig.module_correlation). Its marginals are fitted back to the
+  per-module priors, so a module on its own starts exactly as before; with
+  all correlations 0 the tensor is the product of the module priors and
+  every module behaves as in the independent model.
+- Update: a response multiplies the tensor by the item's likelihood row
+  along its module's axis. Each module's theta_posterior (and p_weak /
+  p_strong / entropy) is then the marginal of the tensor, so evidence in
+  one module also moves the correlated ones.
+
+A module posterior then depends on other modules' responses, so module
+histories are not recorded and the shared gain memo is not used.
+"""
+
+from __future__ import annotations
+from statistics import NormalDist
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from . import config
+from . import bayes_vec
+
+if TYPE_CHECKING:
+    from .state import SessionState
+
+# Largest joint tensor (grid points ** modules) accepted: 41 ** 3 cells is
+# about 0.5 MB per session, rewritten with every snapshot
+JOINT_THETA_MAX_CELLS: int = 41 ** 3
+
+# Marginal fitting (iterative proportional fitting) tolerance / iteration cap
+MARGINAL_FIT_TOLERANCE: float = 1e-12
+MARGINAL_FIT_MAX_ITERATIONS: int = 500
+
+_PRIOR_CACHE: dict = {}
+_COUPLED_CACHE: dict = {}
+
+# app/ef_ads/multidim.py (append)
+
+
+def check_supported(cfg: config.EngineConfig) -> None:
+    """
+    Raise ValueError if cfg combines the joint posterior with a mode it does
+    not support, or if its tensor would exceed JOINT_THETA_MAX_CELLS.
+    """
+    if cfg.posterior_backend != "numpy":
+        raise ValueError("The joint module posterior requires posterior_backend 'numpy'")
+    if cfg.rt_model:
+        raise ValueError("The joint module posterior cannot be combined with the RT model")
+    cells = len(cfg.theta_nodes) ** len(cfg.modules)
+    if cells > JOINT_THETA_MAX_CELLS:
+        raise ValueError(
+            f"The joint module posterior needs {cells} cells "
+            f"(at most {JOINT_THETA_MAX_CELLS}); use fewer THETA_QUADRATURE_POINTS"
+        )
+    correlation_matrix(cfg)
+
+
+def correlation_matrix(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    (M, M) module correlation matrix in cfg.modules order.
+
+    Raises ValueError if it is not positive definite.
+    """
+    cfg = config.resolve(cfg)
+    corr = np.array(
+        [[cfg.module_correlation(a, b) for b in cfg.modules] for a in cfg.modules],
+        dtype=np.float64,
+    )
+    try:
+        np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError as exc:
+        raise ValueError("MODULE_THETA_CORRELATION is not positive definite") from exc
+    return corr
+
+
+def _axis_shape(num_modules: int, axis: int, size: int) -> Tuple[int, ...]:
+    shape = [1] * num_modules
+    shape[axis] = size
+    return tuple(shape)
+
+
+def marginal(joint: np.ndarray, axis: int) -> np.ndarray:
+    """
+    Marginal of a joint tensor for the module on `axis`.
+    """
+    others = tuple(i for i in range(joint.ndim) if i != axis)
+    return joint.sum(axis=others)
+
+
+def marginals(joint: np.ndarray) -> np.ndarray:
+    """
+    (M, G) matrix of the per-module marginals of a joint tensor.
+    """
+    return np.stack([marginal(joint, axis) for axis in range(joint.ndim)])
+
+
+def fit_marginals(joint: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """
+    Rescale a positive tensor so that its module marginals equal the rows of
+    targets (iterative proportional fitting); the dependence structure
+    (odds ratios) of joint is kept.
+    """
+    fitted = joint / joint.sum()
+    grid_size = fitted.shape[0]
+    for _ in range(MARGINAL_FIT_MAX_ITERATIONS):
+        for axis in range(fitted.ndim):
+            current = marginal(fitted, axis)
+            scale = np.divide(targets[axis], current, out=np.zeros_like(current), where=current > 0.0)
+            fitted = fitted * scale.reshape(_axis_shape(fitted.ndim, axis, grid_size))
+        if np.max(np.abs(marginals(fitted) - targets)) < MARGINAL_FIT_TOLERANCE:
+            break
+    return fitted
+
+
+def joint_prior(cfg: Optional[config.EngineConfig] = None) -> np.ndarray:
+    """
+    Prior tensor over the module abilities (read-only, cached per grid,
+    prior and correlations).
+
+    Each module's grid point is mapped to a normal score through the
+    mid-point CDF of its prior, the scores are weighted by the Gaussian
+    copula density of the correlation matrix, and the marginals are fitted
+    back to the module priors.
+    """
+    cfg = config.resolve(cfg)
+    key = (cfg.modules, cfg.theta_nodes, cfg.theta_prior, cfg.module_theta_correlation)
+    prior = _PRIOR_CACHE.get(key)
+    if prior is None:
+        weights = bayes_vec.prior_array(cfg)
+        num_modules, grid_size = len(cfg.modules), weights.shape[0]
+        normal = NormalDist()
+        scores = np.array([normal.inv_cdf(u) for u in np.cumsum(weights) - 0.5 * weights])
+
+        # log copula density: -1/2 z^T (R^-1 - I) z, summed over module pairs
+        precision = np.linalg.inv(correlation_matrix(cfg)) - np.eye(num_modules)
+        log_density = np.zeros((grid_size,) * num_modules)
+        for i in range(num_modules):
+            z_i = scores.reshape(_axis_shape(num_modules, i, grid_size))
+            for j in range(num_modules):
+                z_j = scores.reshape(_axis_shape(num_modules, j, grid_size))
+                log_density = log_density - 0.5 * precision[i, j] * z_i * z_j
+        kernel = np.exp(log_density - log_density.max())
+        prior = fit_marginals(kernel, np.tile(weights, (num_modules, 1)))
+        prior.flags.writeable = False
+        _PRIOR_CACHE[key] = prior
+    return prior
+
+
+def coupled_modules(module_id: str, cfg: Optional[config.EngineConfig] = None) -> Tuple[int, ...]:
+    """
+    Axes (cfg.modules positions) of the modules whose posterior a response
+    in module_id can move: the module itself and every module linked to it
+    through a chain of non-zero correlations. Cached per configuration.
+    """
+    cfg = config.resolve(cfg)
+    key = (cfg.modules, cfg.module_theta_correlation, module_id)
+    axes = _COUPLED_CACHE.get(key)
+    if axes is None:
+        reached = {cfg.modules.index(module_id)}
+        frontier = list(reached)
+        while frontier:
+            a = cfg.modules[frontier.pop()]
+            for j, b in enumerate(cfg.modules):
+                if j not in reached and cfg.module_correlation(a, b) != 0.0:
+                    reached.add(j)
+                    frontier.append(j)
+        axes = tuple(sorted(reached))
+        _COUPLED_CACHE[key] = axes
+    return axes
+
+
+def joint_from_module_posteriors(
+    session: "SessionState",
+    cfg: Optional[config.EngineConfig] = None,
+) -> np.ndarray:
+    """
+    Joint tensor for a session that has none (restored from a snapshot
+    written without it): the prior, with its marginals fitted to the
+    current module posteriors.
+    """
+    cfg = config.resolve(cfg)
+    targets = np.array(
+        [np.asarray(session.modules[m].theta_posterior, dtype=np.float64) for m in cfg.modules]
+    )
+    return fit_marginals(joint_prior(cfg), targets)
+
+
+def propagate_response(
+    session: "SessionState",
+    module_id: str,
+    likelihood: bayes_vec.ArrayLike,
+    cfg: Optional[config.EngineConfig] = None,
+) -> None:
+    """
+    Apply a response's likelihood row (over the theta grid of module_id)
+    to the session's joint tensor and refresh the posterior, weak/strong
+    summary and ability estimates of every module coupled to it from the
+    new marginals.
+
+    The tensor must reflect the module posteriors before the response
+    (SessionState.initialise creates it; see joint_from_module_posteriors
+    for sessions restored without one).
+    """
+    cfg = config.resolve(cfg)
+    joint = session.joint_theta_posterior
+    axis = cfg.modules.index(module_id)
+    row = np.asarray(likelihood, dtype=np.float64)
+    joint = joint * row.reshape(_axis_shape(joint.ndim, axis, row.shape[0]))
+    total = joint.sum()
+    if total > 0.0:
+        joint /= total
+    else:
+        joint = joint_prior(cfg).copy()
+    session.joint_theta_posterior = joint
+
+    axes = coupled_modules(module_id, cfg)
+    posteriors = np.stack([marginal(joint, i) for i in axes])
+    p_weak, p_strong = bayes_vec.derive_weak_strong_probs(posteriors, cfg)
+    entropy = bayes_vec.entropy_weak_strong(p_weak, p_strong)
+    estimates = bayes_vec.theta_estimates(posteriors, cfg)
+    for i, axis in enumerate(axes):
+        stats = session.modules[cfg.modules[axis]]
+        stats.theta_posterior = posteriors[i]
+        stats.p_weak = float(p_weak[i])
+        stats.p_strong = float(p_strong[i])
+        stats.entropy = float(entropy[i])
+        stats.theta_eap = float(estimates.eap[i])
+        stats.theta_map = float(estimates.map[i])
+        stats.theta_sd = float(estimates.sd[i])
+        if cfg.log_space_posterior:
+            stats.log_theta_posterior = bayes_vec.log_posterior_from(posteriors[i])
@@ -14,16 +14,21 @@ These functions are what the FastAPI layer should call.
 
 from __future__ import annotations
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Dict, Optional
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
 
 from .state import SessionState
 from .selection import CandidateItem, select_next_item_for_module
 from . import bayes
+from . import bayes_vec
 from . import rt_fatigue
 from . import stopping
 from . import risk
 from . import config
+from . import compiled_bank
+from . import decision_tree as dtree
+from . import multidim
+from . import selection
 
 # app/ef_ads/engine.py (append)
 
@@ -31,6 +36,7 @@ def initialise_session(
     test_id: int,
     module_item_ids: Dict[str, list[int]],
     started_at: Optional[datetime] = None,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> SessionState:
     """
     Initialise a new EF-ADS SessionState for a given test.
@@ -41,6 +47,7 @@ def initialise_session(
     module_item_ids : mapping module_id -> list of item ids available
                       for that module in this test
     started_at      : optional start time; defaults to utcnow
+    cfg             : engine configuration (default: config.default_config())
 
     Returns
     -------
@@ -50,12 +57,16 @@ def initialise_session(
         test_id=test_id,
         started_at=started_at,
         module_item_ids=module_item_ids,
+        cfg=cfg,
     )
     return session
 
 # app/ef_ads/engine.py (append)
 
-def choose_next_module(session: SessionState) -> Optional[str]:
+def choose_next_module(
+    session: SessionState,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Optional[str]:
     """
     Decide which module to administer next.
 
@@ -64,7 +75,8 @@ def choose_next_module(session: SessionState) -> Optional[str]:
     - Skip modules that are already 'settled'.
     - If no unsettled modules remain, return None.
     """
-    module_ids = config.MODULES
+    cfg = config.resolve(cfg)
+    module_ids = cfg.modules
     n = len(module_ids)
     if n == 0:
         return None
@@ -78,7 +90,7 @@ def choose_next_module(session: SessionState) -> Optional[str]:
         if stats is None:
             continue
 
-        if not stopping.is_module_settled(stats) and stats.items_remaining:
+        if not stopping.is_module_settled(stats, cfg) and stats.items_remaining:
             # Update current index and return chosen module
             session.current_module_index = idx
             return module_id
@@ -97,7 +109,7 @@ class ProcessResponseResult:
 
 # app/ef_ads/engine.py (append)
 
-def process_response(
+def apply_response(
     session: SessionState,
     *,
     module_id: str,
@@ -106,32 +118,59 @@ def process_response(
     rt_seconds: float,
     response_timestamp: Optional[datetime],
     item_pool: Dict[int, CandidateItem],
-) -> ProcessResponseResult:
+    cfg: Optional[config.EngineConfig] = None,
+) -> None:
     """
-    Process a single item response and decide next action.
-
-    Steps:
-    - Update session time.
-    - Update Bayesian posterior and entropy for the module.
-    - Update RT statistics for the module.
-    - Remove the administered item from items_remaining.
-    - Check global stopping rules.
-    - If stopping: compute global risk and return no next item.
-    - Else: choose next module and next item.
+    Apply one response to the session state, without any decision:
+    time, Bayesian posterior, RT statistics, items_remaining and the
+    module's risk classification. Under cfg.joint_theta_posterior the
+    response also moves the posteriors (and classifications) of the other
+    modules.
+
+    This is the state-changing part of process_response, shared with
+    replay_events.
     """
+    cfg = config.resolve(cfg)
+
     # 1) Update time
     now = response_timestamp or datetime.utcnow()
     rt_fatigue.update_session_time(session, now)
 
     module_stats = session.modules[module_id]
 
-    # 2) Bayesian update
+    # 2) Bayesian update (precomputed likelihood row if item_pool is compiled;
+    #    joint with the RT likelihood under cfg.rt_model)
+    bank = compiled_bank.bank_for(item_pool, cfg)
+    in_bank = bank is not None and item.id in bank
+    if cfg.joint_theta_posterior and (
+        session.joint_theta_posterior is None or tuple(session.modules) != cfg.modules
+    ):
+        # No tensor yet, or its axes follow another module order (restored
+        # after the module list changed)
+        session.joint_theta_posterior = multidim.joint_from_module_posteriors(session, cfg)
+    speed_likelihood = None
+    if cfg.rt_model:
+        speed_likelihood = bayes_vec.rt_likelihood(rt_seconds, item.max_time_seconds, module_id, cfg)
     bayes.update_module_stats_for_item(
         module_stats=module_stats,
         module_id=module_id,
         item_difficulty=item.difficulty,
         is_correct=is_correct,
+        likelihood=bank.likelihood(item.id, is_correct) if in_bank else None,
+        log_likelihood=bank.log_likelihood(item.id, is_correct) if in_bank else None,
+        speed_likelihood=speed_likelihood,
+        cfg=cfg,
+        discrimination=item.discrimination,
+        guessing=item.guessing,
     )
+    if cfg.joint_theta_posterior:
+        if in_bank:
+            likelihood = bank.likelihood(item.id, is_correct)
+        else:
+            b, a, c = selection.item_parameters(item, cfg)
+            p_c = bayes_vec.prob_correct_grid(a, b, cfg, c)
+            likelihood = p_c if is_correct else 1.0 - p_c
+        multidim.propagate_response(session, module_id, likelihood, cfg)
 
     # 3) RT stats update
     rt_fatigue.update_module_rt_stats(
@@ -139,18 +178,108 @@ def process_response(
         rt_seconds=rt_seconds,
         max_time_seconds=item.max_time_seconds,
         is_correct=is_correct,
+        cfg=cfg,
+    )
+
+    # 4) Remove item from remaining set
+    module_stats.items_remaining.discard(item.id)
+
+    # 5) Re-classify the module (all modules, if they share a joint
+    #    posterior) for the running risk estimate
+    if cfg.joint_theta_posterior:
+        for other_id in cfg.modules:
+            risk.update_module_risk(session, other_id, cfg)
+    else:
+        risk.update_module_risk(session, module_id, cfg)
+
+# app/ef_ads/engine.py (append)
+
+def process_response(
+    session: SessionState,
+    *,
+    module_id: str,
+    item: CandidateItem,
+    is_correct: bool,
+    rt_seconds: float,
+    response_timestamp: Optional[datetime],
+    item_pool: Dict[int, CandidateItem],
+    decision_tree: Optional["dtree.DecisionTree"] = None,
+    cfg: Optional[config.EngineConfig] = None,
+) -> ProcessResponseResult:
+    """
+    Process a single item response and decide next action.
+
+    If a compiled decision_tree is given and the session is still on it
+    (session.tree_node, whose item must be the one just answered, on the
+    tree with fingerprint session.tree_fingerprint), the stopping decision
+    and next item are read from the tree; the session leaves the tree for
+    good as soon as the tree cannot answer (depth limit, time cap,
+    fatigue) or is not the tree it started on (bank or config changed).
+
+    Steps:
+    - Update session time.
+    - Update Bayesian posterior and entropy for the module.
+    - Update RT statistics for the module.
+    - Remove the administered item from items_remaining.
+    - Check global stopping rules.
+    - If stopping: read the global risk (risk.current_risk) and return no next item.
+    - Else: choose next module and next item.
+
+    All rules run under cfg (default: config.default_config()).
+    """
+    cfg = config.resolve(cfg)
+
+    # 1-5) Time, posterior, RT statistics, items_remaining, module risk
+    apply_response(
+        session,
+        module_id=module_id,
+        item=item,
+        is_correct=is_correct,
+        rt_seconds=rt_seconds,
+        response_timestamp=response_timestamp,
+        item_pool=item_pool,
+        cfg=cfg,
     )
 
-    # 4) Remove item from remaining list
-    if item.id in module_stats.items_remaining:
-        module_stats.items_remaining.remove(item.id)
+    # 4b) Serve from the precompiled decision tree when possible
+    if (
+        decision_tree is not None
+        and session.tree_node is not None
+        and session.tree_fingerprint == decision_tree.fingerprint
+        and session.tree_node < len(decision_tree)
+        and decision_tree.item_ids[session.tree_node] == item.id
+    ):
+        child, resolved = dtree.lookup_next(
+            decision_tree, session, session.tree_node, is_correct, cfg
+        )
+        if resolved and child == dtree.STOP:
+            session.tree_node = None
+            session.tree_fingerprint = None
+            session.stopped = True
+            return ProcessResponseResult(
+                session=session,
+                should_stop=True,
+                next_item=None,
+                global_risk=risk.current_risk(session, cfg),
+            )
+        if resolved:
+            session.tree_node = child
+            session.current_module_index = decision_tree.module_index[child]
+            return ProcessResponseResult(
+                session=session,
+                should_stop=False,
+                next_item=item_pool[decision_tree.item_ids[child]],
+                global_risk=None,
+            )
+    session.tree_node = None
+    session.tree_fingerprint = None
 
     # 5) Check global stopping rules
-    should_stop = stopping.should_stop_globally(session, item_pool=item_pool)
+    should_stop = stopping.should_stop_globally(session, item_pool=item_pool, cfg=cfg)
 
     if should_stop:
         session.stopped = True
-        global_risk = risk.compute_global_risk(session)
+        global_risk = risk.current_risk(session, cfg)
         return ProcessResponseResult(
             session=session,
             should_stop=True,
@@ -159,11 +288,11 @@ def process_response(
         )
 
     # 6) Choose next module and item
-    next_module_id = choose_next_module(session)
+    next_module_id = choose_next_module(session, cfg)
     if next_module_id is None:
         # Edge case: no modules available but stopping rules did not trigger
         session.stopped = True
-        global_risk = risk.compute_global_risk(session)
+        global_risk = risk.current_risk(session, cfg)
         return ProcessResponseResult(
             session=session,
             should_stop=True,
@@ -175,12 +304,13 @@ def process_response(
         session=session,
         module_id=next_module_id,
         item_pool=item_pool,
+        cfg=cfg,
     )
 
     if next_item is None:
         # No item with sufficient information gain; treat as stop.
         session.stopped = True
-        global_risk = risk.compute_global_risk(session)
+        global_risk = risk.current_risk(session, cfg)
         return ProcessResponseResult(
             session=session,
             should_stop=True,
@@ -209,23 +339,38 @@ def start_new_test(
     module_item_ids: Dict[str, list[int]],
     item_pool: Dict[int, CandidateItem],
     started_at: Optional[datetime] = None,
+    decision_tree: Optional["dtree.DecisionTree"] = None,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> StartTestResult:
     """
     Initialise a new session and select the first item to administer.
 
     The first module is chosen using choose_next_module (starting at index 0),
     and the first item is selected using entropy-based item selection.
+    With a non-empty decision_tree, the opening item is read from its root
+    and the session is placed on the tree.
     """
+    cfg = config.resolve(cfg)
     session = initialise_session(
         test_id=test_id,
         module_item_ids=module_item_ids,
         started_at=started_at,
+        cfg=cfg,
     )
 
+    if decision_tree is not None and len(decision_tree) > 0:
+        session.tree_node = 0
+        session.tree_fingerprint = decision_tree.fingerprint
+        session.current_module_index = decision_tree.module_index[0]
+        return StartTestResult(
+            session=session,
+            first_item=item_pool[decision_tree.item_ids[0]],
+        )
+
     # Set current_module_index to 0 initially
     session.current_module_index = 0
 
-    first_module_id = choose_next_module(session)
+    first_module_id = choose_next_module(session, cfg)
     if first_module_id is None:
         return StartTestResult(session=session, first_item=None)
 
@@ -233,12 +378,127 @@ def start_new_test(
         session=session,
         module_id=first_module_id,
         item_pool=item_pool,
+        cfg=cfg,
     )
 
     return StartTestResult(session=session, first_item=first_item)
 
 # app/ef_ads/engine.py (append)
 
+@dataclass
+class SpeculativeNextItems:
+    """
+    Next item for each possible outcome of the item currently on screen.
+    None means the test would stop after that outcome.
+    """
+    if_correct: Optional[CandidateItem]
+    if_incorrect: Optional[CandidateItem]
+
+
+def speculate_next_items(
+    session: SessionState,
+    *,
+    item: CandidateItem,
+    item_pool: Dict[int, CandidateItem],
+    expected_rt_seconds: Optional[float] = None,
+    response_timestamp: Optional[datetime] = None,
+    decision_tree: Optional["dtree.DecisionTree"] = None,
+    cfg: Optional[config.EngineConfig] = None,
+) -> SpeculativeNextItems:
+    """
+    Pre-compute the next item for both outcomes of the item just issued.
+
+    Correctness is the only unknown that drives selection; RT only feeds the
+    RT statistics, and elapsed time only matters through the fatigue factor
+    and the time cap. Both branches are run through process_response on
+    copy-on-write branches of the session (SessionState.branch; with
+    decision_tree, if given), assuming a response after expected_rt_seconds
+    (default: half of item.max_time_seconds). The live session is untouched
+    and stays authoritative when the real answer arrives.
+    """
+    cfg = config.resolve(cfg)
+    if expected_rt_seconds is None:
+        expected_rt_seconds = 0.5 * item.max_time_seconds
+    issued_at = response_timestamp or datetime.utcnow()
+    answered_at = issued_at + timedelta(seconds=expected_rt_seconds)
+
+    # Modules a response to item can change
+    changed = [item.module_id]
+    if cfg.joint_theta_posterior:
+        changed = [cfg.modules[axis] for axis in multidim.coupled_modules(item.module_id, cfg)]
+
+    outcomes: Dict[bool, Optional[CandidateItem]] = {}
+    for is_correct in (True, False):
+        branch = session.branch(changed)
+        result = process_response(
+            branch,
+            module_id=item.module_id,
+            item=item,
+            is_correct=is_correct,
+            rt_seconds=expected_rt_seconds,
+            response_timestamp=answered_at,
+            item_pool=item_pool,
+            decision_tree=decision_tree,
+            cfg=cfg,
+        )
+        outcomes[is_correct] = result.next_item
+
+    return SpeculativeNextItems(if_correct=outcomes[True], if_incorrect=outcomes[False])
+
+# app/ef_ads/engine.py (append)
+
+@dataclass
+class ResponseEvent:
+    """
+    One recorded response: everything apply_response needs to reproduce it.
+    """
+    item: CandidateItem
+    is_correct: bool
+    rt_seconds: float
+    timestamp: datetime
+
+
+def replay_events(
+    session: SessionState,
+    events: Sequence[ResponseEvent],
+    item_pool: Dict[int, CandidateItem],
+    cfg: Optional[config.EngineConfig] = None,
+) -> SessionState:
+    """
+    Rebuild an in-progress session by applying recorded responses, in
+    order, to a starting state (initial session or checkpoint).
+
+    Only the state updates are replayed: the module the live engine moved
+    to after each response is the module of the next recorded item, and
+    after the last one choose_next_module is applied as process_response
+    would. Replays under cfg (default: the active config), so a test can
+    be rebuilt exactly, or re-scored under another configuration.
+    """
+    cfg = config.resolve(cfg)
+    for position, event in enumerate(events):
+        apply_response(
+            session,
+            module_id=event.item.module_id,
+            item=event.item,
+            is_correct=event.is_correct,
+            rt_seconds=event.rt_seconds,
+            response_timestamp=event.timestamp,
+            item_pool=item_pool,
+            cfg=cfg,
+        )
+        session.tree_node = None
+        session.tree_fingerprint = None
+        if position + 1 < len(events):
+            next_module_id = events[position + 1].item.module_id
+            if next_module_id in cfg.modules:
+                session.current_module_index = cfg.modules.index(next_module_id)
+
+    if events:
+        choose_next_module(session, cfg)
+    return session
+
+# app/ef_ads/engine.py (append)
+
 # def continue_test(
 #     session: SessionState,
 #     item_pool: Dict[int, CandidateItem],
@@ -0,0 +1,125 @@
+# app/ef_ads/quadrature.py
+
+"""
+Adaptive theta quadrature for EF-ADS.
+
+With config.THETA_QUADRATURE_POINTS > 0 the engine replaces the coarse
+THETA_GRID by a finer, non-uniform set of nodes (EngineConfig.theta_nodes):
+
+- The range [THETA_GRID[0], THETA_GRID[-1]] is cut into cells at the
+  THETA_GRID points and at THETA_WEAK_THRESHOLD, so the weak/strong split
+  always falls on a cell boundary and p_weak is exactly the posterior mass
+  of the cells below the threshold.
+- Cells are refined by bisection, always splitting the cell that carries
+  the most reference mass, until the point budget is reached. The
+  reference is where module posteriors concentrate across the screened
+  population, the Normal(THETA_PRIOR_MEAN, THETA_PRIOR_VAR) ability
+  distribution, mixed with a uniform share (THETA_QUADRATURE_FLOOR) so the
+  tails keep some resolution.
+- Nodes are the cell midpoints. The prior mass of a node is its cell width
+  over the range: the uniform prior of the coarse grid, carried over to the
+  refined cells (EngineConfig.theta_prior).
+
+The construction is deterministic, so a posterior on the quadrature is
+still a function of the configuration and the response history, as
+selection.SharedGainMemo and the decision tree assume.
+"""
+
+from __future__ import annotations
+import heapq
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Tuple
+
+# Supported quadrature sizes (THETA_QUADRATURE_POINTS, when enabled)
+MIN_QUADRATURE_POINTS: int = 41
+MAX_QUADRATURE_POINTS: int = 201
+
+# app/ef_ads/quadrature.py (append)
+
+
+@dataclass(frozen=True)
+class ThetaQuadrature:
+    """
+    Refined theta quadrature.
+
+    edges   : cell boundaries, ascending (len(nodes) + 1 values)
+    nodes   : cell midpoints, the theta values the posterior lives on
+    weights : prior mass per node (cell width / range; sums to 1)
+    """
+    edges: Tuple[float, ...]
+    nodes: Tuple[float, ...]
+    weights: Tuple[float, ...]
+
+
+def _normal_cdf(x: float, mean: float, sd: float) -> float:
+    return 0.5 * (1.0 + math.erf((x - mean) / (sd * math.sqrt(2.0))))
+
+
+@lru_cache(maxsize=32)
+def build_quadrature(
+    grid: Tuple[float, ...],
+    threshold: float,
+    points: int,
+    prior_mean: float = 0.0,
+    prior_var: float = 1.0,
+    floor: float = 0.2,
+) -> ThetaQuadrature:
+    """
+    Refine the coarse grid into `points` cells (see module docstring).
+
+    Parameters
+    ----------
+    grid       : coarse theta grid (THETA_GRID); its ends bound the range
+    threshold  : weak/strong threshold, made a cell boundary when inside
+    points     : number of nodes, MIN_QUADRATURE_POINTS..MAX_QUADRATURE_POINTS
+    prior_mean : mean of the reference ability distribution
+    prior_var  : variance of the reference ability distribution
+    floor      : uniform share of the reference mass, in [0, 1]
+
+    Raises
+    ------
+    ValueError for an unsupported number of points or a degenerate grid.
+    """
+    if not MIN_QUADRATURE_POINTS <= points <= MAX_QUADRATURE_POINTS:
+        raise ValueError(
+            f"THETA_QUADRATURE_POINTS must be 0 or between {MIN_QUADRATURE_POINTS} "
+            f"and {MAX_QUADRATURE_POINTS}, got {points}"
+        )
+    lo, hi = float(min(grid)), float(max(grid))
+    if not hi > lo:
+        raise ValueError("THETA_GRID must span a non-empty range")
+
+    initial = set(float(t) for t in grid)
+    if lo < threshold < hi:
+        initial.add(float(threshold))
+    edges = sorted(initial)
+    if len(edges) - 1 > points:
+        raise ValueError(f"THETA_GRID has more than {points} cells")
+
+    span = hi - lo
+    sd = math.sqrt(prior_var)
+
+    def mass(left: float, right: float) -> float:
+        normal = _normal_cdf(right, prior_mean, sd) - _normal_cdf(left, prior_mean, sd)
+        return floor * (right - left) / span + (1.0 - floor) * normal
+
+    # Max-heap of cells by reference mass; ties split the leftmost cell first
+    heap: List[Tuple[float, float, float]] = [
+        (-mass(left, right), left, right) for left, right in zip(edges, edges[1:])
+    ]
+    heapq.heapify(heap)
+    while len(heap) < points:
+        _, left, right = heapq.heappop(heap)
+        mid = 0.5 * (left + right)
+        heapq.heappush(heap, (-mass(left, mid), left, mid))
+        heapq.heappush(heap, (-mass(mid, right), mid, right))
+
+    cells = sorted((left, right) for _, left, right in heap)
+    return ThetaQuadrature(
+        edges=tuple(left for left, _ in cells) + (cells[-1][1],),
+        nodes=tuple(0.5 * (left + right) for left, right in cells),
+        weights=tuple((right - left) / span for left, right in cells),
+    )
+
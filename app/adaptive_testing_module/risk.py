@@ -12,8 +12,8 @@ with explicit, theory-driven rules.[web:591][web:594]
 """
 
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Literal
+from dataclasses import dataclass, field
+from typing import Dict, Literal, Optional
 
 from . import config
 from .state import SessionState, ModuleStats
@@ -23,7 +23,7 @@ from .state import SessionState, ModuleStats
 ModuleLabel = Literal["weak", "strong", "uncertain"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ModuleClassification:
     module_id: str
     label: ModuleLabel
@@ -34,16 +34,25 @@ class ModuleClassification:
     avg_rt: float
     slow_correct_ratio: float
     rapid_guess_ratio: float
+    theta_eap: Optional[float] = None
+    theta_map: Optional[float] = None
+    theta_sd: Optional[float] = None
 
 # app/ef_ads/risk.py (append)
 
-def classify_module(module_id: str, stats: ModuleStats) -> ModuleClassification:
+def classify_module(
+    module_id: str,
+    stats: ModuleStats,
+    cfg: Optional[config.EngineConfig] = None,
+) -> ModuleClassification:
     """
     Classify a module as weak / strong / uncertain based on posterior
     probabilities and entropy, and compute basic RT ratios.
     """
+    cfg = config.resolve(cfg)
+
     # Determine label
-    if stats.entropy <= config.ENTROPY_THRESHOLD and max(stats.p_weak, stats.p_strong) >= config.P_CONFIDENT:
+    if stats.entropy <= cfg.entropy_threshold and max(stats.p_weak, stats.p_strong) >= cfg.p_confident:
         label: ModuleLabel = "weak" if stats.p_weak > stats.p_strong else "strong"
     else:
         label = "uncertain"
@@ -67,61 +76,80 @@ def classify_module(module_id: str, stats: ModuleStats) -> ModuleClassification:
         avg_rt=avg_rt,
         slow_correct_ratio=slow_correct_ratio,
         rapid_guess_ratio=rapid_guess_ratio,
+        theta_eap=stats.theta_eap,
+        theta_map=stats.theta_map,
+        theta_sd=stats.theta_sd,
     )
 
 # app/ef_ads/risk.py (append)
 
-@dataclass
+# p_weak threshold for the single-module (PA or RAN) deficit override
+SINGLE_DEFICIT_THRESHOLD = 0.80
+
+
+@dataclass(slots=True)
 class GlobalRiskResult:
+    """
+    Global risk outcome. The explanation dict is built on first access
+    (see build_explanation_object), so results that are only used for
+    their category and score never format report strings.
+    """
     risk_category: Literal["high", "moderate", "low"]
     risk_score: float
     confidence: float
     modules: Dict[str, ModuleClassification]
-    explanation: Dict
+    _explanation: Optional[Dict] = field(default=None, repr=False, compare=False)
+    _cfg: Optional[config.EngineConfig] = field(default=None, repr=False, compare=False)
+
+    @property
+    def explanation(self) -> Dict:
+        if self._explanation is None:
+            self._explanation = build_explanation_object(
+                self.risk_category, self.risk_score, self.confidence, self.modules, self._cfg
+            )
+        return self._explanation
 
 # app/ef_ads/risk.py (append)
 
-def compute_global_risk(session: SessionState) -> GlobalRiskResult:
+def aggregate_risk(
+    module_results: Dict[str, ModuleClassification],
+    cfg: Optional[config.EngineConfig] = None,
+) -> GlobalRiskResult:
     """
-    Compute global dyslexia risk category and explanation based on
-    per-module classifications and RT patterns.
+    Combine per-module classifications into the global risk category,
+    score and confidence (explanation built lazily).
     """
-    # 1) Build per-module classifications
-    module_results: Dict[str, ModuleClassification] = {}
-    for module_id, stats in session.modules.items():
-        module_results[module_id] = classify_module(module_id, stats)
+    cfg = config.resolve(cfg)
 
-    # 2) Base risk score from weak probabilities (weighted)
+    # 1) Base risk score from weak probabilities (weighted)
     base_score = 0.0
     for module_id, mc in module_results.items():
-        w = config.MODULE_WEIGHTS.get(module_id, 0.0)
+        w = cfg.module_weight(module_id)
         base_score += w * mc.p_weak
 
-    # 3) RT-based adjustment (e.g., slow RAN)
+    # 2) RT-based adjustment (e.g., slow RAN); the joint RT model already
+    #    carries response times into p_weak
     rt_adjustment = 0.0
     ran_res = module_results.get("ran")
-    if ran_res is not None:
+    if ran_res is not None and not cfg.rt_model:
         # If RAN is slow but not already classified weak, bump risk slightly
         if ran_res.slow_correct_ratio > 0.5 and ran_res.label != "weak":
             rt_adjustment += 0.05
 
     risk_score = max(0.0, min(1.0, base_score + rt_adjustment))
 
-    # 4) Map risk_score to category (initial)
-    if risk_score >= config.RISK_SCORE_HIGH:
+    # 3) Map risk_score to category (initial)
+    if risk_score >= cfg.risk_score_high:
         category: Literal["high", "moderate", "low"] = "high"
-    elif risk_score >= config.RISK_SCORE_MODERATE:
+    elif risk_score >= cfg.risk_score_moderate:
         category = "moderate"
     else:
         category = "low"
 
     # ------------------------------------------------------------------
-    # 5) SINGLE‑DEFICIT OVERRIDE
+    # 4) SINGLE‑DEFICIT OVERRIDE
     # ------------------------------------------------------------------
-    SINGLE_DEFICIT_THRESHOLD = 0.80  # p_weak threshold for single-module override
-
     pa_res = module_results.get("phonemic_awareness")
-    ran_res = module_results.get("ran")
 
     pa_p_weak = pa_res.p_weak if pa_res is not None else 0.0
     ran_p_weak = ran_res.p_weak if ran_res is not None else 0.0
@@ -135,27 +163,127 @@ def compute_global_risk(session: SessionState) -> GlobalRiskResult:
     # bump to at least "moderate".
     if single_deficit_detected and category == "low":
         category = "moderate"
-        risk_score = max(risk_score, config.RISK_SCORE_MODERATE + 0.01)
+        risk_score = max(risk_score, cfg.risk_score_moderate + 0.01)
     # ------------------------------------------------------------------
 
-    # 6) Confidence from entropy
+    # 5) Confidence from entropy
     avg_entropy = (
-        sum(m.entropy for m in session.modules.values())
-        / max(len(session.modules), 1)
+        sum(mc.entropy for mc in module_results.values())
+        / max(len(module_results), 1)
     )
     confidence = max(0.0, min(1.0, 1.0 - avg_entropy))
 
-    explanation = build_explanation_object(category, risk_score, confidence, module_results)
-
     return GlobalRiskResult(
         risk_category=category,
         risk_score=risk_score,
         confidence=confidence,
         modules=module_results,
-        explanation=explanation,
+        _cfg=cfg,
     )
 
 
+def compute_global_risk(
+    session: SessionState,
+    cfg: Optional[config.EngineConfig] = None,
+) -> GlobalRiskResult:
+    """
+    Compute global dyslexia risk category and explanation based on
+    per-module classifications and RT patterns.
+
+    Classifies every module from scratch; use current_risk for a session
+    whose risk is maintained incrementally.
+    """
+    cfg = config.resolve(cfg)
+    module_results: Dict[str, ModuleClassification] = {}
+    for module_id, stats in session.modules.items():
+        module_results[module_id] = classify_module(module_id, stats, cfg)
+    return aggregate_risk(module_results, cfg)
+
+# app/ef_ads/risk.py (append)
+
+class RiskTracker:
+    """
+    Per-session module classifications, kept current one module at a time.
+
+    update(module_id) re-classifies only the module whose statistics
+    changed; result() aggregates the stored classifications (once per
+    change), giving exactly what compute_global_risk would return.
+    """
+
+    __slots__ = ("cfg", "modules", "_result")
+
+    def __init__(self, session: SessionState, cfg: config.EngineConfig) -> None:
+        self.cfg = cfg
+        self.modules: Dict[str, ModuleClassification] = {
+            module_id: classify_module(module_id, stats, cfg)
+            for module_id, stats in session.modules.items()
+        }
+        self._result: Optional[GlobalRiskResult] = None
+
+    def update(self, session: SessionState, module_id: str) -> None:
+        self.modules[module_id] = classify_module(module_id, session.modules[module_id], self.cfg)
+        self._result = None
+
+    def result(self) -> GlobalRiskResult:
+        if self._result is None:
+            self._result = aggregate_risk(dict(self.modules), self.cfg)
+        return self._result
+
+    def __deepcopy__(self, memo: Dict) -> "RiskTracker":
+        # Classifications and results are replaced, never mutated: sharing
+        # them is safe
+        tracker = RiskTracker.__new__(RiskTracker)
+        tracker.cfg = self.cfg
+        tracker.modules = dict(self.modules)
+        tracker._result = self._result
+        return tracker
+
+
+def _tracker(session: SessionState, cfg: config.EngineConfig) -> Optional[RiskTracker]:
+    """
+    The session's tracker if it is current for cfg, else None.
+    """
+    tracker = session.risk_tracker
+    if tracker is None or (tracker.cfg is not cfg and tracker.cfg != cfg):
+        return None
+    return tracker
+
+
+def update_module_risk(
+    session: SessionState,
+    module_id: str,
+    cfg: Optional[config.EngineConfig] = None,
+) -> None:
+    """
+    Re-classify one module after its statistics changed (called by the
+    engine after every response). A session without a current tracker
+    gets one built from all modules.
+    """
+    cfg = config.resolve(cfg)
+    tracker = _tracker(session, cfg)
+    if tracker is None:
+        session.risk_tracker = RiskTracker(session, cfg)
+    else:
+        tracker.update(session, module_id)
+
+
+def current_risk(
+    session: SessionState,
+    cfg: Optional[config.EngineConfig] = None,
+) -> GlobalRiskResult:
+    """
+    Global risk for the session's current state, from its incrementally
+    maintained classifications (cheap enough to call after every response,
+    e.g. for live display). Falls back to a full classification when the
+    session has no current tracker (e.g. restored from a snapshot).
+    """
+    cfg = config.resolve(cfg)
+    tracker = _tracker(session, cfg)
+    if tracker is None:
+        tracker = session.risk_tracker = RiskTracker(session, cfg)
+    return tracker.result()
+
+
 # app/ef_ads/risk.py (append)
 
 def build_explanation_object(
@@ -163,18 +291,20 @@ def build_explanation_object(
     risk_score: float,
     confidence: float,
     module_results: Dict[str, ModuleClassification],
+    cfg: Optional[config.EngineConfig] = None,
 ) -> Dict:
     """
     Construct a structured explanation dictionary for reporting.
 
     Includes:
     - Global summary
-    - Per-module details
+    - Per-module details (including the ability estimates)
     - Simple RT-related notes
     """
+    cfg = config.resolve(cfg)
     module_details = {}
     for module_id, mc in module_results.items():
-        label = config.MODULE_LABELS.get(module_id, module_id)
+        label = cfg.module_label(module_id)
         notes = []
 
         if mc.label == "weak":
@@ -209,6 +339,9 @@ def build_explanation_object(
             "avg_rt": mc.avg_rt,
             "slow_correct_ratio": mc.slow_correct_ratio,
             "rapid_guess_ratio": mc.rapid_guess_ratio,
+            "theta_eap": mc.theta_eap,
+            "theta_map": mc.theta_map,
+            "theta_sd": mc.theta_sd,
             "notes": notes,
         }
 
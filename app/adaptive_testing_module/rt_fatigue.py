@@ -11,7 +11,7 @@ Response-time and fatigue modeling for EF-ADS.
 from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Tuple
+from typing import Optional, Tuple
 
 from . import config
 from .state import SessionState, ModuleStats
@@ -22,6 +22,7 @@ def classify_response_time(
     rt_seconds: float,
     max_time_seconds: float,
     is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> Tuple[bool, bool]:
     """
     Classify a response into slow-but-correct and rapid-guess flags.
@@ -31,6 +32,7 @@ def classify_response_time(
     rt_seconds       : observed response time for this item
     max_time_seconds : expected/allowed maximum time for this item
     is_correct       : correctness of the response
+    cfg              : engine configuration (default: config.default_config())
 
     Returns
     -------
@@ -40,14 +42,16 @@ def classify_response_time(
     if max_time_seconds <= 0:
         return False, False
 
+    cfg = config.resolve(cfg)
+
     # "Slow but correct": correct answer, RT substantially above expected max
     is_slow_correct = is_correct and (
-        rt_seconds > config.SLOW_RT_FACTOR * max_time_seconds
+        rt_seconds > cfg.slow_rt_factor * max_time_seconds
     )
 
     # "Rapid guess": very fast response relative to max_time and incorrect
     is_rapid_guess = (not is_correct) and (
-        rt_seconds < config.RAPID_GUESS_FRACTION * max_time_seconds
+        rt_seconds < cfg.rapid_guess_fraction * max_time_seconds
     )
 
     return is_slow_correct, is_rapid_guess
@@ -59,6 +63,7 @@ def update_module_rt_stats(
     rt_seconds: float,
     max_time_seconds: float,
     is_correct: bool,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> None:
     """
     Update response-time-related statistics for a module after one item.
@@ -71,6 +76,7 @@ def update_module_rt_stats(
         rt_seconds=rt_seconds,
         max_time_seconds=max_time_seconds,
         is_correct=is_correct,
+        cfg=cfg,
     )
 
     module_stats.sum_rt += rt_seconds
@@ -85,7 +91,10 @@ def update_module_rt_stats(
 
 # app/ef_ads/rt_fatigue.py (append)
 
-def compute_fatigue_factor(total_time_seconds: float) -> float:
+def compute_fatigue_factor(
+    total_time_seconds: float,
+    cfg: Optional[config.EngineConfig] = None,
+) -> float:
     """
     Compute a multiplicative fatigue factor based on total test time.
 
@@ -94,14 +103,16 @@ def compute_fatigue_factor(total_time_seconds: float) -> float:
     Parameters
     ----------
     total_time_seconds : elapsed time since test start
+    cfg                : engine configuration (default: config.default_config())
 
     Returns
     -------
     fatigue_factor in [MIN_FATIGUE_FACTOR, 1.0]
     """
+    cfg = config.resolve(cfg)
     minutes = total_time_seconds / 60.0
-    raw_factor = 1.0 - config.FATIGUE_SLOPE * minutes
-    return max(config.MIN_FATIGUE_FACTOR, min(1.0, raw_factor))
+    raw_factor = 1.0 - cfg.fatigue_slope * minutes
+    return max(cfg.min_fatigue_factor, min(1.0, raw_factor))
 
 # app/ef_ads/rt_fatigue.py (append)
 
@@ -14,27 +14,62 @@ considerations.[web:580][web:582][web:584]
 """
 
 from __future__ import annotations
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, List, Dict, Optional
+from typing import Hashable, Iterable, List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
 
 from . import config
 from .state import SessionState, ModuleStats
 from . import bayes
+from . import bayes_vec
+from . import compiled_bank
 from . import rt_fatigue
 
 # app/ef_ads/selection.py (append)
 
-@dataclass
+@dataclass(slots=True)
 class CandidateItem:
     """
     Lightweight representation of an item for selection purposes.
 
-    Only contains fields needed by the EF-ADS engine.
+    Only contains fields needed by the EF-ADS engine. discrimination is
+    the item's own 2PL slope (None: the module default from the
+    configuration); guessing is the 3PL lower asymptote (0.0: plain 2PL).
     """
     id: int
     module_id: str
     difficulty: float
     max_time_seconds: float
+    discrimination: Optional[float] = None
+    guessing: float = 0.0
+
+
+def item_parameters(
+    item: CandidateItem,
+    cfg: Optional[config.EngineConfig] = None,
+) -> Tuple[float, float, float]:
+    """
+    (difficulty, discrimination, guessing) of an item under cfg, falling
+    back to the module discrimination when the item has none of its own.
+    """
+    a = item.discrimination
+    if a is None:
+        a = config.resolve(cfg).discrimination(item.module_id)
+    return item.difficulty, a, item.guessing
+
+
+def _gain_key(item: CandidateItem) -> Hashable:
+    """
+    Gain-table key of an item. Within one (configuration, module) table the
+    difficulty identifies items on the module default curve; items with
+    their own parameters are keyed by all three.
+    """
+    if item.discrimination is None and not item.guessing:
+        return item.difficulty
+    return (item.difficulty, item.discrimination, item.guessing)
 
 # app/ef_ads/selection.py (append)
 
@@ -42,6 +77,8 @@ def expected_entropy_after_item(
     module_stats: ModuleStats,
     module_id: str,
     item: CandidateItem,
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> float:
     """
     Compute the expected weak/strong entropy for a module if we administer
@@ -49,69 +86,84 @@ def expected_entropy_after_item(
 
     Steps:
     - Use current theta posterior and 2PL model to get P(correct), P(incorrect).
-    - Simulate posterior updates for both outcomes.
-    - Convert each posterior to weak/strong probabilities and entropy.
+    - Weak/strong entropy of the posterior after each outcome, both taken
+      from the same pass over the grid (fused kernels in bayes / bayes_vec).
     - Return expectation: P(c)*H(correct) + P(i)*H(incorrect).
+
+    If a compiled bank is given, its precomputed P(correct) row is used.
     """
-    theta_posterior = module_stats.theta_posterior
-    theta_grid = config.THETA_GRID
-    a = config.ITEM_DISCRIMINATION.get(module_id, 1.0)
-    b = item.difficulty
+    cfg = config.resolve(cfg)
+    if bank is not None:
+        return bayes_vec.expected_entropy_for_row(
+            module_stats.theta_posterior,
+            bank.p_correct[bank.row(item.id)],
+            cfg,
+        )
 
-    # 1) Compute P(correct) and P(incorrect) under current posterior
-    p_correct = 0.0
-    for p_theta, theta in zip(theta_posterior, theta_grid):
-        p_c = bayes.prob_correct(theta, a, b)
-        p_correct += p_theta * p_c
+    if cfg.posterior_backend == "numpy":
+        return bayes_vec.expected_entropy_after_item(
+            module_stats.theta_posterior,
+            module_id=module_id,
+            item_difficulty=item.difficulty,
+            cfg=cfg,
+            discrimination=item.discrimination,
+            guessing=item.guessing,
+        )
 
+    # Reference backend: both outcomes in one pass over the grid
+    p_correct, H_correct, H_incorrect = bayes.outcome_entropies(
+        module_stats.theta_posterior,
+        module_id=module_id,
+        item_difficulty=item.difficulty,
+        cfg=cfg,
+        discrimination=item.discrimination,
+        guessing=item.guessing,
+    )
     p_correct = max(0.0, min(1.0, p_correct))
     p_incorrect = 1.0 - p_correct
 
     # Guard against degenerate case
     if p_correct < 1e-12 or p_incorrect < 1e-12:
         # If one of them is effectively zero, entropy is dominated by the other
-        outcome = True if p_correct >= p_incorrect else False
-        posterior = bayes.update_theta_posterior_for_item(
-            theta_posterior,
-            module_id=module_id,
-            item_difficulty=b,
-            is_correct=outcome,
-        )
-        ws = bayes.derive_weak_strong_probs(posterior)
-        return bayes.entropy_weak_strong(ws["p_weak"], ws["p_strong"])
+        return H_correct if p_correct >= p_incorrect else H_incorrect
 
-    # 2) Simulate posterior if correct
-    posterior_correct = bayes.update_theta_posterior_for_item(
-        theta_posterior,
-        module_id=module_id,
-        item_difficulty=b,
-        is_correct=True,
-    )
-    ws_correct = bayes.derive_weak_strong_probs(posterior_correct)
-    H_correct = bayes.entropy_weak_strong(ws_correct["p_weak"], ws_correct["p_strong"])
-
-    # 3) Simulate posterior if incorrect
-    posterior_incorrect = bayes.update_theta_posterior_for_item(
-        theta_posterior,
-        module_id=module_id,
-        item_difficulty=b,
-        is_correct=False,
-    )
-    ws_incorrect = bayes.derive_weak_strong_probs(posterior_incorrect)
-    H_incorrect = bayes.entropy_weak_strong(
-        ws_incorrect["p_weak"], ws_incorrect["p_strong"]
-    )
-
-    # 4) Expected entropy
+    # Expected entropy
     expected_entropy = p_correct * H_correct + p_incorrect * H_incorrect
     return expected_entropy
 
 # app/ef_ads/selection.py (append)
 
+def expected_entropies_for_items(
+    module_stats: ModuleStats,
+    module_id: str,
+    items: Sequence[CandidateItem],
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
+) -> np.ndarray:
+    """
+    Batched expected_entropy_after_item for many candidates of one module.
+
+    Candidate likelihood rows are taken from the compiled bank (by item
+    index) when available, otherwise evaluated from the item parameters;
+    all candidates are then scored in one vectorised pass.
+    """
+    cfg = config.resolve(cfg)
+    if bank is not None:
+        p_correct_rows = bank.p_correct[bank.rows(item.id for item in items)]
+    else:
+        params = np.array([item_parameters(item, cfg) for item in items], dtype=np.float64)
+        p_correct_rows = bayes_vec.prob_correct_grid(params[:, 1], params[:, 0], cfg, params[:, 2])
+
+    return bayes_vec.expected_entropy_batch(module_stats.theta_posterior, p_correct_rows, cfg)
+
+# app/ef_ads/selection.py (append)
+
 def information_gain_for_item(
     module_stats: ModuleStats,
     module_id: str,
     item: CandidateItem,
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> float:
     """
     Compute base information gain (entropy reduction) for a given item in
@@ -122,18 +174,180 @@ def information_gain_for_item(
     G_base = H_current - E[H_after_item]
     """
     H_current = module_stats.entropy
-    expected_H = expected_entropy_after_item(module_stats, module_id, item)
+    expected_H = expected_entropy_after_item(module_stats, module_id, item, bank=bank, cfg=cfg)
     gain = H_current - expected_H
     # Ensure non-negative (tiny numerical negatives are set to zero)
     return max(0.0, gain)
 
 # app/ef_ads/selection.py (append)
 
+@dataclass
+class GainCacheStats:
+    """
+    Process-wide counters for the per-step gain cache.
+
+    evaluated : number of information gains actually computed
+    hits      : number of gains served from a module's gain cache
+    """
+    evaluated: int = 0
+    hits: int = 0
+
+    def reset(self) -> None:
+        self.evaluated = 0
+        self.hits = 0
+
+
+GAIN_CACHE_STATS = GainCacheStats()
+
+
+class SharedGainMemo:
+    """
+    Process-wide LRU of gain tables keyed by module history.
+
+    Under a given EngineConfig, a module posterior that started from the
+    uniform prior is determined by the multiset of (difficulty,
+    discrimination, guessing, correct) responses it has seen
+    (ModuleStats.history), and a candidate's base gain by that posterior
+    and the candidate's parameters. Sessions on the same early paths
+    therefore share one {item key: base gain} table (see _gain_key).
+
+    hits / misses count table lookups, evictions the tables dropped.
+    """
+
+    def __init__(self, max_size: Optional[int] = None) -> None:
+        self.max_size = max_size
+        self._tables: "OrderedDict[Hashable, Dict[Hashable, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def table(self, key: Hashable) -> Dict[Hashable, float]:
+        max_size = self.max_size if self.max_size is not None else config.SHARED_GAIN_MEMO_SIZE
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+            self.misses += 1
+            table = {}
+            self._tables[key] = table
+            while len(self._tables) > max_size:
+                self._tables.popitem(last=False)
+                self.evictions += 1
+            return table
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+SHARED_GAIN_MEMO = SharedGainMemo()
+
+
+def _module_gain_cache(
+    module_stats: ModuleStats,
+    module_id: str,
+    cfg: config.EngineConfig,
+) -> Dict[Hashable, float]:
+    """
+    Return the gain table ({item key: base gain}) of a module for its
+    current posterior.
+
+    The table is tied to the posterior object and the configuration it was
+    computed for; any posterior update replaces theta_posterior and so
+    invalidates it, as does scoring under a different EngineConfig. When
+    the module history is known, the table is the one shared through
+    SHARED_GAIN_MEMO with every session that has the same history.
+    """
+    cache: Optional[Tuple[object, config.EngineConfig, Dict[Hashable, float]]] = module_stats.gain_cache
+    if cache is None or cache[0] is not module_stats.theta_posterior or cache[1] is not cfg:
+        if module_stats.history is not None and config.SHARED_GAIN_MEMO_SIZE > 0:
+            table = SHARED_GAIN_MEMO.table((cfg, module_id, module_stats.history))
+        else:
+            table = {}
+        cache = (module_stats.theta_posterior, cfg, table)
+        module_stats.gain_cache = cache
+    return cache[2]
+
+
+def cached_information_gain(
+    module_stats: ModuleStats,
+    module_id: str,
+    item: CandidateItem,
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
+) -> float:
+    """
+    information_gain_for_item, memoised per (module posterior, item
+    parameters).
+
+    Stopping and selection run in the same step on the same posterior, so
+    the gains computed by stopping.max_possible_gain_across_modules are
+    reused by select_best_item_for_module; across sessions, gains are
+    shared through SHARED_GAIN_MEMO.
+    """
+    cfg = config.resolve(cfg)
+    table = _module_gain_cache(module_stats, module_id, cfg)
+    key = _gain_key(item)
+    gain = table.get(key)
+    if gain is not None:
+        GAIN_CACHE_STATS.hits += 1
+        return gain
+
+    gain = information_gain_for_item(module_stats, module_id, item, bank=bank, cfg=cfg)
+    GAIN_CACHE_STATS.evaluated += 1
+    table[key] = gain
+    return gain
+
+def information_gains_for_items(
+    module_stats: ModuleStats,
+    module_id: str,
+    items: Sequence[CandidateItem],
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
+) -> List[float]:
+    """
+    Base information gains for many candidates of one module.
+
+    Gains already in the module's gain table are reused; the missing ones
+    are computed in a single batched pass (vectorised backend) and stored.
+    """
+    cfg = config.resolve(cfg)
+    table = _module_gain_cache(module_stats, module_id, cfg)
+    keys = [_gain_key(item) for item in items]
+    missing = [(key, item) for key, item in zip(keys, items) if key not in table]
+
+    if missing:
+        if cfg.posterior_backend == "numpy":
+            expected = expected_entropies_for_items(
+                module_stats, module_id, [item for _, item in missing], bank=bank, cfg=cfg
+            )
+            gains = np.maximum(0.0, module_stats.entropy - expected)
+            for (key, _), gain in zip(missing, gains.tolist()):
+                table[key] = gain
+        else:
+            for key, item in missing:
+                table[key] = information_gain_for_item(module_stats, module_id, item, cfg=cfg)
+        GAIN_CACHE_STATS.evaluated += len(missing)
+
+    GAIN_CACHE_STATS.hits += len(items) - len(missing)
+    return [table[key] for key in keys]
+
+# app/ef_ads/selection.py (append)
+
 def adjusted_gain_for_item(
     session: SessionState,
     module_stats: ModuleStats,
     module_id: str,
     item: CandidateItem,
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> float:
     """
     Compute adjusted information gain for an item by scaling base entropy
@@ -142,11 +356,12 @@ def adjusted_gain_for_item(
     Optionally, this can later incorporate time-efficiency adjustments
     (information per expected time unit).
     """
-    base_gain = information_gain_for_item(module_stats, module_id, item)
+    cfg = config.resolve(cfg)
+    base_gain = cached_information_gain(module_stats, module_id, item, bank=bank, cfg=cfg)
     if base_gain <= 0.0:
         return 0.0
 
-    fatigue_factor = rt_fatigue.compute_fatigue_factor(session.total_time_seconds)
+    fatigue_factor = rt_fatigue.compute_fatigue_factor(session.total_time_seconds, cfg)
 
     # Optionally include a simple time-efficiency adjustment:
     #   gain_per_time = base_gain / max(item.max_time_seconds, eps)
@@ -161,6 +376,8 @@ def select_best_item_for_module(
     session: SessionState,
     module_id: str,
     candidate_items: Iterable[CandidateItem],
+    bank: Optional["compiled_bank.CompiledItemBank"] = None,
+    cfg: Optional[config.EngineConfig] = None,
 ) -> Optional[CandidateItem]:
     """
     Among candidate items for a module, select the item with the highest
@@ -170,30 +387,33 @@ def select_best_item_for_module(
     -------
     The chosen CandidateItem, or None if no candidate has meaningful gain.
     """
+    cfg = config.resolve(cfg)
     module_stats = session.modules[module_id]
 
-    best_item: Optional[CandidateItem] = None
-    best_gain: float = 0.0
-
-    for item in candidate_items:
-        # Safety: only consider items of the correct module and still remaining
-        if item.module_id != module_id:
-            continue
-        if item.id not in module_stats.items_remaining:
-            continue
-
-        gain = adjusted_gain_for_item(session, module_stats, module_id, item)
+    # Safety: only consider items of the correct module and still remaining
+    candidates = [
+        item
+        for item in candidate_items
+        if item.module_id == module_id and item.id in module_stats.items_remaining
+    ]
+    if not candidates:
+        return None
 
-        # Only consider items with gain above a small threshold
-        if gain < config.MIN_INFO_GAIN:
-            continue
+    # Base gains for all candidates in one batched pass, then fatigue scaling
+    base_gains = np.asarray(
+        information_gains_for_items(module_stats, module_id, candidates, bank=bank, cfg=cfg)
+    )
+    fatigue_factor = rt_fatigue.compute_fatigue_factor(session.total_time_seconds, cfg)
+    gains = np.where(base_gains > 0.0, base_gains * fatigue_factor, 0.0)
 
-        # Prefer highest gain; if tie, you can add tie-breaker logic later
-        if gain > best_gain:
-            best_gain = gain
-            best_item = item
+    # Only consider items with gain above a small threshold
+    eligible = (gains >= cfg.min_info_gain) & (gains > 0.0)
+    if not np.any(eligible):
+        return None
 
-    return best_item
+    # Prefer highest gain; ties go to the first candidate (argmax order)
+    best_index = int(np.argmax(np.where(eligible, gains, -np.inf)))
+    return candidates[best_index]
 
 # app/ef_ads/selection.py (append)
 
@@ -201,6 +421,7 @@ def select_next_item_for_module(
     session: SessionState,
     module_id: str,
     item_pool: Dict[int, CandidateItem],
+    cfg: Optional[config.EngineConfig] = None,
 ) -> Optional[CandidateItem]:
     """
     Select the next item for a module from a global item_pool.
@@ -210,12 +431,15 @@ def select_next_item_for_module(
     session   : current SessionState
     module_id : module identifier
     item_pool : mapping item_id -> CandidateItem for all items in the system
+                (a CompiledItemBank enables precomputed likelihood rows)
+    cfg       : engine configuration (default: config.default_config())
 
     Returns
     -------
     CandidateItem or None if no suitable item found (e.g., pool exhausted
     or all gains below threshold).
     """
+    cfg = config.resolve(cfg)
     module_stats = session.modules[module_id]
 
     # Build a list of CandidateItem objects for remaining items in this module
@@ -228,5 +452,11 @@ def select_next_item_for_module(
     if not candidates:
         return None
 
-    best_item = select_best_item_for_module(session, module_id, candidates)
+    best_item = select_best_item_for_module(
+        session,
+        module_id,
+        candidates,
+        bank=compiled_bank.bank_for(item_pool, cfg),
+        cfg=cfg,
+    )
     return best_item
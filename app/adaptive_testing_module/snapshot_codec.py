@@ -0,0 +1,375 @@
+# app/ef_ads/snapshot_codec.py
+
+"""
+Compact binary encoding of SessionState snapshots.
+
+The JSON snapshot (SessionState.to_snapshot) carries float lists, item id
+lists and ISO datetime strings for every module. This codec packs the same
+state into a small versioned binary record:
+
+    header  : magic "EFS", format version, flags, test id, epoch timestamps
+              (microseconds, naive UTC), total time, round / module index,
+              tree node, item bank version, module count
+    modules : module name (length-prefixed UTF-8), counters, p_weak /
+              p_strong / entropy, last start time, posterior (and log
+              posterior) as packed float64 (lossless) or float32, the
+              remaining items as a bitmap over item ids, and the optional
+              sections flagged per module: the response history signature,
+              the joint (theta, speed) posterior of the RT model and the
+              ability estimates (EAP, MAP, posterior SD)
+    joint   : (FLAG_JOINT_THETA) the joint posterior over all module
+              abilities, axes in the order of the module records, in the
+              snapshot's float format
+    tree    : (FLAG_TREE_FINGERPRINT) fingerprint of the decision tree the
+              session is on, length-prefixed UTF-8
+
+decode_session(encode_session(s)) reproduces s exactly with float64
+posteriors. SessionState.from_snapshot accepts both encodings.
+"""
+
+from __future__ import annotations
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .state import ModuleStats, RemainingItems, SessionState
+
+MAGIC = b"EFS"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Header flags
+FLAG_FLOAT32 = 0x01
+FLAG_STOPPED = 0x02
+FLAG_JOINT_THETA = 0x04
+FLAG_TREE_FINGERPRINT = 0x08
+
+# Module flags
+MODULE_HAS_LOG_POSTERIOR = 0x01
+MODULE_HAS_HISTORY = 0x02
+MODULE_HAS_JOINT_POSTERIOR = 0x04
+MODULE_HAS_THETA_ESTIMATES = 0x08
+
+NO_TIMESTAMP = -(2 ** 63)
+NO_TREE_NODE = -1
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# magic, version, flags, test_id, started_at, last_update_at, total_time_seconds,
+# round_number, current_module_index, tree_node, bank_version, module count
+_HEADER = struct.Struct("<3sBBqqqdIHiIB")
+# flags, num_items, correct, slow_correct, rapid_guess, sum_rt, p_weak, p_strong,
+# entropy, last_started_at, grid size, remaining base id, bitmap byte count
+_MODULE = struct.Struct("<BHHHHddddqBqH")
+# history entry count; followed by the difficulties, discriminations and
+# guessing parameters (float64 each) and one correctness byte per entry
+_HISTORY = struct.Struct("<H")
+# speed grid size; followed by the (grid size x speed grid size) joint
+# posterior, row-major, in the snapshot's float format
+_JOINT = struct.Struct("<H")
+# theta_eap, theta_map, theta_sd
+_ESTIMATES = struct.Struct("<ddd")
+
+# app/ef_ads/snapshot_codec.py (append)
+
+def _to_epoch_us(value: Optional[datetime]) -> int:
+    if value is None:
+        return NO_TIMESTAMP
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_epoch_us(value: int) -> Optional[datetime]:
+    if value == NO_TIMESTAMP:
+        return None
+    return _EPOCH + timedelta(microseconds=value)
+
+# app/ef_ads/snapshot_codec.py (append)
+
+def is_binary_snapshot(data: object) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:3]) == MAGIC
+
+
+def encode_session(
+    session: SessionState,
+    *,
+    bank_version: int = 0,
+    float32: bool = False,
+) -> bytes:
+    """
+    Encode a SessionState as a compact binary snapshot.
+
+    Parameters
+    ----------
+    session      : session to encode
+    bank_version : version of the item bank the remaining-items bitmaps
+                   refer to (see services.items.get_active_item_bank)
+    float32      : store posteriors as float32 (smaller, not lossless)
+
+    Returns
+    -------
+    bytes
+    """
+    float_code = "f" if float32 else "d"
+    joint_theta = session.joint_theta_posterior
+    flags = (
+        (FLAG_FLOAT32 if float32 else 0)
+        | (FLAG_STOPPED if session.stopped else 0)
+        | (FLAG_JOINT_THETA if joint_theta is not None else 0)
+        | (FLAG_TREE_FINGERPRINT if session.tree_fingerprint is not None else 0)
+    )
+
+    parts = [
+        _HEADER.pack(
+            MAGIC,
+            SNAPSHOT_FORMAT_VERSION,
+            flags,
+            session.test_id,
+            _to_epoch_us(session.started_at),
+            _to_epoch_us(session.last_update_at),
+            session.total_time_seconds,
+            session.round_number,
+            session.current_module_index,
+            NO_TREE_NODE if session.tree_node is None else session.tree_node,
+            bank_version,
+            len(session.modules),
+        )
+    ]
+
+    for module_id, stats in session.modules.items():
+        # By name, not position: the module list may change between deploys
+        name = module_id.encode("utf-8")
+        parts.append(bytes((len(name),)) + name)
+
+        grid_size = len(stats.theta_posterior)
+        has_log = stats.log_theta_posterior is not None
+        has_history = stats.history is not None
+        has_joint = stats.joint_posterior is not None
+        has_estimates = stats.theta_eap is not None
+        base, bitmap = stats.items_remaining.to_bitmap()
+        parts.append(
+            _MODULE.pack(
+                (MODULE_HAS_LOG_POSTERIOR if has_log else 0)
+                | (MODULE_HAS_HISTORY if has_history else 0)
+                | (MODULE_HAS_JOINT_POSTERIOR if has_joint else 0)
+                | (MODULE_HAS_THETA_ESTIMATES if has_estimates else 0),
+                stats.num_items,
+                stats.correct,
+                stats.slow_correct,
+                stats.rapid_guess,
+                stats.sum_rt,
+                stats.p_weak,
+                stats.p_strong,
+                stats.entropy,
+                _to_epoch_us(stats.last_started_at),
+                grid_size,
+                base,
+                len(bitmap),
+            )
+        )
+        packed = f"<{grid_size}{float_code}"
+        parts.append(struct.pack(packed, *stats.theta_posterior))
+        if has_log:
+            parts.append(struct.pack(packed, *stats.log_theta_posterior))
+        parts.append(bitmap)
+        if has_history:
+            count = len(stats.history)
+            columns = tuple(zip(*stats.history)) if count else ((), (), (), ())
+            parts.append(_HISTORY.pack(count))
+            parts.append(struct.pack(f"<{3 * count}d", *columns[0], *columns[1], *columns[2]))
+            parts.append(bytes(bool(ok) for ok in columns[3]))
+        if has_joint:
+            speed_size = stats.joint_posterior.shape[1]
+            parts.append(_JOINT.pack(speed_size))
+            parts.append(
+                np.ascontiguousarray(stats.joint_posterior, dtype="<f4" if float32 else "<f8").tobytes()
+            )
+        if has_estimates:
+            parts.append(_ESTIMATES.pack(stats.theta_eap, stats.theta_map, stats.theta_sd))
+
+    if joint_theta is not None:
+        parts.append(np.ascontiguousarray(joint_theta, dtype="<f4" if float32 else "<f8").tobytes())
+    if session.tree_fingerprint is not None:
+        fingerprint = session.tree_fingerprint.encode("utf-8")
+        parts.append(bytes((len(fingerprint),)) + fingerprint)
+
+    return b"".join(parts)
+
+# app/ef_ads/snapshot_codec.py (append)
+
+class BankVersionMismatch(ValueError):
+    """
+    The snapshot's remaining items were recorded against another item bank
+    version. The decoded session is attached, so the caller can rebuild
+    its remaining items against the current bank instead of rejecting it.
+    """
+
+    def __init__(self, session: SessionState, bank_version: int, expected_bank_version: int) -> None:
+        super().__init__(
+            f"Snapshot refers to item bank version {bank_version}, "
+            f"expected {expected_bank_version}"
+        )
+        self.session = session
+        self.bank_version = bank_version
+
+
+def decode_session(
+    data: bytes,
+    expected_bank_version: Optional[int] = None,
+) -> SessionState:
+    """
+    Decode a binary snapshot produced by encode_session.
+
+    Raises ValueError for an unknown format or a truncated record, and
+    BankVersionMismatch (a ValueError) for a bank version different from
+    expected_bank_version (when given).
+    """
+    session, bank_version = decode_session_with_version(data)
+    if expected_bank_version is not None and bank_version != expected_bank_version:
+        raise BankVersionMismatch(session, bank_version, expected_bank_version)
+    return session
+
+
+def decode_session_with_version(data: bytes) -> Tuple[SessionState, int]:
+    """
+    Decode a binary snapshot; returns (session, item bank version).
+    """
+    view = memoryview(data)
+    if len(view) < _HEADER.size or bytes(view[:3]) != MAGIC:
+        raise ValueError("Not a binary session snapshot")
+
+    try:
+        (
+            _, version, flags, test_id, started_at, last_update_at, total_time_seconds,
+            round_number, current_module_index, tree_node, bank_version, num_modules,
+        ) = _HEADER.unpack_from(view, 0)
+        if version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format version: {version}")
+
+        float_code = "f" if flags & FLAG_FLOAT32 else "d"
+        offset = _HEADER.size
+
+        modules: Dict[str, ModuleStats] = {}
+        for _ in range(num_modules):
+            name_len = view[offset]
+            if offset + 1 + name_len > len(view):
+                raise ValueError("Truncated session snapshot")
+            module_id = bytes(view[offset + 1:offset + 1 + name_len]).decode("utf-8")
+            offset += 1 + name_len
+
+            (
+                module_flags, num_items, correct, slow_correct, rapid_guess, sum_rt,
+                p_weak, p_strong, entropy, last_started_at, grid_size, base, bitmap_len,
+            ) = _MODULE.unpack_from(view, offset)
+            offset += _MODULE.size
+
+            packed = struct.Struct(f"<{grid_size}{float_code}")
+            posterior = list(packed.unpack_from(view, offset))
+            offset += packed.size
+            log_posterior = None
+            if module_flags & MODULE_HAS_LOG_POSTERIOR:
+                log_posterior = list(packed.unpack_from(view, offset))
+                offset += packed.size
+            if offset + bitmap_len > len(view):
+                raise ValueError("Truncated session snapshot")
+            bitmap = bytes(view[offset:offset + bitmap_len])
+            offset += bitmap_len
+            history = None
+            if module_flags & MODULE_HAS_HISTORY:
+                (count,) = _HISTORY.unpack_from(view, offset)
+                offset += _HISTORY.size
+                params = struct.unpack_from(f"<{3 * count}d", view, offset)
+                offset += 24 * count
+                if offset + count > len(view):
+                    raise ValueError("Truncated session snapshot")
+                history = tuple(
+                    (b, a, c, bool(ok))
+                    for b, a, c, ok in zip(
+                        params[:count],
+                        params[count:2 * count],
+                        params[2 * count:],
+                        view[offset:offset + count],
+                    )
+                )
+                offset += count
+            joint_posterior = None
+            if module_flags & MODULE_HAS_JOINT_POSTERIOR:
+                (speed_size,) = _JOINT.unpack_from(view, offset)
+                offset += _JOINT.size
+                dtype = np.dtype("<f4" if float_code == "f" else "<f8")
+                count = grid_size * speed_size
+                if offset + count * dtype.itemsize > len(view):
+                    raise ValueError("Truncated session snapshot")
+                joint_posterior = (
+                    np.frombuffer(view, dtype=dtype, count=count, offset=offset)
+                    .astype(np.float64)
+                    .reshape(grid_size, speed_size)
+                )
+                offset += count * dtype.itemsize
+            theta_eap = theta_map = theta_sd = None
+            if module_flags & MODULE_HAS_THETA_ESTIMATES:
+                theta_eap, theta_map, theta_sd = _ESTIMATES.unpack_from(view, offset)
+                offset += _ESTIMATES.size
+
+            modules[module_id] = ModuleStats(
+                theta_posterior=posterior,
+                log_theta_posterior=log_posterior,
+                joint_posterior=joint_posterior,
+                p_weak=p_weak,
+                p_strong=p_strong,
+                entropy=entropy,
+                theta_eap=theta_eap,
+                theta_map=theta_map,
+                theta_sd=theta_sd,
+                num_items=num_items,
+                items_remaining=RemainingItems.from_bitmap(base, bitmap),
+                sum_rt=sum_rt,
+                slow_correct=slow_correct,
+                correct=correct,
+                rapid_guess=rapid_guess,
+                last_started_at=_from_epoch_us(last_started_at),
+                history=history,
+            )
+
+        joint_theta = None
+        if flags & FLAG_JOINT_THETA:
+            if not modules:
+                # The tensor's shape comes from the module records
+                raise ValueError("Joint posterior in a snapshot without modules")
+            dtype = np.dtype("<f4" if float_code == "f" else "<f8")
+            shape = (grid_size,) * num_modules
+            count = grid_size ** num_modules
+            if offset + count * dtype.itemsize > len(view):
+                raise ValueError("Truncated session snapshot")
+            joint_theta = (
+                np.frombuffer(view, dtype=dtype, count=count, offset=offset)
+                .astype(np.float64)
+                .reshape(shape)
+            )
+            offset += count * dtype.itemsize
+        tree_fingerprint = None
+        if flags & FLAG_TREE_FINGERPRINT:
+            length = view[offset]
+            if offset + 1 + length > len(view):
+                raise ValueError("Truncated session snapshot")
+            tree_fingerprint = bytes(view[offset + 1:offset + 1 + length]).decode("utf-8")
+    except (struct.error, IndexError, UnicodeDecodeError) as exc:
+        raise ValueError("Truncated session snapshot") from exc
+
+    session = SessionState(
+        test_id=test_id,
+        started_at=_from_epoch_us(started_at),
+        last_update_at=_from_epoch_us(last_update_at),
+        total_time_seconds=total_time_seconds,
+        round_number=round_number,
+        current_module_index=current_module_index,
+        stopped=bool(flags & FLAG_STOPPED),
+        modules=modules,
+        tree_node=None if tree_node == NO_TREE_NODE else tree_node,
+        tree_fingerprint=tree_fingerprint,
+        joint_theta_posterior=joint_theta,
+    )
+    return session, bank_version
@@ -8,29 +8,177 @@ It is independent of HTTP and database details.
 """
 
 from __future__ import annotations
-from dataclasses import dataclass, field
+import copy
+from dataclasses import dataclass, field, replace
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import compress
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
 
 from . import config
+from . import bayes_vec
+from . import multidim
+
+if TYPE_CHECKING:
+    from .risk import RiskTracker
+
+# Byte translation tables between bitmap flags (0/1) and binary digits
+_FLAG_TO_DIGIT = bytes.maketrans(b"\x00\x01", b"01")
+_DIGIT_TO_FLAG = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class RemainingItems:
+    """
+    Set of item ids still available in a module.
+
+    Backed by a bitmap (one flag per id over [base, base + span)), giving
+    O(1) membership and removal. Iteration is in ascending id order, which
+    is also the tie-break order used by item selection.
+    """
+
+    __slots__ = ("_base", "_flags", "_count")
+
+    def __init__(self, item_ids: Iterable[int] = ()) -> None:
+        ids = sorted(set(item_ids))
+        self._base = ids[0] if ids else 0
+        span = ids[-1] - self._base + 1 if ids else 0
+        self._flags = bytearray(span)
+        for item_id in ids:
+            self._flags[item_id - self._base] = 1
+        self._count = len(ids)
+
+    def __contains__(self, item_id: object) -> bool:
+        try:
+            offset = int(item_id) - self._base  # type: ignore[call-overload]
+        except (TypeError, ValueError):
+            return False
+        return 0 <= offset < len(self._flags) and self._flags[offset] == 1
+
+    def __iter__(self) -> Iterator[int]:
+        return compress(range(self._base, self._base + len(self._flags)), self._flags)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RemainingItems):
+            return list(self) == list(other)
+        if isinstance(other, (list, tuple, set, frozenset)):
+            return list(self) == sorted(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"RemainingItems({list(self)!r})"
+
+    def discard(self, item_id: int) -> None:
+        if item_id in self:
+            self._flags[int(item_id) - self._base] = 0
+            self._count -= 1
+
+    def copy(self) -> "RemainingItems":
+        remaining = RemainingItems.__new__(RemainingItems)
+        remaining._base = self._base
+        remaining._flags = bytearray(self._flags)
+        remaining._count = self._count
+        return remaining
+
+    def remove(self, item_id: int) -> None:
+        """
+        Remove an item id; raises ValueError if absent (like list.remove).
+        """
+        if item_id not in self:
+            raise ValueError(f"item {item_id} not in remaining items")
+        self.discard(item_id)
+
+    def to_snapshot(self) -> Dict[str, Union[int, str]]:
+        """
+        Compact form: {"base": first id, "bits": hex bitmap (bit i => base + i)}.
+        """
+        bits = int("".join(map(str, reversed(self._flags))) or "0", 2)
+        return {"base": self._base, "bits": format(bits, "x")}
+
+    def to_bitmap(self) -> Tuple[int, bytes]:
+        """
+        Packed form for binary snapshots: (base, bitmap with bit i of byte
+        i // 8, least significant first, set for id base + i).
+        """
+        if not self._flags:
+            return self._base, b""
+        digits = bytes(reversed(self._flags)).translate(_FLAG_TO_DIGIT)
+        return self._base, int(digits, 2).to_bytes((len(self._flags) + 7) // 8, "little")
+
+    @classmethod
+    def from_bitmap(cls, base: int, bitmap: bytes) -> "RemainingItems":
+        """
+        Rebuild from to_bitmap() output.
+        """
+        remaining = cls()
+        remaining._base = base
+        bits = int.from_bytes(bitmap, "little")
+        if bits:
+            digits = format(bits, "b").encode("ascii").translate(_DIGIT_TO_FLAG)
+            remaining._flags = bytearray(reversed(digits))
+            remaining._count = remaining._flags.count(1)
+        return remaining
+
+    @classmethod
+    def from_snapshot(cls, value: Union[Dict, List[int], None]) -> "RemainingItems":
+        """
+        Rebuild from to_snapshot() output, or from a legacy list of ids.
+        """
+        if value is None:
+            return cls()
+        if not isinstance(value, dict):
+            return cls(value)
 
+        bits = int(value["bits"], 16)
+        remaining = cls()
+        remaining._base = value["base"]
+        if bits:
+            remaining._flags = bytearray(int(flag) for flag in reversed(format(bits, "b")))
+        remaining._count = remaining._flags.count(1)
+        return remaining
 
-@dataclass
+
+@dataclass(slots=True)
 class ModuleStats:
     """
     Per-module statistics and posterior state during a test session.
     """
-    # Posterior over theta grid (same length as config.THETA_GRID)
+    # Posterior over theta grid (EngineConfig.theta_nodes: config.THETA_GRID,
+    # or the refined quadrature when config.THETA_QUADRATURE_POINTS > 0).
+    # A NumPy array when config.POSTERIOR_BACKEND == "numpy", else a list.
     theta_posterior: List[float]
 
+    # Normalised log posterior, maintained only when config.LOG_SPACE_POSTERIOR
+    # is enabled (theta_posterior is then its exp)
+    log_theta_posterior: Optional[List[float]] = None
+
+    # Joint (theta, speed) posterior, shape (len(THETA_GRID), len(SPEED_GRID)),
+    # maintained only when config.RT_MODEL is enabled (theta_posterior is then
+    # its theta marginal)
+    joint_posterior: Optional[np.ndarray] = None
+
     # Derived weak/strong probabilities and entropy (computed from theta_posterior)
     p_weak: float = 0.5
     p_strong: float = 0.5
     entropy: float = 1.0
 
+    # Ability point estimates from theta_posterior (bayes_vec.theta_estimates):
+    # posterior mean (EAP), most probable grid point (MAP) and posterior SD,
+    # refreshed with every posterior update. None when unknown (e.g.
+    # restored from a snapshot written before they were recorded).
+    theta_eap: Optional[float] = None
+    theta_map: Optional[float] = None
+    theta_sd: Optional[float] = None
+
     # Item administration stats
     num_items: int = 0
-    items_remaining: List[int] = field(default_factory=list)
+    items_remaining: RemainingItems = field(default_factory=RemainingItems)
 
     # Response time & engagement
     sum_rt: float = 0.0
@@ -41,8 +189,21 @@ class ModuleStats:
     # Optional: last start time for module, to derive switch RTs
     last_started_at: Optional[datetime] = None
 
+    # Sorted (difficulty, discrimination, guessing, correct) entries of the
+    # responses applied to the posterior since the uniform prior: a
+    # canonical signature of the posterior, used by
+    # selection.SharedGainMemo. None when unknown (e.g. restored from a
+    # snapshot written before item parameters were recorded).
+    history: Optional[Tuple[Tuple[float, float, float, bool], ...]] = None
+
+    # Per-step gain table (posterior, config, {item key: base gain});
+    # transient, never snapshotted. See selection.cached_information_gain.
+    gain_cache: Optional[Tuple[object, object, Dict[Hashable, float]]] = field(
+        default=None, repr=False, compare=False
+    )
 
-@dataclass
+
+@dataclass(slots=True)
 class SessionState:
     """
     EF-ADS session state for one test.
@@ -63,6 +224,20 @@ class SessionState:
     # Mapping from module_id to ModuleStats
     modules: Dict[str, ModuleStats] = field(default_factory=dict)
 
+    # Current node in a precompiled decision tree (None = live evaluation)
+    # and the fingerprint of that tree (DecisionTree.fingerprint)
+    tree_node: Optional[int] = None
+    tree_fingerprint: Optional[str] = None
+
+    # Joint posterior over all module abilities, one axis per module in
+    # config.MODULES order (config.JOINT_THETA_POSTERIOR; see multidim.py).
+    # None when the modules are independent or before the first response.
+    joint_theta_posterior: Optional[np.ndarray] = None
+
+    # Incrementally maintained module classifications (see
+    # risk.current_risk); transient, never snapshotted.
+    risk_tracker: Optional[RiskTracker] = field(default=None, repr=False, compare=False)
+
     @classmethod
     def initialise(
         cls,
@@ -70,34 +245,47 @@ class SessionState:
         *,
         started_at: Optional[datetime] = None,
         module_item_ids: Optional[Dict[str, List[int]]] = None,
+        cfg: Optional["config.EngineConfig"] = None,
     ) -> "SessionState":
         """
         Create a new SessionState for a test, with:
-        - uniform prior over theta for each module
-        - initial items_remaining lists based on module_item_ids
+        - uniform prior over theta for each module (cfg.theta_prior, of
+          cfg, default config.default_config())
+        - initial items_remaining sets based on module_item_ids
         """
+        cfg = config.resolve(cfg)
         now = started_at or datetime.utcnow()
 
         modules: Dict[str, ModuleStats] = {}
-        num_grid_points = len(config.THETA_GRID)
-        uniform_posterior = [1.0 / num_grid_points] * num_grid_points
+        uniform_posterior = cfg.theta_prior
+        prior_estimates = bayes_vec.theta_estimates(uniform_posterior, cfg)
 
-        for module_id in config.MODULES:
+        for module_id in cfg.modules:
             items = (module_item_ids or {}).get(module_id, [])
             modules[module_id] = ModuleStats(
                 theta_posterior=list(uniform_posterior),
                 p_weak=0.5,
                 p_strong=0.5,
                 entropy=1.0,
+                theta_eap=prior_estimates.eap,
+                theta_map=prior_estimates.map,
+                theta_sd=prior_estimates.sd,
                 num_items=0,
-                items_remaining=list(items),
+                items_remaining=RemainingItems(items),
                 sum_rt=0.0,
                 slow_correct=0,
                 correct=0,
                 rapid_guess=0,
                 last_started_at=None,
+                # Joint posterior: a module's posterior depends on the others
+                history=None if cfg.joint_theta_posterior else (),
             )
 
+        joint_theta_posterior = None
+        if cfg.joint_theta_posterior:
+            multidim.check_supported(cfg)
+            joint_theta_posterior = multidim.joint_prior(cfg).copy()
+
         return cls(
             test_id=test_id,
             started_at=now,
@@ -107,6 +295,30 @@ class SessionState:
             current_module_index=0,
             stopped=False,
             modules=modules,
+            joint_theta_posterior=joint_theta_posterior,
+        )
+
+    def branch(self, module_ids: Iterable[str]) -> "SessionState":
+        """
+        Copy-on-write copy for applying a hypothetical response that changes
+        module_ids (e.g. orchestration_engine.speculate_next_items).
+
+        Only the session scalars, the risk tracker and the statistics of
+        module_ids (with their remaining items) are copied. Posteriors,
+        gain tables and the other modules are shared: the engine replaces
+        posterior arrays rather than updating them in place, and a response
+        changes no other module. module_ids must list every module the
+        response can move (multidim.coupled_modules under the joint
+        posterior).
+        """
+        modules = dict(self.modules)
+        for module_id in module_ids:
+            stats = modules[module_id]
+            modules[module_id] = replace(stats, items_remaining=stats.items_remaining.copy())
+        return replace(
+            self,
+            modules=modules,
+            risk_tracker=copy.deepcopy(self.risk_tracker),
         )
 
     # ---- Snapshot helpers -------------------------------------------------
@@ -120,12 +332,12 @@ class SessionState:
         modules_snapshot: Dict[str, Dict] = {}
         for module_id, stats in self.modules.items():
             modules_snapshot[module_id] = {
-                "theta_posterior": stats.theta_posterior,
+                "theta_posterior": [float(p) for p in stats.theta_posterior],
                 "p_weak": stats.p_weak,
                 "p_strong": stats.p_strong,
                 "entropy": stats.entropy,
                 "num_items": stats.num_items,
-                "items_remaining": stats.items_remaining,
+                "items_remaining": stats.items_remaining.to_snapshot(),
                 "sum_rt": stats.sum_rt,
                 "slow_correct": stats.slow_correct,
                 "correct": stats.correct,
@@ -136,8 +348,24 @@ class SessionState:
                     else None
                 ),
             }
+            if stats.log_theta_posterior is not None:
+                modules_snapshot[module_id]["log_theta_posterior"] = [
+                    float(p) for p in stats.log_theta_posterior
+                ]
+            if stats.joint_posterior is not None:
+                modules_snapshot[module_id]["joint_posterior"] = stats.joint_posterior.tolist()
+            if stats.theta_eap is not None:
+                modules_snapshot[module_id].update(
+                    theta_eap=stats.theta_eap,
+                    theta_map=stats.theta_map,
+                    theta_sd=stats.theta_sd,
+                )
+            if stats.history is not None:
+                modules_snapshot[module_id]["history"] = [
+                    [b, a, c, correct] for b, a, c, correct in stats.history
+                ]
 
-        return {
+        snapshot = {
             "test_id": self.test_id,
             "started_at": self.started_at.isoformat(),
             "last_update_at": self.last_update_at.isoformat(),
@@ -146,13 +374,43 @@ class SessionState:
             "current_module_index": self.current_module_index,
             "stopped": self.stopped,
             "modules": modules_snapshot,
+            "tree_node": self.tree_node,
+            "tree_fingerprint": self.tree_fingerprint,
         }
+        if self.joint_theta_posterior is not None:
+            snapshot["joint_theta_posterior"] = self.joint_theta_posterior.ravel().tolist()
+        return snapshot
+
+    def to_binary_snapshot(self, bank_version: int = 0, float32: bool = False) -> bytes:
+        """
+        Compact binary snapshot (see snapshot_codec); lossless unless
+        float32 is set.
+        """
+        from . import snapshot_codec
+
+        return snapshot_codec.encode_session(self, bank_version=bank_version, float32=float32)
 
     @classmethod
-    def from_snapshot(cls, snapshot: Dict) -> "SessionState":
+    def from_snapshot(
+        cls,
+        snapshot: Union[Dict, bytes],
+        expected_bank_version: Optional[int] = None,
+    ) -> "SessionState":
         """
-        Reconstruct a SessionState from a JSON-serialisable snapshot dict.
+        Reconstruct a SessionState from a JSON-serialisable snapshot dict,
+        or from a binary snapshot produced by to_binary_snapshot.
+
+        With expected_bank_version given, a snapshot recorded against
+        another item bank version raises snapshot_codec.BankVersionMismatch
+        (JSON snapshots written without a bank version are not checked).
         """
+        if isinstance(snapshot, (bytes, bytearray, memoryview)):
+            from . import snapshot_codec
+
+            return snapshot_codec.decode_session(snapshot, expected_bank_version)
+
+        joint_theta_posterior = snapshot.get("joint_theta_posterior")
+
         modules: Dict[str, ModuleStats] = {}
         for module_id, stats_dict in snapshot["modules"].items():
             last_started_at = (
@@ -160,21 +418,42 @@ class SessionState:
                 if stats_dict.get("last_started_at")
                 else None
             )
+            log_theta_posterior = stats_dict.get("log_theta_posterior")
+            joint_posterior = stats_dict.get("joint_posterior")
+            history = stats_dict.get("history")
             modules[module_id] = ModuleStats(
                 theta_posterior=list(stats_dict["theta_posterior"]),
+                log_theta_posterior=(
+                    list(log_theta_posterior)
+                    if log_theta_posterior is not None
+                    else None
+                ),
+                joint_posterior=(
+                    np.array(joint_posterior, dtype=np.float64)
+                    if joint_posterior is not None
+                    else None
+                ),
                 p_weak=stats_dict["p_weak"],
                 p_strong=stats_dict["p_strong"],
                 entropy=stats_dict["entropy"],
+                theta_eap=stats_dict.get("theta_eap"),
+                theta_map=stats_dict.get("theta_map"),
+                theta_sd=stats_dict.get("theta_sd"),
                 num_items=stats_dict["num_items"],
-                items_remaining=list(stats_dict["items_remaining"]),
+                items_remaining=RemainingItems.from_snapshot(stats_dict["items_remaining"]),
                 sum_rt=stats_dict["sum_rt"],
                 slow_correct=stats_dict["slow_correct"],
                 correct=stats_dict["correct"],
                 rapid_guess=stats_dict["rapid_guess"],
                 last_started_at=last_started_at,
+                history=(
+                    tuple((float(b), float(a), float(c), bool(ok)) for b, a, c, ok in history)
+                    if history is not None
+                    else None
+                ),
             )
 
-        return cls(
+        session = cls(
             test_id=snapshot["test_id"],
             started_at=datetime.fromisoformat(snapshot["started_at"]),
             last_update_at=datetime.fromisoformat(snapshot["last_update_at"]),
@@ -183,4 +462,23 @@ class SessionState:
             current_module_index=snapshot["current_module_index"],
             stopped=snapshot["stopped"],
             modules=modules,
+            tree_node=snapshot.get("tree_node"),
+            tree_fingerprint=snapshot.get("tree_fingerprint"),
+            joint_theta_posterior=(
+                np.array(joint_theta_posterior, dtype=np.float64).reshape(
+                    (len(modules[next(iter(modules))].theta_posterior),) * len(modules)
+                )
+                if joint_theta_posterior is not None
+                else None
+            ),
         )
+        bank_version = snapshot.get("bank_version")
+        if (
+            expected_bank_version is not None
+            and bank_version is not None
+            and bank_version != expected_bank_version
+        ):
+            from . import snapshot_codec
+
+            raise snapshot_codec.BankVersionMismatch(session, bank_version, expected_bank_version)
+        return session
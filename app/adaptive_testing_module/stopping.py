@@ -19,22 +19,27 @@ from typing import Dict, Optional
 from . import config
 from .state import SessionState, ModuleStats
 from . import selection
+from . import compiled_bank
 from . import rt_fatigue
 
 # app/ef_ads/stopping.py (append)
 
-def is_module_settled(stats: ModuleStats) -> bool:
+def is_module_settled(
+    stats: ModuleStats,
+    cfg: Optional[config.EngineConfig] = None,
+) -> bool:
     """
     Check if a module is 'settled' (weak/strong classification considered
     reliable enough to stop asking items in this module).
     """
-    if stats.num_items < config.MIN_ITEMS_PER_MODULE:
+    cfg = config.resolve(cfg)
+    if stats.num_items < cfg.min_items_per_module:
         return False
 
-    if stats.entropy > config.ENTROPY_THRESHOLD:
+    if stats.entropy > cfg.entropy_threshold:
         return False
 
-    if max(stats.p_weak, stats.p_strong) < config.P_CONFIDENT:
+    if max(stats.p_weak, stats.p_strong) < cfg.p_confident:
         return False
 
     return True
@@ -44,25 +49,33 @@ def is_module_settled(stats: ModuleStats) -> bool:
 def max_possible_gain_across_modules(
     session: SessionState,
     item_pool: Dict[int, selection.CandidateItem],
+    cfg: Optional[config.EngineConfig] = None,
 ) -> float:
     """
     Compute the maximum base information gain obtainable from any remaining
     item in any not-yet-settled module.
     """
+    cfg = config.resolve(cfg)
     max_gain = 0.0
+    bank = compiled_bank.bank_for(item_pool, cfg)
 
     for module_id, stats in session.modules.items():
-        if is_module_settled(stats):
+        if is_module_settled(stats, cfg):
             continue
 
+        items = []
         for item_id in stats.items_remaining:
             item = item_pool.get(item_id)
             if item is None or item.module_id != module_id:
                 continue
+            items.append(item)
+
+        if not items:
+            continue
 
-            gain = selection.information_gain_for_item(stats, module_id, item)
-            if gain > max_gain:
-                max_gain = gain
+        # All remaining items of the module in one batched pass
+        gains = selection.information_gains_for_items(stats, module_id, items, bank=bank, cfg=cfg)
+        max_gain = max(max_gain, max(gains))
 
     return max_gain
 
@@ -71,6 +84,7 @@ def max_possible_gain_across_modules(
 def should_stop_globally(
     session: SessionState,
     item_pool: Dict[int, selection.CandidateItem],
+    cfg: Optional[config.EngineConfig] = None,
 ) -> bool:
     """
     Decide whether to stop the entire test session.
@@ -80,13 +94,15 @@ def should_stop_globally(
     - Key modules (e.g., PA and RAN) settled.
     - OR maximum possible information gain across modules is below threshold.
     """
+    cfg = config.resolve(cfg)
+
     # Hard caps
     total_items = sum(m.num_items for m in session.modules.values())
-    if total_items >= config.MAX_ITEMS_TOTAL:
+    if total_items >= cfg.max_items_total:
         return True
 
     total_minutes = session.total_time_seconds / 60.0
-    if total_minutes >= config.MAX_TEST_TIME_MIN:
+    if total_minutes >= cfg.max_test_time_min:
         return True
 
     # Check if key modules are settled
@@ -95,15 +111,15 @@ def should_stop_globally(
 
     key_modules_settled = False
     if pa is not None and ran is not None:
-        key_modules_settled = is_module_settled(pa) and is_module_settled(ran)
+        key_modules_settled = is_module_settled(pa, cfg) and is_module_settled(ran, cfg)
 
     # If key modules are settled, we can allow early stopping
     if key_modules_settled:
         return True
 
     # Otherwise, check whether additional items can still provide meaningful gain
-    max_gain = max_possible_gain_across_modules(session, item_pool)
-    if max_gain < config.MIN_INFO_GAIN:
+    max_gain = max_possible_gain_across_modules(session, item_pool, cfg)
+    if max_gain < cfg.min_info_gain:
         return True
 
     return False
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1 import child, item, test, test_item_log, test_module_sum, test_features, test_xai
+from app.api.v1 import child, item, test, test_item_log, test_module_sum, test_features, test_xai, result_set
 
 api_router = APIRouter()
 
@@ -10,6 +10,7 @@ api_router.include_router(test_item_log.router, prefix="/logs", tags=["test-logs
 api_router.include_router(test_module_sum.router, prefix="/module-summaries", tags=["test-summaries"])
 api_router.include_router(test_features.router, prefix="/features", tags=["test-features"])
 api_router.include_router(test_xai.router, prefix="/xai", tags=["test-xai"])
+api_router.include_router(result_set.router, prefix="/result-sets", tags=["result-sets"])
 
 # Lazy import to avoid circular dependencies if any, though standard import is fine
 from app.api.v1 import adaptive
@@ -32,13 +32,15 @@ def create_and_start_test(request: StartTestRequest, db: Session = Depends(deps.
     
     test = crud.test.create_test(db, schemas.test.TestCreate(**db_test_create_dict))
     
-    # 2. Load Active Items & Build Pool using Service
-    active_items = items_service.load_active_items(db)
-    if not active_items:
+    # 2. Active item bank from the process-wide cache (DB only on version change)
+    active_bank = items_service.get_active_item_bank(db)
+    if not active_bank.bank:
          raise HTTPException(status_code=500, detail="No active items available")
-         
-    item_pool = items_service.build_item_pool(active_items)
-    module_item_ids = items_service.build_module_item_ids(active_items)
+
+    item_pool = active_bank.bank
+    module_item_ids = active_bank.module_item_ids
+    # Opening items are the same for every child: served from the cached tree
+    opening_tree = items_service.get_opening_tree(active_bank)
 
     # 3. Call engine to start test
     try:
@@ -46,26 +48,27 @@ def create_and_start_test(request: StartTestRequest, db: Session = Depends(deps.
             test_id=test.id,
             module_item_ids=module_item_ids,
             item_pool=item_pool,
-            started_at=test.start_time
+            started_at=test.start_time,
+            decision_tree=opening_tree,
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to initialize adaptive engine: {str(e)}")
 
     # 4. Save session snapshot
-    test_service.save_session_snapshot(db, test, result.session)
+    test_service.save_session_snapshot(db, test, result.session, bank_version=active_bank.version)
     db.commit()
 
     # 5. Return first item with content
     if result.first_item:
-        # Find the ORM item to return full content fields
-        db_item = next((it for it in active_items if it.id == result.first_item.id), None)
-        if not db_item:
+        payload = active_bank.payloads.get(result.first_item.id)
+        if not payload:
              # Should not happen if pool consistent
              raise HTTPException(status_code=500, detail="Selected item not found in DB")
              
         return {
             "test_id": test.id,
-            "first_item": item_to_response_dict(db_item)
+            "first_item": payload,
+            "prefetch": prefetch_payloads(result.session, result.first_item, active_bank, opening_tree)
         }
     else:
          return {
@@ -118,38 +121,42 @@ def submit_response_endpoint(
         # Maybe allow idempotence or just return completed
         return {"status": "completed"}
 
-    # 2. Load Session via Service
+    # 2. Item pool from the process-wide cache (compiled bank of all active items)
+    active_bank = items_service.get_active_item_bank(db)
+    item_pool = active_bank.bank
+    opening_tree = items_service.get_opening_tree(active_bank)
+
+    # 3. Load Session via Service (replays recorded events in event-sourced mode)
     try:
-        session = test_service.load_session_state(test)
+        session = test_service.load_session_state(
+            test, db=db, item_pool=item_pool, bank_version=active_bank.version
+        )
     except ValueError:
         raise HTTPException(status_code=400, detail="Test not started")
 
-    # 3. Build Pool via Service
-    # items_service.load_active_items(db) -> this fetches ALL items. Logic says "all active items".
-    all_items = items_service.load_active_items(db)
-    item_pool = items_service.build_item_pool(all_items)
-
     # 4. Identify Responded Item
     responded_item_cand = item_pool.get(response.item_id)
     if not responded_item_cand:
         raise HTTPException(status_code=400, detail="Invalid item_id submitted")
 
     # 5. Process logic
+    submitted_at = datetime.utcnow()
     result = orchestration_engine.process_response(
         session=session,
         module_id=responded_item_cand.module_id,
         item=responded_item_cand,
         is_correct=response.is_correct,
         rt_seconds=response.response_time_s,
-        response_timestamp=datetime.utcnow(),
-        item_pool=item_pool
+        response_timestamp=submitted_at,
+        item_pool=item_pool,
+        decision_tree=opening_tree,
     )
 
-    # 6. Save Snapshot
-    test_service.save_session_snapshot(db, test, result.session)
-    
-    # 7. Log Response (DB)
-    crud.test_item_log.create_test_item_log(db, response)
+    # 6-7. Save snapshot and log response (or append the event)
+    test_service.record_response(
+        db, test, result.session, response, responded_item_cand, submitted_at,
+        bank_version=active_bank.version,
+    )
 
     # 8. Check Stop
     if result.should_stop and result.global_risk:
@@ -169,6 +176,7 @@ def submit_response_endpoint(
         
         db.add(test)
         db.commit()
+        test_service.SESSION_CACHE.invalidate(test.id)
 
         return {
             "status": "completed",
@@ -185,25 +193,34 @@ def submit_response_endpoint(
 
     # 9. Next Item
     if result.next_item:
-        next_db_item = next((it for it in all_items if it.id == result.next_item.id), None)
         return {
             "status": "in_progress",
-            "next_item": item_to_response_dict(next_db_item)
+            "next_item": active_bank.payloads.get(result.next_item.id),
+            "prefetch": prefetch_payloads(result.session, result.next_item, active_bank, opening_tree)
         }
     else:
         # Fallback if no item but not stopped (active pool exhaustion?)
         return {"status": "completed_fallback", "message": "No more items available"}
 
+def prefetch_payloads(session, issued_item, active_bank, decision_tree=None) -> Dict[str, Any]:
+    """
+    Next item for both outcomes of the item being issued, so the client can
+    show it as soon as the child answers. The server still recomputes the
+    real next item on submit; a client whose submit response disagrees with
+    the prefetched one must switch to the returned item.
+    """
+    speculative = orchestration_engine.speculate_next_items(
+        session,
+        item=issued_item,
+        item_pool=active_bank.bank,
+        decision_tree=decision_tree,
+    )
+    return {
+        "if_correct": active_bank.payloads.get(speculative.if_correct.id) if speculative.if_correct else None,
+        "if_incorrect": active_bank.payloads.get(speculative.if_incorrect.id) if speculative.if_incorrect else None,
+    }
+
 def item_to_response_dict(item_obj):
     # Manual dict or schema dump
     # Prompt asks for specific content fields
-    return {
-        "id": item_obj.id,
-        "module_id": item_obj.module,
-        "difficulty": item_obj.difficulty,
-        "max_time_seconds": item_obj.max_time_s,
-        "prompt_text": item_obj.prompt_text,
-        "prompt_media": item_obj.prompt_media,
-        "correct_option": item_obj.correct_option,
-        "options_json": item_obj.options_json
-    }
+    return items_service.item_to_payload(item_obj)
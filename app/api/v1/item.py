@@ -10,7 +10,8 @@ router = APIRouter()
 
 @router.post("/", response_model=item_schema.Item, status_code=status.HTTP_201_CREATED)
 def create_item(item: item_schema.ItemCreate, db: Session = Depends(deps.get_db)):
-    return crud.item.create_item(db=db, item=item)
+    db_item = crud.item.create_item(db=db, item=item)
+    return db_item
 
 @router.get("/", response_model=List[item_schema.Item])
 def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from app import crud
+from app.schemas import result_set as result_set_schema
+from app.deps import deps
+
+router = APIRouter()
+
+@router.get("/", response_model=List[result_set_schema.ResultSet])
+def read_result_sets(skip: int = 0, limit: int = 100, db: Session = Depends(deps.get_db)):
+    return crud.result_set.get_result_sets(db, skip=skip, limit=limit)
+
+@router.get("/{result_set_id}", response_model=result_set_schema.ResultSet)
+def read_result_set(result_set_id: int, db: Session = Depends(deps.get_db)):
+    db_result_set = crud.result_set.get_result_set(db, result_set_id=result_set_id)
+    if db_result_set is None:
+        raise HTTPException(status_code=404, detail="Result set not found")
+    return db_result_set
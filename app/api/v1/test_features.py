@@ -13,8 +13,8 @@ def create_test_features(features: feat_schema.TestFeaturesCreate, db: Session =
     return crud.test_features.create_test_features(db=db, features=features)
 
 @router.get("/test/{test_id}", response_model=feat_schema.TestFeatures)
-def read_features_by_test(test_id: int, db: Session = Depends(deps.get_db)):
-    features = crud.test_features.get_features_by_test(db, test_id=test_id)
+def read_features_by_test(test_id: int, result_set: int = 0, db: Session = Depends(deps.get_db)):
+    features = crud.test_features.get_features_by_test(db, test_id=test_id, result_set=result_set)
     if features is None:
         raise HTTPException(status_code=404, detail="Features not found for this test")
     return features
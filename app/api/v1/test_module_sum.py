@@ -13,5 +13,5 @@ def create_test_module_sum(summary: sum_schema.TestModuleSumCreate, db: Session
     return crud.test_module_sum.create_test_module_sum(db=db, summary=summary)
 
 @router.get("/test/{test_id}", response_model=List[sum_schema.TestModuleSum])
-def read_summaries_by_test(test_id: int, db: Session = Depends(deps.get_db)):
-    return crud.test_module_sum.get_summaries_by_test(db, test_id=test_id)
+def read_summaries_by_test(test_id: int, result_set: int = 0, db: Session = Depends(deps.get_db)):
+    return crud.test_module_sum.get_summaries_by_test(db, test_id=test_id, result_set=result_set)
@@ -13,5 +13,5 @@ def create_test_xai(xai: xai_schema.TestXAICreate, db: Session = Depends(deps.ge
     return crud.test_xai.create_test_xai(db=db, xai=xai)
 
 @router.get("/test/{test_id}", response_model=List[xai_schema.TestXAI])
-def read_xai_by_test(test_id: int, db: Session = Depends(deps.get_db)):
-    return crud.test_xai.get_xai_by_test(db, test_id=test_id)
+def read_xai_by_test(test_id: int, result_set: int = 0, db: Session = Depends(deps.get_db)):
+    return crud.test_xai.get_xai_by_test(db, test_id=test_id, result_set=result_set)
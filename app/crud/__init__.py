@@ -5,3 +5,5 @@ from . import test_item_log
 from . import test_module_sum
 from . import test_features
 from . import test_xai
+from . import result_set
+from . import item_bank_version
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
+from app.crud import item_bank_version
 from typing import List
 
 def get_item(db: Session, item_id: int):
@@ -12,6 +13,7 @@ def get_items(db: Session, skip: int = 0, limit: int = 100):
 def create_item(db: Session, item: ItemCreate):
     db_item = Item(**item.dict())
     db.add(db_item)
+    item_bank_version.bump_version(db)
     db.commit()
     db.refresh(db_item)
     return db_item
@@ -24,6 +26,7 @@ def update_item(db: Session, item_id: int, item: ItemUpdate):
     for key, value in update_data.items():
         setattr(db_item, key, value)
     db.add(db_item)
+    item_bank_version.bump_version(db)
     db.commit()
     db.refresh(db_item)
     return db_item
@@ -33,5 +36,6 @@ def delete_item(db: Session, item_id: int):
     if not db_item:
         return None
     db.delete(db_item)
+    item_bank_version.bump_version(db)
     db.commit()
     return db_item
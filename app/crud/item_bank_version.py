@@ -0,0 +1,23 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from app.models.item_bank_version import ITEM_BANK_VERSION_ROW, ItemBankVersion
+
+def get_version(db: Session) -> int:
+    version = db.query(ItemBankVersion.version).filter(ItemBankVersion.id == ITEM_BANK_VERSION_ROW).scalar()
+    return version or 0
+
+def bump_version(db: Session) -> None:
+    """
+    Increment the item bank version in the caller's transaction: call
+    before committing any write to the item table, so the new items and
+    their version become visible to every process together.
+    """
+    now = datetime.utcnow()
+    updated = (
+        db.query(ItemBankVersion)
+        .filter(ItemBankVersion.id == ITEM_BANK_VERSION_ROW)
+        .update({ItemBankVersion.version: ItemBankVersion.version + 1, ItemBankVersion.updated_at: now},
+                synchronize_session=False)
+    )
+    if not updated:
+        db.add(ItemBankVersion(id=ITEM_BANK_VERSION_ROW, version=1, updated_at=now))
@@ -0,0 +1,9 @@
+from sqlalchemy.orm import Session
+from app.models.result_set import ResultSet
+from typing import List, Optional
+
+def get_result_set(db: Session, result_set_id: int):
+    return db.query(ResultSet).filter(ResultSet.id == result_set_id).first()
+
+def get_result_sets(db: Session, skip: int = 0, limit: int = 100):
+    return db.query(ResultSet).order_by(ResultSet.id.desc()).offset(skip).limit(limit).all()
@@ -10,5 +10,9 @@ def create_test_features(db: Session, features: TestFeaturesCreate):
     db.refresh(db_features)
     return db_features
 
-def get_features_by_test(db: Session, test_id: int):
-    return db.query(TestFeatures).filter(TestFeatures.test_id == test_id).first()
+def get_features_by_test(db: Session, test_id: int, result_set: int = 0):
+    return (
+        db.query(TestFeatures)
+        .filter(TestFeatures.test_id == test_id, TestFeatures.result_set == result_set)
+        .first()
+    )
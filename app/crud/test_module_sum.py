@@ -10,5 +10,9 @@ def create_test_module_sum(db: Session, summary: TestModuleSumCreate):
     db.refresh(db_summary)
     return db_summary
 
-def get_summaries_by_test(db: Session, test_id: int):
-    return db.query(TestModuleSum).filter(TestModuleSum.test_id == test_id).all()
+def get_summaries_by_test(db: Session, test_id: int, result_set: int = 0):
+    return (
+        db.query(TestModuleSum)
+        .filter(TestModuleSum.test_id == test_id, TestModuleSum.result_set == result_set)
+        .all()
+    )
@@ -10,5 +10,9 @@ def create_test_xai(db: Session, xai: TestXAICreate):
     db.refresh(db_xai)
     return db_xai
 
-def get_xai_by_test(db: Session, test_id: int):
-    return db.query(TestXAI).filter(TestXAI.test_id == test_id).all()
+def get_xai_by_test(db: Session, test_id: int, result_set: int = 0):
+    return (
+        db.query(TestXAI)
+        .filter(TestXAI.test_id == test_id, TestXAI.result_set == result_set)
+        .all()
+    )
@@ -5,12 +5,40 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def migrate_db():
+# Tables whose primary key changed: table -> (primary key columns, extra
+# table constraints). SQLite cannot alter a primary key, so they are rebuilt.
+PRIMARY_KEY_REBUILDS = {
+    "test_features": (("test_id", "result_set"), ("FOREIGN KEY(test_id) REFERENCES test (id)",)),
+}
+
+def _rebuild_primary_key(cursor, table, columns, primary_key, constraints):
+    """
+    Recreate `table` with `primary_key` (copying its rows) if its current
+    primary key differs. Returns True if the table was rebuilt.
+    """
+    cursor.execute(f"PRAGMA table_info({table})")
+    current = [row[1] for row in sorted(cursor.fetchall(), key=lambda row: row[5]) if row[5] > 0]
+    if tuple(current) == tuple(primary_key):
+        return False
+
+    logger.warning(f"Primary key of '{table}' is {current}, expected {list(primary_key)}. Rebuilding...")
+    definitions = [f"{col} {col_type}" for col, col_type in columns.items()]
+    definitions.append(f"PRIMARY KEY ({', '.join(primary_key)})")
+    definitions.extend(constraints)
+    names = ", ".join(columns)
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    cursor.execute(f"CREATE TABLE {table} ({', '.join(definitions)})")
+    cursor.execute(f"INSERT INTO {table} ({names}) SELECT {names} FROM {table}_old")
+    cursor.execute(f"DROP TABLE {table}_old")
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_{primary_key[0]} ON {table} ({primary_key[0]})")
+    logger.info(f"Successfully rebuilt '{table}'.")
+    return True
+
+def migrate_db(DB_FILE: str = "./sql_app.db"):
     """
     Checks for missing columns in all tables and adds them if necessary.
     This is a manual migration function to sync the DB schema with models.
     """
-    DB_FILE = "./sql_app.db"
     
     try:
         logger.info(f"Checking database schema at {DB_FILE}...")
@@ -23,6 +51,8 @@ def migrate_db():
                 "module": "VARCHAR NOT NULL",
                 "difficulty": "FLOAT NOT NULL",
                 "max_time_s": "FLOAT",
+                "discrimination": "FLOAT",
+                "guessing": "FLOAT",
                 "prompt_type": "VARCHAR",
                 "prompt_text": "TEXT",
                 "prompt_media": "VARCHAR",
@@ -56,6 +86,8 @@ def migrate_db():
                 "version": "VARCHAR",
                 "notes": "TEXT",
                 "session_state": "TEXT", # JSON
+                "session_blob": "BLOB", # binary snapshot
+                "checkpoint_seq": "INTEGER",
                 "status": "VARCHAR DEFAULT 'in_progress'",
                 "created_at": "DATETIME",
                 "updated_at": "DATETIME"
@@ -85,7 +117,9 @@ def migrate_db():
                 "created_at": "DATETIME"
             },
             "test_features": {
-                "test_id": "INTEGER",
+                "test_id": "INTEGER NOT NULL",
+                "result_set": "INTEGER NOT NULL DEFAULT 0",
+                "risk_label": "VARCHAR",
                 "p_risk_atrisk": "FLOAT",
                 "risk_entropy": "FLOAT",
                 "total_items": "INTEGER",
@@ -108,10 +142,14 @@ def migrate_db():
             "test_module_sum": {
                 "test_id": "INTEGER",
                 "module": "VARCHAR",
+                "result_set": "INTEGER NOT NULL DEFAULT 0",
                 "risk_label": "VARCHAR",
                 "p_weak_final": "FLOAT",
                 "p_strong_final": "FLOAT",
                 "entropy_final": "FLOAT",
+                "theta_eap_final": "FLOAT",
+                "theta_map_final": "FLOAT",
+                "theta_sd_final": "FLOAT",
                 "num_items": "INTEGER",
                 "avg_time_s": "FLOAT",
                 "min_time_s": "FLOAT",
@@ -127,9 +165,22 @@ def migrate_db():
             },
             "test_xai": {
                 "test_id": "INTEGER",
+                "result_set": "INTEGER NOT NULL DEFAULT 0",
                 "method": "VARCHAR",
                 "payload_json": "TEXT",
                 "created_at": "DATETIME"
+            },
+            "item_bank_version": {
+                "version": "INTEGER NOT NULL DEFAULT 0",
+                "updated_at": "DATETIME"
+            },
+            "result_set": {
+                "label": "VARCHAR",
+                "config_json": "TEXT",
+                "status": "VARCHAR NOT NULL DEFAULT 'running'",
+                "num_tests": "INTEGER",
+                "created_at": "DATETIME",
+                "completed_at": "DATETIME"
             }
         }
 
@@ -154,6 +205,11 @@ def migrate_db():
                         logger.info(f"Successfully added column '{col}' to '{table}'.")
                     except Exception as e:
                         logger.error(f"Failed to add column '{col}' to '{table}': {e}")
+
+            if table in PRIMARY_KEY_REBUILDS:
+                primary_key, constraints = PRIMARY_KEY_REBUILDS[table]
+                if _rebuild_primary_key(cursor, table, expected_columns, primary_key, constraints):
+                    changes_made = True
         
         if changes_made:
             conn.commit()
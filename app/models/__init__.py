@@ -5,3 +5,5 @@ from .test_item_log import TestItemLog
 from .test_module_sum import TestModuleSum
 from .test_features import TestFeatures
 from .test_xai import TestXAI
+from .result_set import ResultSet
+from .item_bank_version import ItemBankVersion
@@ -9,6 +9,8 @@ class Item(Base):
     module = Column(String, index=True, nullable=False)     # e.g. "RAN"
     difficulty = Column(Float, nullable=False)
     max_time_s = Column(Float, nullable=True)
+    discrimination = Column(Float, nullable=True) # 2PL slope; NULL = module default
+    guessing = Column(Float, nullable=True) # 3PL lower asymptote; NULL = 0
     prompt_type = Column(String, nullable=True) # e.g. "audio_text", "image"
     prompt_text = Column(Text, nullable=True)
     prompt_media = Column(String, nullable=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, DateTime
+from app.db.database import Base
+
+# id of the single item_bank_version row
+ITEM_BANK_VERSION_ROW = 1
+
+class ItemBankVersion(Base):
+    __tablename__ = "item_bank_version"
+
+    id = Column(Integer, primary_key=True) # always ITEM_BANK_VERSION_ROW
+    version = Column(Integer, nullable=False, default=0) # bumped with every write to the item table
+    updated_at = Column(DateTime, nullable=True)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from app.db.database import Base
+
+# result_set value of the TestModuleSum / TestFeatures / TestXAI rows written
+# when a test completes; re-scoring runs write under their ResultSet id (>= 1)
+LIVE_RESULT_SET = 0
+
+class ResultSet(Base):
+    __tablename__ = "result_set"
+
+    id = Column(Integer, primary_key=True, index=True) # version, referenced by result rows
+    label = Column(String, nullable=True)
+    config_json = Column(Text, nullable=True) # JSON engine config overrides (module constant names)
+    status = Column(String, nullable=False, default="running") # running, completed, failed
+    num_tests = Column(Integer, nullable=True)
+    created_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
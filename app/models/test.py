@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, JSON, LargeBinary
+from sqlalchemy.orm import relationship, deferred
 from app.db.database import Base
 from datetime import datetime
 
@@ -22,7 +22,9 @@ class Test(Base):
     device_id = Column(String, nullable=True)
     version = Column(String, nullable=True)
     notes = Column(Text, nullable=True)
-    session_state = Column(JSON, nullable=True) # JSON snapshot of SessionState
+    session_state = deferred(Column(JSON, nullable=True)) # JSON snapshot of SessionState (loaded on access)
+    session_blob = deferred(Column(LargeBinary, nullable=True)) # Binary snapshot of SessionState (snapshot_codec)
+    checkpoint_seq = Column(Integer, nullable=True) # Event-sourced mode: responses covered by the stored snapshot
     status = Column(String, nullable=False, default="in_progress") # in_progress, completed
     created_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, nullable=True)
@@ -30,5 +32,11 @@ class Test(Base):
     child = relationship("Child", back_populates="tests")
     item_logs = relationship("TestItemLog", back_populates="test")
     module_summaries = relationship("TestModuleSum", back_populates="test")
-    features = relationship("TestFeatures", back_populates="test", uselist=False)
+    # Live features only; re-scored result sets are queried by result_set
+    features = relationship(
+        "TestFeatures",
+        primaryjoin="and_(Test.id == TestFeatures.test_id, TestFeatures.result_set == 0)",
+        uselist=False,
+        viewonly=True,
+    )
     xai_records = relationship("TestXAI", back_populates="test")
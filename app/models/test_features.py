@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -6,8 +6,10 @@ class TestFeatures(Base):
     __tablename__ = "test_features"
 
     test_id = Column(Integer, ForeignKey("test.id"), primary_key=True, index=True)
+    result_set = Column(Integer, primary_key=True, default=0) # 0 = live result, else ResultSet.id
 
     # Overall features
+    risk_label = Column(String, nullable=True) # high, moderate, low
     p_risk_atrisk = Column(Float, nullable=True)
     risk_entropy = Column(Float, nullable=True)
     total_items = Column(Integer, nullable=True)
@@ -33,4 +35,4 @@ class TestFeatures(Base):
 
     created_at = Column(DateTime, nullable=True)
 
-    test = relationship("Test", back_populates="features")
+    test = relationship("Test")
@@ -8,12 +8,17 @@ class TestModuleSum(Base):
     id = Column(Integer, primary_key=True, index=True)
     test_id = Column(Integer, ForeignKey("test.id"), nullable=False)
     module = Column(String, index=True, nullable=False)
+    result_set = Column(Integer, index=True, nullable=False, default=0) # 0 = live result, else ResultSet.id
     risk_label = Column(String, nullable=True) # weak, strong, uncertain
 
     p_weak_final = Column(Float, nullable=True)
     p_strong_final = Column(Float, nullable=True)
     entropy_final = Column(Float, nullable=True)
 
+    theta_eap_final = Column(Float, nullable=True)
+    theta_map_final = Column(Float, nullable=True)
+    theta_sd_final = Column(Float, nullable=True)
+
     num_items = Column(Integer, nullable=True)
     avg_time_s = Column(Float, nullable=True)
     min_time_s = Column(Float, nullable=True)
@@ -7,6 +7,7 @@ class TestXAI(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     test_id = Column(Integer, ForeignKey("test.id"), nullable=False)
+    result_set = Column(Integer, index=True, nullable=False, default=0) # 0 = live result, else ResultSet.id
 
     method = Column(String, nullable=False)      # e.g. "SHAP", "DiCE"
     payload_json = Column(Text, nullable=False)  # raw JSON string
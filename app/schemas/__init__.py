@@ -5,3 +5,4 @@ from .test_item_log import TestItemLog, TestItemLogCreate, TestItemLogBase
 from .test_module_sum import TestModuleSum, TestModuleSumCreate, TestModuleSumBase
 from .test_features import TestFeatures, TestFeaturesCreate, TestFeaturesBase
 from .test_xai import TestXAI, TestXAICreate, TestXAIBase
+from .result_set import ResultSet, ResultSetBase
@@ -6,6 +6,8 @@ class ItemBase(BaseModel):
     module: str
     difficulty: float
     max_time_s: Optional[float] = None
+    discrimination: Optional[float] = None
+    guessing: Optional[float] = None
     prompt_text: Optional[str] = None
     prompt_media: Optional[str] = None
     is_active: bool = True
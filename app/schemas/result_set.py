@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class ResultSetBase(BaseModel):
+    label: Optional[str] = None
+    config_json: Optional[str] = None
+    status: str = "running"
+    num_tests: Optional[int] = None
+
+class ResultSet(ResultSetBase):
+    id: int
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -4,6 +4,8 @@ from typing import Optional
 
 class TestFeaturesBase(BaseModel):
     test_id: int
+    result_set: int = 0
+    risk_label: Optional[str] = None
     p_risk_atrisk: Optional[float] = None
     risk_entropy: Optional[float] = None
     total_items: Optional[int] = None
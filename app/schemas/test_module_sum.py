@@ -5,10 +5,14 @@ from typing import Optional
 class TestModuleSumBase(BaseModel):
     test_id: int
     module: str
+    result_set: int = 0
     risk_label: Optional[str] = None
     p_weak_final: Optional[float] = None
     p_strong_final: Optional[float] = None
     entropy_final: Optional[float] = None
+    theta_eap_final: Optional[float] = None
+    theta_map_final: Optional[float] = None
+    theta_sd_final: Optional[float] = None
     num_items: Optional[int] = None
     avg_time_s: Optional[float] = None
     min_time_s: Optional[float] = None
@@ -4,6 +4,7 @@ from typing import Optional
 
 class TestXAIBase(BaseModel):
     test_id: int
+    result_set: int = 0
     method: str
     payload_json: str
 
@@ -1,7 +1,12 @@
-from typing import Dict, List
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 from sqlalchemy.orm import Session
 from app.models.item import Item
-from app.adaptive_testing_module import selection
+from app.crud import item_bank_version
+from app.adaptive_testing_module import config, selection
+from app.adaptive_testing_module import decision_tree as dtree
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
 
 def load_active_items(db: Session) -> List[Item]:
     """
@@ -24,6 +29,8 @@ def build_item_pool(items: List[Item]) -> Dict[int, selection.CandidateItem]:
             module_id=it.module, # distinct from user prompt 'module_id' vs 'module'
             difficulty=it.difficulty,
             max_time_seconds=it.max_time_s or 60.0,
+            discrimination=it.discrimination,
+            guessing=it.guessing or 0.0,
         )
     return pool
 
@@ -39,3 +46,128 @@ def build_module_item_ids(items: List[Item]) -> Dict[str, List[int]]:
     for it in items:
         mapping.setdefault(it.module, []).append(it.id)
     return mapping
+
+def compile_item_bank(items: List[Item], version: int = 0) -> CompiledItemBank:
+    """
+    Build a CompiledItemBank (item pool + precomputed likelihood matrices)
+    from SQLAlchemy Item objects.
+
+    The result can be passed to the engine wherever an item_pool is expected.
+    """
+    return CompiledItemBank.from_item_pool(build_item_pool(items), version=version)
+
+def item_to_payload(item: Item) -> Dict[str, Any]:
+    """
+    Content fields of an item as returned to the client by the adaptive API.
+    """
+    return {
+        "id": item.id,
+        "module_id": item.module,
+        "difficulty": item.difficulty,
+        "max_time_seconds": item.max_time_s,
+        "prompt_text": item.prompt_text,
+        "prompt_media": item.prompt_media,
+        "correct_option": item.correct_option,
+        "options_json": item.options_json,
+    }
+
+
+# ---- Process-wide active item bank cache -----------------------------------
+
+@dataclass
+class ActiveItemBank:
+    """
+    Everything the adaptive API needs from the item table, built once per
+    bank version: the compiled bank (also the engine's item_pool), the
+    module -> item ids mapping and plain-dict item payloads (no ORM objects,
+    so entries are safe to share across DB sessions and threads), plus the
+    opening decision trees compiled for it (see get_opening_tree).
+    """
+    version: int
+    bank: CompiledItemBank
+    module_item_ids: Dict[str, List[int]]
+    payloads: Dict[int, Dict[str, Any]]
+    opening_trees: Dict[Tuple[config.EngineConfig, int], dtree.DecisionTree] = field(
+        default_factory=dict
+    )
+
+
+_bank_cache: Optional[ActiveItemBank] = None
+_bank_lock = threading.Lock()
+_tree_lock = threading.Lock()
+
+# Number of opening items served from a precompiled decision tree instead
+# of live selection (every child on the same bank and config gets the same
+# opening); 0 disables it. Depth 4 is 31 nodes, compiled in a few ms.
+OPENING_TREE_DEPTH = 4
+
+
+def get_active_item_bank(db: Session) -> ActiveItemBank:
+    """
+    Return the cached ActiveItemBank, loading active items from the database
+    only when the bank version changed (or the engine config the bank was
+    compiled against changed).
+
+    The version is read from the item_bank_version row (one primary key
+    lookup per call), which crud.item bumps in the same transaction as
+    every item write, so writes made by other workers are picked up too.
+    """
+    global _bank_cache
+    # Read before the items: an item write landing in between leaves newer
+    # items under the older version, reloaded on the next call
+    version = item_bank_version.get_version(db)
+    cached = _bank_cache
+    if cached is not None and cached.version == version and cached.bank.is_current():
+        return cached
+
+    with _bank_lock:
+        cached = _bank_cache
+        if cached is not None and cached.version == version and cached.bank.is_current():
+            return cached
+
+        items = load_active_items(db)
+        cached = ActiveItemBank(
+            version=version,
+            bank=compile_item_bank(items, version=version),
+            module_item_ids=build_module_item_ids(items),
+            payloads={it.id: item_to_payload(it) for it in items},
+        )
+        # Compile the opening tree now, not in the first start request
+        get_opening_tree(cached)
+        _bank_cache = cached
+        return cached
+
+
+def get_opening_tree(
+    active_bank: ActiveItemBank,
+    cfg: Optional[config.EngineConfig] = None,
+    depth: Optional[int] = None,
+) -> Optional[dtree.DecisionTree]:
+    """
+    First `depth` levels (default OPENING_TREE_DEPTH) of the adaptive
+    decision tree for the active bank under cfg (default: the active
+    config), compiled once per (bank version, config) and shared by every
+    test. Returns None when disabled.
+
+    Pass it to orchestration_engine.start_new_test / process_response /
+    speculate_next_items as decision_tree.
+    """
+    depth = OPENING_TREE_DEPTH if depth is None else depth
+    if depth <= 0:
+        return None
+    key = (config.resolve(cfg), depth)
+    tree = active_bank.opening_trees.get(key)
+    if tree is not None:
+        return tree
+
+    with _tree_lock:
+        tree = active_bank.opening_trees.get(key)
+        if tree is None:
+            tree = dtree.compile_decision_tree(
+                active_bank.bank,
+                active_bank.module_item_ids,
+                max_depth=depth,
+                cfg=key[0],
+            )
+            active_bank.opening_trees[key] = tree
+        return tree
@@ -0,0 +1,410 @@
+"""
+Bulk offline re-scoring of completed tests under another engine config.
+
+Completed tests keep the final_risk_label they were given when they
+finished. After a change to the scoring configuration (RISK_SCORE_*,
+MODULE_WEIGHTS, P_CONFIDENT, ...) the archive can be re-scored without
+touching those rows:
+
+- completed Test rows are streamed in id order, RESCORE_CHUNK_SIZE at a
+  time, with their TestItemLog responses (one query per chunk);
+- each chunk is replayed in a worker process through the batched engine
+  (SessionBatch.apply_responses, one recorded response per session per
+  tick), or through orchestration_engine.replay_events per test for the
+  modes SessionBatch does not support (RT_MODEL, JOINT_THETA_POSTERIOR);
+- the new TestModuleSum / TestFeatures / TestXAI rows are written under a
+  new ResultSet (a version recording the configuration used), next to the
+  live results (result_set 0).
+
+Only the recorded responses are replayed: items are not re-selected and
+stopping is not re-evaluated, so each test is scored on exactly the
+evidence it collected. Each response is replayed under the difficulty
+logged with it (the Item row's current difficulty when none was logged),
+so recalibrating the bank afterwards does not change old scores.
+
+Usage:
+    python -m app.services.rescoring --set RISK_SCORE_HIGH=0.6 \\
+        --set 'MODULE_WEIGHTS={"phonemic_awareness": 0.5, "ran": 0.4, "object_recognition": 0.1}' \\
+        --label "weights v2" --workers 8
+"""
+
+import dataclasses
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models.item import Item
+from app.models.result_set import ResultSet
+from app.models.test import Test
+from app.models.test_item_log import TestItemLog
+from app.adaptive_testing_module import bayes_vec, config, orchestration_engine, risk, selection
+from app.adaptive_testing_module.batch import NO_ITEM, SessionBatch
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
+from app.adaptive_testing_module.selection import CandidateItem
+from app.adaptive_testing_module.state import ModuleStats, SessionState
+from app.services import items as items_service, results as results_service
+
+# Completed tests per chunk (one log query, one SessionBatch, one commit)
+RESCORE_CHUNK_SIZE = 500
+# Chunks queued per worker process ahead of the writer
+RESCORE_PENDING_CHUNKS_PER_WORKER = 2
+
+
+class RecordedResponse(NamedTuple):
+    item_id: int
+    is_correct: bool
+    rt_seconds: float
+    timestamp: datetime
+    difficulty: Optional[float] = None  # as logged (None: the Item row's)
+
+
+class RecordedTest(NamedTuple):
+    test_id: int
+    started_at: datetime
+    responses: Tuple[RecordedResponse, ...]
+
+
+class RescoredTest(NamedTuple):
+    test_id: int
+    global_risk: risk.GlobalRiskResult
+    modules: Dict[str, ModuleStats]
+
+# ---- Loading ----------------------------------------------------------------
+
+def load_item_pool(db: Session) -> Dict[int, CandidateItem]:
+    """
+    Every item a recorded response can refer to: all Item rows, active or
+    not, plus the logged module and difficulty for ids without an Item row.
+    """
+    pool = items_service.build_item_pool(db.query(Item).all())
+    orphans = (
+        db.query(TestItemLog.item_id, TestItemLog.module, TestItemLog.difficulty)
+        .filter(~TestItemLog.item_id.in_(db.query(Item.id)))
+        .distinct()
+    )
+    for item_id, module_id, difficulty in orphans:
+        pool.setdefault(
+            item_id,
+            CandidateItem(
+                id=item_id,
+                module_id=module_id,
+                difficulty=difficulty or 0.0,
+                max_time_seconds=0.0,
+            ),
+        )
+    return pool
+
+def _recorded_test(test_id: int, start_time: Optional[datetime], rows: List[Any]) -> RecordedTest:
+    # Responses without a submission time are placed RT seconds after the
+    # previous one (the engine's clock only feeds the test duration)
+    started_at = start_time or (rows[0].submitted_at if rows and rows[0].submitted_at else datetime(1970, 1, 1))
+    clock = started_at
+    responses = []
+    for row in rows:
+        rt_seconds = row.response_time_s or 0.0
+        clock = row.submitted_at or clock + timedelta(seconds=rt_seconds)
+        responses.append(
+            RecordedResponse(row.item_id, bool(row.is_correct), rt_seconds, clock, row.difficulty)
+        )
+    return RecordedTest(test_id, started_at, tuple(responses))
+
+def iter_completed_tests(
+    db: Session,
+    chunk_size: int = RESCORE_CHUNK_SIZE,
+) -> Iterator[List[RecordedTest]]:
+    """
+    Completed tests with their responses (in recorded order), in chunks of
+    chunk_size, by ascending test id (keyset pagination: memory is bounded
+    by the chunk, not the archive).
+    """
+    last_id = 0
+    while True:
+        tests = (
+            db.query(Test.id, Test.start_time)
+            .filter(Test.status == "completed", Test.id > last_id)
+            .order_by(Test.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not tests:
+            return
+        last_id = tests[-1].id
+
+        rows_by_test: Dict[int, List[Any]] = {test.id: [] for test in tests}
+        rows = (
+            db.query(
+                TestItemLog.test_id,
+                TestItemLog.item_id,
+                TestItemLog.is_correct,
+                TestItemLog.response_time_s,
+                TestItemLog.submitted_at,
+                TestItemLog.difficulty,
+            )
+            .filter(TestItemLog.test_id.in_(list(rows_by_test)))
+            .order_by(TestItemLog.test_id, TestItemLog.global_index, TestItemLog.id)
+        )
+        for row in rows:
+            rows_by_test[row.test_id].append(row)
+
+        yield [_recorded_test(test.id, test.start_time, rows_by_test[test.id]) for test in tests]
+
+# ---- Replay (worker side) ---------------------------------------------------
+
+# Per-process replay context, set by init_worker
+_worker: Dict[str, Any] = {}
+
+def init_worker(overrides: Dict[str, Any], item_pool: Dict[int, CandidateItem]) -> None:
+    """
+    Build the worker's config and compiled bank once. The config is
+    rebuilt from the overrides rather than pickled, so every process
+    hashes it consistently.
+    """
+    cfg = config.default_config().replace(**overrides)
+    _worker["cfg"] = cfg
+    _worker["bank"] = CompiledItemBank.from_item_pool(item_pool, cfg=cfg)
+
+def _answered_item(bank: CompiledItemBank, response: RecordedResponse) -> CandidateItem:
+    """
+    The bank item under the difficulty it was answered at.
+    """
+    item = bank[response.item_id]
+    if response.difficulty is None or response.difficulty == item.difficulty:
+        return item
+    return dataclasses.replace(item, difficulty=response.difficulty)
+
+def _replay_batch(tests: List[RecordedTest], bank: CompiledItemBank, cfg: config.EngineConfig) -> List[SessionState]:
+    n = len(tests)
+    length = max((len(test.responses) for test in tests), default=0)
+    item_ids = np.full((n, length), NO_ITEM, dtype=np.int64)
+    is_correct = np.zeros((n, length), dtype=bool)
+    rt_seconds = np.zeros((n, length))
+    elapsed = np.zeros((n, length))
+    # Responses to items recalibrated since: step -> [(session, item as answered)]
+    recalibrated: Dict[int, List[Tuple[int, CandidateItem]]] = {}
+    for i, test in enumerate(tests):
+        for step, response in enumerate(test.responses):
+            item_ids[i, step] = response.item_id
+            is_correct[i, step] = response.is_correct
+            rt_seconds[i, step] = response.rt_seconds
+            elapsed[i, step] = (response.timestamp - test.started_at).total_seconds()
+            item = _answered_item(bank, response)
+            if item is not bank[response.item_id]:
+                recalibrated.setdefault(step, []).append((i, item))
+
+    sessions = SessionBatch(n, bank, cfg=cfg)
+    for step in range(length):
+        p_correct = None
+        if step in recalibrated:
+            p_correct = sessions.p_correct[sessions.columns(item_ids[:, step])]
+            for i, item in recalibrated[step]:
+                b, a, c = selection.item_parameters(item, cfg)
+                p_correct[i] = bayes_vec.prob_correct_grid(a, b, cfg, c)
+        sessions.apply_responses(
+            item_ids[:, step], is_correct[:, step], rt_seconds[:, step], elapsed[:, step], p_correct
+        )
+    return [
+        sessions.to_session_state(i, test_id=test.test_id, started_at=test.started_at)
+        for i, test in enumerate(tests)
+    ]
+
+def _replay_sequential(test: RecordedTest, bank: CompiledItemBank, cfg: config.EngineConfig) -> SessionState:
+    session = SessionState.initialise(
+        test.test_id, started_at=test.started_at, module_item_ids=bank.module_item_ids(), cfg=cfg
+    )
+    events = [
+        orchestration_engine.ResponseEvent(
+            item=_answered_item(bank, response),
+            is_correct=response.is_correct,
+            rt_seconds=response.rt_seconds,
+            timestamp=response.timestamp,
+        )
+        for response in test.responses
+    ]
+    item_pool = bank
+    if any(event.item is not bank[event.item.id] for event in events):
+        # The bank's likelihood rows are for the current difficulties
+        item_pool = CompiledItemBank((event.item for event in events), cfg=cfg)
+    return orchestration_engine.replay_events(session, events, item_pool, cfg)
+
+def rescore_chunk(tests: List[RecordedTest]) -> List[RescoredTest]:
+    """
+    Replay a chunk of tests under the worker's config and score them.
+
+    Responses to items of modules the config does not know are skipped.
+    """
+    cfg: config.EngineConfig = _worker["cfg"]
+    bank: CompiledItemBank = _worker["bank"]
+    tests = [
+        test._replace(responses=tuple(
+            response for response in test.responses
+            if response.item_id in bank and bank[response.item_id].module_id in cfg.modules
+        ))
+        for test in tests
+    ]
+
+    if cfg.rt_model or cfg.joint_theta_posterior:
+        # Not supported by SessionBatch: replay test by test
+        sessions = [_replay_sequential(test, bank, cfg) for test in tests]
+    else:
+        sessions = _replay_batch(tests, bank, cfg)
+
+    rescored = []
+    for session in sessions:
+        global_risk = risk.compute_global_risk(session, cfg)
+        global_risk.explanation  # build in the worker, not the writer
+        rescored.append(RescoredTest(session.test_id, global_risk, session.modules))
+    return rescored
+
+# ---- Driver -----------------------------------------------------------------
+
+def _rescored_chunks(
+    chunks: Iterator[List[RecordedTest]],
+    overrides: Dict[str, Any],
+    item_pool: Dict[int, CandidateItem],
+    workers: int,
+) -> Iterator[List[RescoredTest]]:
+    if workers <= 1:
+        init_worker(overrides, item_pool)
+        for chunk in chunks:
+            yield rescore_chunk(chunk)
+        return
+
+    max_pending = RESCORE_PENDING_CHUNKS_PER_WORKER * workers
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker, initargs=(overrides, item_pool)
+    ) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(rescore_chunk, chunk))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def config_snapshot(cfg: config.EngineConfig) -> Dict[str, Any]:
+    """
+    Effective configuration by module constant name (ResultSet.config_json).
+    """
+    return {constant: getattr(cfg, field) for field, constant in config.CONFIG_CONSTANTS.items()}
+
+def rescore_completed_tests(
+    db: Session,
+    overrides: Optional[Dict[str, Any]] = None,
+    *,
+    label: Optional[str] = None,
+    chunk_size: int = RESCORE_CHUNK_SIZE,
+    workers: int = 1,
+    progress: Optional[Callable[[int], None]] = None,
+) -> ResultSet:
+    """
+    Re-score every completed test under the active config with
+    `overrides` applied (module constant or field names) and store the
+    results as a new ResultSet.
+
+    Chunks are replayed by `workers` processes (in this process when
+    workers <= 1) and committed as they complete, so the rows of a chunk
+    are visible once ResultSet.num_tests has been advanced past it.
+    `progress` is called with the running number of re-scored tests.
+
+    Raises TypeError for an unknown override name; the result set is
+    marked "failed" if the run raises.
+    """
+    overrides = dict(overrides or {})
+    cfg = config.default_config().replace(**overrides)
+
+    result_set = ResultSet(
+        label=label,
+        config_json=json.dumps(config_snapshot(cfg)),
+        status="running",
+        num_tests=0,
+        created_at=datetime.utcnow(),
+    )
+    db.add(result_set)
+    db.commit()
+
+    try:
+        item_pool = load_item_pool(db)
+        chunks = iter_completed_tests(db, chunk_size)
+        for rescored in _rescored_chunks(chunks, overrides, item_pool, workers):
+            for test in rescored:
+                db.add_all(results_service.build_result_rows(
+                    test.test_id, test.global_risk, test.modules, result_set=result_set.id
+                ))
+            result_set.num_tests += len(rescored)
+            db.commit()
+            if progress is not None:
+                progress(result_set.num_tests)
+    except BaseException:
+        db.rollback()
+        result_set.status = "failed"
+        db.commit()
+        raise
+
+    result_set.status = "completed"
+    result_set.completed_at = datetime.utcnow()
+    db.commit()
+    return result_set
+
+def parse_override(text: str) -> Tuple[str, Any]:
+    """
+    "NAME=VALUE" -> (NAME, VALUE parsed as JSON, or the raw string).
+    """
+    name, sep, value = text.partition("=")
+    if not sep or not name:
+        raise ValueError(f"Expected NAME=VALUE, got {text!r}")
+    try:
+        return name.strip(), json.loads(value)
+    except json.JSONDecodeError:
+        return name.strip(), value
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    import app.models  # noqa: F401 (register every table)
+    from app.db.database import Base
+    from app.db.migration import migrate_db
+
+    parser = argparse.ArgumentParser(description="Re-score completed tests under another engine configuration")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="NAME=VALUE",
+                        help="Config override, e.g. RISK_SCORE_HIGH=0.6 (VALUE is parsed as JSON; repeatable)")
+    parser.add_argument("--label", default=None, help="Label stored on the result set")
+    parser.add_argument("--db", default="./sql_app.db", help="SQLite database file")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE, help="Tests per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args()
+
+    try:
+        overrides = dict(parse_override(text) for text in args.overrides)
+        config.default_config().replace(**overrides)
+    except (ValueError, TypeError) as exc:
+        parser.error(str(exc))
+
+    migrate_db(args.db)
+    engine = create_engine(f"sqlite:///{args.db}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    t0 = time.perf_counter()
+    result_set = rescore_completed_tests(
+        db,
+        overrides,
+        label=args.label,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        progress=lambda done: print(f"  {done} tests re-scored ({time.perf_counter() - t0:.1f} s)"),
+    )
+    print(f"Result set {result_set.id}: {result_set.num_tests} tests in {time.perf_counter() - t0:.1f} s")
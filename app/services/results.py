@@ -1,11 +1,14 @@
 from sqlalchemy.orm import Session
 import json
 from datetime import datetime
+from typing import List
 
 from app.models.test import Test
 from app.models.test_module_sum import TestModuleSum
 from app.models.test_features import TestFeatures
 from app.models.test_xai import TestXAI
+from app.models.result_set import LIVE_RESULT_SET
+from app.db.database import Base
 from app.adaptive_testing_module.risk import GlobalRiskResult
 from app.adaptive_testing_module import config
 
@@ -18,7 +21,9 @@ def save_module_summaries(
     Persist per-module summary entries for a completed test.
     """
     # Clear existing summaries if you want to regenerate (idempotence)
-    db.query(TestModuleSum).filter(TestModuleSum.test_id == test.id).delete()
+    db.query(TestModuleSum).filter(
+        TestModuleSum.test_id == test.id, TestModuleSum.result_set == LIVE_RESULT_SET
+    ).delete()
 
     for module_id, mc in global_risk.modules.items():
         # mc is ModuleClassification
@@ -41,52 +46,55 @@ def save_module_summaries(
     # I will implement a version that takes session as well, because my data model requires it.
     pass
 
-def save_test_results(
-    db: Session,
-    test: Test,
+def build_result_rows(
+    test_id: int,
     global_risk: GlobalRiskResult,
-    session_modules: dict # passing session.modules
-) -> None:
+    session_modules: dict, # session.modules
+    result_set: int = LIVE_RESULT_SET,
+) -> List[Base]:
     """
-    Persist module summaries and risk summaries.
-    Combines logic for TestModuleSum, TestFeatures, TestXAI.
+    TestModuleSum, TestFeatures and TestXAI rows for a scored test, in
+    result set `result_set` (LIVE_RESULT_SET for the results recorded at
+    completion, a ResultSet id for a re-scoring run).
     """
+    created_at = datetime.utcnow()
+    rows: List[Base] = []
+
     # 1. Module Summaries
-    db.query(TestModuleSum).filter(TestModuleSum.test_id == test.id).delete()
-    
     for module_id, mod_stats in session_modules.items():
         # Get risk classification if avail
         mc = global_risk.modules.get(module_id)
         
-        summary = TestModuleSum(
-            test_id=test.id,
+        rows.append(TestModuleSum(
+            test_id=test_id,
             module=module_id,
+            result_set=result_set,
             risk_label=mc.label if mc else None,
             p_weak_final=mod_stats.p_weak,
             p_strong_final=mod_stats.p_strong,
             entropy_final=mod_stats.entropy,
+            theta_eap_final=mod_stats.theta_eap,
+            theta_map_final=mod_stats.theta_map,
+            theta_sd_final=mod_stats.theta_sd,
             num_items=mod_stats.num_items,
             avg_time_s=mod_stats.sum_rt / mod_stats.num_items if mod_stats.num_items > 0 else 0.0,
             total_correct_count=mod_stats.correct,
             slow_correct_count=mod_stats.slow_correct,
             slow_correct_ratio=mod_stats.slow_correct / mod_stats.correct if mod_stats.correct > 0 else 0.0,
-            created_at=datetime.utcnow()
-        )
-        db.add(summary)
+            created_at=created_at
+        ))
 
     # 2. Risk Summary (Features + XAI)
-    # Clear existing
-    db.query(TestFeatures).filter(TestFeatures.test_id == test.id).delete()
-    db.query(TestXAI).filter(TestXAI.test_id == test.id).delete()
-
     # Features
     feat_data = {
-        "test_id": test.id,
+        "test_id": test_id,
+        "result_set": result_set,
+        "risk_label": global_risk.risk_category,
         "p_risk_atrisk": global_risk.risk_score,
         "risk_entropy": 1.0 - global_risk.confidence, # approx
         "total_items": sum(m.num_items for m in session_modules.values()),
         # total_time_s is in test model usually, but can be here too
-        "created_at": datetime.utcnow()
+        "created_at": created_at
     }
     
     # Map specific modules if they exist (hardcoded mapping for features schema)
@@ -112,14 +120,33 @@ def save_test_results(
             "slow_corr_ratio_phonology": m.slow_correct / m.correct if m.correct > 0 else 0,
         })
 
-    features = TestFeatures(**feat_data)
-    db.add(features)
+    rows.append(TestFeatures(**feat_data))
 
     # XAI
-    xai = TestXAI(
-        test_id=test.id,
+    rows.append(TestXAI(
+        test_id=test_id,
+        result_set=result_set,
         method="adaptive_risk_profile",
         payload_json=json.dumps(global_risk.explanation),
-        created_at=datetime.utcnow()
-    )
-    db.add(xai)
+        created_at=created_at
+    ))
+    return rows
+
+def save_test_results(
+    db: Session,
+    test: Test,
+    global_risk: GlobalRiskResult,
+    session_modules: dict, # passing session.modules
+    result_set: int = LIVE_RESULT_SET,
+) -> None:
+    """
+    Persist module summaries and risk summaries.
+    Combines logic for TestModuleSum, TestFeatures, TestXAI.
+
+    Replaces the test's existing rows in the same result set (idempotence);
+    other result sets are left untouched.
+    """
+    for model in (TestModuleSum, TestFeatures, TestXAI):
+        db.query(model).filter(model.test_id == test.id, model.result_set == result_set).delete()
+
+    db.add_all(build_result_rows(test.id, global_risk, session_modules, result_set))
@@ -0,0 +1,109 @@
+# app/simulations/benchmark_quadrature.py
+import sys
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.append(os.getcwd())
+
+from app.adaptive_testing_module import bayes, config, orchestration_engine, quadrature
+from app.adaptive_testing_module.config import EngineConfig
+from app.adaptive_testing_module.state import SessionState
+from app.simulations.item_bank import load_item_bank_from_csv
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
+
+STARTED = datetime(2024, 1, 1)
+
+
+def step_latencies(cfg: EngineConfig, num_sessions: int, seed: int) -> List[float]:
+    """
+    Wall time (seconds) of every process_response call over num_sessions
+    random-answer sessions on a bank compiled for cfg.
+    """
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    bank = CompiledItemBank.from_item_pool(item_pool, cfg=cfg)
+    rng = random.Random(seed)
+    latencies: List[float] = []
+
+    for test_id in range(num_sessions):
+        res = orchestration_engine.start_new_test(
+            test_id, module_item_ids, bank, started_at=STARTED, cfg=cfg
+        )
+        session, item, step = res.session, res.first_item, 0
+        while item is not None:
+            step += 1
+            t0 = time.perf_counter()
+            out = orchestration_engine.process_response(
+                session,
+                module_id=item.module_id,
+                item=item,
+                is_correct=rng.random() < 0.6,
+                rt_seconds=2.0,
+                response_timestamp=STARTED + timedelta(seconds=5 * step),
+                item_pool=bank,
+                cfg=cfg,
+            )
+            latencies.append(time.perf_counter() - t0)
+            item = out.next_item
+    return latencies
+
+
+def p_weak_error(cfg: EngineConfig, reference: EngineConfig, num_paths: int, seed: int) -> float:
+    """
+    Largest |p_weak - reference p_weak| over random 6-response paths of a
+    single module, comparing cfg's grid with a reference grid.
+    """
+    item_pool, _ = load_item_bank_from_csv()
+    items = [it for it in item_pool.values() if it.module_id == "ran"]
+    rng = random.Random(seed)
+    worst = 0.0
+    for _ in range(num_paths):
+        path = [(rng.choice(items), rng.random() < 0.5) for _ in range(6)]
+        values = []
+        for c in (cfg, reference):
+            stats = SessionState.initialise(0, cfg=c).modules["ran"]
+            for item, is_correct in path:
+                bayes.update_module_stats_for_item(stats, "ran", item.difficulty, is_correct, cfg=c)
+            values.append(stats.p_weak)
+        worst = max(worst, abs(values[0] - values[1]))
+    return worst
+
+
+def main(points: List[int], num_sessions: int, budget_ms: float, seed: int):
+    base = config.default_config()
+    reference = base.replace(THETA_QUADRATURE_POINTS=quadrature.MAX_QUADRATURE_POINTS)
+    results: Dict[int, float] = {}
+
+    print(f"{'points':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'p_weak err':>11}")
+    for n in points:
+        cfg = base.replace(THETA_QUADRATURE_POINTS=n)
+        step_latencies(cfg, 2, seed)  # warm caches (bank, grids, opening gains)
+        lat = np.array(step_latencies(cfg, num_sessions, seed)) * 1000.0
+        err = p_weak_error(cfg, reference, 200, seed)
+        p95 = float(np.percentile(lat, 95))
+        results[n] = p95
+        label = n if n else len(cfg.theta_nodes)
+        print(f"{label:>6} {np.median(lat):8.3f} {p95:8.3f} {lat.max():8.3f} {err:11.5f}")
+
+    over = [n for n, p95 in results.items() if p95 > budget_ms]
+    if over:
+        print(f"p95 step latency over the {budget_ms} ms budget for: {over}")
+        sys.exit(1)
+    print(f"All p95 step latencies within the {budget_ms} ms budget")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Step latency and p_weak accuracy of the theta quadrature")
+    parser.add_argument("--points", type=int, nargs="+", default=[0, 41, 101, 201],
+                        help="THETA_QUADRATURE_POINTS values (0 = THETA_GRID)")
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions per setting")
+    parser.add_argument("--budget-ms", type=float, default=5.0, help="p95 step latency budget")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    main(args.points, args.sessions, args.budget_ms, args.seed)
@@ -0,0 +1,39 @@
+import sys
+import os
+import time
+
+# Ensure app is in path if running directly
+sys.path.append(os.getcwd())
+
+from app.adaptive_testing_module import config
+from app.adaptive_testing_module.decision_tree import compile_decision_tree, STOP
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+
+
+def main(bank_path: str, out_path: str, max_depth: int):
+    bank = load_compiled_item_bank_from_csv(bank_path)
+
+    t0 = time.time()
+    tree = compile_decision_tree(bank, max_depth=max_depth)
+    elapsed = time.time() - t0
+
+    tree.save(out_path)
+
+    stops = sum(
+        (c == STOP) + (i == STOP)
+        for c, i in zip(tree.child_correct, tree.child_incorrect)
+    )
+    print(f"Compiled {len(tree)} nodes ({stops} stop edges) in {elapsed:.1f}s")
+    print(f"Fingerprint: {tree.fingerprint}")
+    print(f"Written to {out_path} ({os.path.getsize(out_path) / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Compile the EF-ADS decision tree for an item bank")
+    parser.add_argument("--bank", default="ef_ads_item_bank.csv", help="Item bank CSV")
+    parser.add_argument("--out", default="ef_ads_decision_tree.json", help="Output path")
+    parser.add_argument("--depth", type=int, default=config.MAX_ITEMS_TOTAL, help="Items to compile")
+    args = parser.parse_args()
+
+    main(args.bank, args.out, args.depth)
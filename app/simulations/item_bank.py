@@ -1,6 +1,8 @@
 import csv
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from app.adaptive_testing_module.config import EngineConfig
 from app.adaptive_testing_module.selection import CandidateItem
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
 
 def load_item_bank_from_csv(path: str = "ef_ads_item_bank.csv") -> Tuple[Dict[int, CandidateItem], Dict[str, List[int]]]:
     items: Dict[int, CandidateItem] = {}
@@ -13,13 +15,25 @@ def load_item_bank_from_csv(path: str = "ef_ads_item_bank.csv") -> Tuple[Dict[in
             module = row["module"]
             difficulty = float(row["difficulty"])
             max_time_s = float(row["max_time_s"])
+            # Optional item-level parameters; blank or missing -> module default / 2PL
+            discrimination = row.get("discrimination") or None
+            guessing = row.get("guessing") or None
             
             items[item_id] = CandidateItem(
                 id=item_id,
                 module_id=module,
                 difficulty=difficulty,
                 max_time_seconds=max_time_s,
+                discrimination=float(discrimination) if discrimination is not None else None,
+                guessing=float(guessing) if guessing is not None else 0.0,
             )
             module_item_ids.setdefault(module, []).append(item_id)
             
     return items, module_item_ids
+
+def load_compiled_item_bank_from_csv(
+    path: str = "ef_ads_item_bank.csv",
+    cfg: Optional[EngineConfig] = None,
+) -> CompiledItemBank:
+    items, _ = load_item_bank_from_csv(path)
+    return CompiledItemBank.from_item_pool(items, cfg=cfg)
@@ -19,14 +19,12 @@ BEST_CFG = {
 }
 
 
-def apply_best_config():
-    for k, v in BEST_CFG.items():
-        setattr(config, k, v)
+def best_config() -> config.EngineConfig:
+    return config.default_config().replace(**BEST_CFG)
 
 
 def profile_breakdown(num_runs_per_profile: int = 500, seed: int = 123):
-    apply_best_config()
-    results = run_batch(num_runs_per_profile=num_runs_per_profile, seed=seed)
+    results = run_batch(num_runs_per_profile=num_runs_per_profile, seed=seed, cfg=best_config())
 
     # Global counters for at-risk vs not-at-risk misclassification
     at_risk_TP = at_risk_FN = 0
@@ -1,17 +1,23 @@
 import random
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
 from app.adaptive_testing_module import bayes, orchestration_engine, risk
+from app.adaptive_testing_module.config import EngineConfig
 from app.adaptive_testing_module.selection import CandidateItem
 from .profiles import SyntheticChild, PROFILES
-from .item_bank import load_item_bank_from_csv
+from .item_bank import load_compiled_item_bank_from_csv
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
+from app.adaptive_testing_module.batch import NO_ITEM, SessionBatch
 
 def simulate_response(child: SyntheticChild, item: CandidateItem, a_by_module: Dict[str, float]) -> Tuple[bool, float]:
     theta = child.theta_by_module.get(item.module_id, 0.0)
-    a = a_by_module.get(item.module_id, 1.0)
+    a = item.discrimination if item.discrimination is not None else a_by_module.get(item.module_id, 1.0)
     b = item.difficulty
     
-    p_correct = bayes.prob_correct(theta, a, b)
+    p_correct = bayes.prob_correct(theta, a, b, item.guessing)
     is_correct = random.random() < p_correct
 
     # Simple RT model: harder + incorrect = slower
@@ -22,8 +28,15 @@ def simulate_response(child: SyntheticChild, item: CandidateItem, a_by_module: D
     rt = max(0.5, base_rt + diff_effect + error_effect + noise)
     return is_correct, rt
 
-def simulate_one_test(child: SyntheticChild, test_id: int) -> Dict[str, Any]:
-    item_pool, module_item_ids = load_item_bank_from_csv()
+def simulate_one_test(
+    child: SyntheticChild,
+    test_id: int,
+    bank: CompiledItemBank = None,
+    cfg: Optional[EngineConfig] = None,
+) -> Dict[str, Any]:
+    # The compiled bank is read-only, so one instance serves every simulated test
+    item_pool = bank if bank is not None else load_compiled_item_bank_from_csv(cfg=cfg)
+    module_item_ids = item_pool.module_item_ids()
     
     # Discrimination params roughly matching config.ITEM_DISCRIMINATION or tweaked
     a_by_module = {
@@ -40,6 +53,7 @@ def simulate_one_test(child: SyntheticChild, test_id: int) -> Dict[str, Any]:
         module_item_ids=module_item_ids,
         item_pool=item_pool,
         started_at=start_time,
+        cfg=cfg,
     )
     
     session = start_res.session
@@ -60,6 +74,7 @@ def simulate_one_test(child: SyntheticChild, test_id: int) -> Dict[str, Any]:
             rt_seconds=rt,
             response_timestamp=start_time + timedelta(seconds=step * 5),
             item_pool=item_pool,
+            cfg=cfg,
         )
         
         session = result.session
@@ -71,7 +86,7 @@ def simulate_one_test(child: SyntheticChild, test_id: int) -> Dict[str, Any]:
 
     # Fallback if loop ends without explicit stop triggering risk calc
     if global_risk is None:
-        global_risk = risk.compute_global_risk(session)
+        global_risk = risk.current_risk(session, cfg)
 
     total_items = sum(m.num_items for m in session.modules.values())
     
@@ -82,15 +97,20 @@ def simulate_one_test(child: SyntheticChild, test_id: int) -> Dict[str, Any]:
         # Potentially return module breakdown if needed
     }
 
-def run_batch(num_runs_per_profile: int, seed: int = 42) -> Dict[str, Dict]:
+def run_batch(
+    num_runs_per_profile: int,
+    seed: int = 42,
+    cfg: Optional[EngineConfig] = None,
+) -> Dict[str, Dict]:
     random.seed(seed)
     results: Dict[str, Dict] = {}
     test_id = 1
+    bank = load_compiled_item_bank_from_csv(cfg=cfg)
 
     for child in PROFILES:
         runs: List[Dict] = []
         for _ in range(num_runs_per_profile):
-            r = simulate_one_test(child, test_id)
+            r = simulate_one_test(child, test_id, bank=bank, cfg=cfg)
             runs.append(r)
             test_id += 1
             
@@ -100,3 +120,55 @@ def run_batch(num_runs_per_profile: int, seed: int = 42) -> Dict[str, Dict]:
         }
         
     return results
+
+def run_batch_vectorized(
+    num_runs_per_profile: int,
+    seed: int = 42,
+    cfg: Optional[EngineConfig] = None,
+) -> Dict[str, Dict]:
+    """
+    Same output as run_batch, with all runs of a profile advanced together
+    through one SessionBatch. Draws random numbers in a different order,
+    so individual runs differ from run_batch for the same seed.
+    """
+    random.seed(seed)
+    results: Dict[str, Dict] = {}
+    bank = load_compiled_item_bank_from_csv(cfg=cfg)
+    a_by_module = {
+        "phonemic_awareness": 1.4,
+        "ran": 1.2,
+        "object_recognition": 0.8,
+    }
+    start_time = datetime.utcnow()
+
+    for child in PROFILES:
+        n = num_runs_per_profile
+        batch = SessionBatch(n, bank, bank.module_item_ids(), cfg=cfg)
+        current = batch.start()
+        step = 0
+
+        while step < 100 and np.any(current != NO_ITEM):
+            step += 1
+            is_correct = np.zeros(n, dtype=bool)
+            rts = np.zeros(n)
+            for i, item_id in enumerate(current):
+                if item_id != NO_ITEM:
+                    is_correct[i], rts[i] = simulate_response(child, bank[int(item_id)], a_by_module)
+            current = batch.step(current, is_correct, rts, np.full(n, step * 5.0))
+
+        runs: List[Dict] = []
+        for i in range(n):
+            session = batch.to_session_state(i, started_at=start_time)
+            global_risk = risk.compute_global_risk(session, batch.cfg)
+            runs.append({
+                "risk_category": global_risk.risk_category,
+                "risk_score": global_risk.risk_score,
+                "total_items": int(batch.num_items[i].sum()),
+            })
+
+        results[child.name] = {
+            "ground_truth": child.ground_truth,
+            "runs": runs,
+        }
+
+    return results
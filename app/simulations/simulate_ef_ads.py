@@ -95,10 +95,10 @@ children = [
 
 def simulate_response_for_child(child: SyntheticChild, item: selection.CandidateItem) -> Tuple[bool, float]:
     theta = child.theta_by_module.get(item.module_id, 0.0) # Fallback if missing
-    a = config.ITEM_DISCRIMINATION.get(item.module_id, 1.0)
+    a = item.discrimination if item.discrimination is not None else config.ITEM_DISCRIMINATION.get(item.module_id, 1.0)
     b = item.difficulty
 
-    p_correct = bayes.prob_correct(theta, a, b)
+    p_correct = bayes.prob_correct(theta, a, b, item.guessing)
     is_correct = random.random() < p_correct
 
     # Simple RT model
@@ -2,7 +2,8 @@ import itertools
 import csv
 import sys
 import os
-from typing import Dict, Any, List
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
 
 # Ensure app is in path if running directly
 sys.path.append(os.getcwd())
@@ -25,27 +26,32 @@ def iter_configs(grid: Dict[str, List[Any]]):
     for combo in itertools.product(*vals):
         yield dict(zip(keys, combo))
 
-def apply_config(cfg: Dict[str, Any]):
-    for k, v in cfg.items():
-        setattr(config, k, v)
+def evaluate_config(args: Tuple[config.EngineConfig, int, int]) -> Dict[str, Any]:
+    # Each candidate is an EngineConfig passed to the engine, so candidates
+    # do not share module state and can be evaluated in worker processes
+    engine_cfg, num_runs_per_profile, seed = args
+    batch = run_batch(num_runs_per_profile=num_runs_per_profile, seed=seed, cfg=engine_cfg)
+    return compute_metrics(batch)
 
-def run_grid_search(num_runs_per_profile: int, seed: int = 42):
+def run_grid_search(num_runs_per_profile: int, seed: int = 42, workers: int = 1):
     configs = list(iter_configs(PARAM_GRID))
     best_j = -2.0 # Initialize low
     best_cfg = None
     best_metrics = None
     all_rows: List[Dict[str, Any]] = []
 
-    # Store original config to restore later
-    original = {k: getattr(config, k, None) for k in PARAM_GRID.keys()}
+    base = config.default_config()
+    jobs = [(base.replace(**cfg), num_runs_per_profile, seed) for cfg in configs]
 
     print(f"Starting grid search with {len(configs)} configurations...")
 
-    for i, cfg in enumerate(configs):
-        apply_config(cfg)
-        batch = run_batch(num_runs_per_profile=num_runs_per_profile, seed=seed)
-        metrics = compute_metrics(batch)
-        
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            all_metrics = list(pool.map(evaluate_config, jobs))
+    else:
+        all_metrics = map(evaluate_config, jobs)
+
+    for i, (cfg, metrics) in enumerate(zip(configs, all_metrics)):
         row = {**cfg, **metrics}
         all_rows.append(row)
 
@@ -66,10 +72,6 @@ def run_grid_search(num_runs_per_profile: int, seed: int = 42):
         with open("tuning_log.txt", "a") as f:
             f.write(log_msg)
 
-    # Restore original config
-    if original:
-        apply_config(original)
-        
     return all_rows, best_cfg, best_metrics
 
 def save_results(path: str, rows: List[Dict[str, Any]]):
@@ -86,6 +88,7 @@ if __name__ == "__main__":
     parser.add_argument("--runs", type=int, default=500, help="Simulations per child profile")
     parser.add_argument("--seed", type=int, default=42, help="Random seed")
     parser.add_argument("--quick", action="store_true", help="Run a smaller grid for quick testing")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes for evaluating configs")
     args = parser.parse_args()
 
     if args.quick:
@@ -100,7 +103,7 @@ if __name__ == "__main__":
     # Dynamically inject PARAM_GRID if needed, but it's global here
     
     print(f"EF-ADS tuning: runs/profile={args.runs}")
-    rows, best_cfg, best_metrics = run_grid_search(args.runs, args.seed)
+    rows, best_cfg, best_metrics = run_grid_search(args.runs, args.seed, args.workers)
     save_results("tuning_grid_results.csv", rows)
 
     if best_cfg:
@@ -0,0 +1,105 @@
+"""
+Shared helpers for the engine tests.
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from app.adaptive_testing_module import orchestration_engine
+from app.adaptive_testing_module.selection import CandidateItem
+from app.adaptive_testing_module.state import SessionState
+
+STARTED = datetime(2024, 1, 1)
+
+# (step, issued item) -> (is_correct, rt_seconds)
+AnswerFn = Callable[[int, CandidateItem], Tuple[bool, float]]
+
+
+class SessionRun(NamedTuple):
+    session: SessionState
+    path: List[int]                                   # answered item ids, in order
+    responses: List[orchestration_engine.ResponseEvent]
+    result: Optional[orchestration_engine.ProcessResponseResult]  # of the last response
+    next_item: Optional[CandidateItem]                # issued, not answered (None once stopped)
+
+
+def random_answers(seed: int, max_rt_seconds: float = 8.0) -> AnswerFn:
+    """
+    Answers correct with probability 0.5 and RTs uniform in
+    [0.5, max_rt_seconds), reproducible from seed.
+    """
+    rng = random.Random(seed)
+    return lambda step, item: (rng.random() < 0.5, rng.uniform(0.5, max_rt_seconds))
+
+
+def run_session(
+    bank,
+    answers: Union[Sequence[bool], AnswerFn, None] = None,
+    *,
+    seed: int = 0,
+    cfg=None,
+    module_item_ids=None,
+    test_id: int = 1,
+    started_at: datetime = STARTED,
+    step_seconds: float = 5.0,
+    rt_seconds: float = 2.0,
+    decision_tree=None,
+    session: Optional[SessionState] = None,
+    item: Optional[CandidateItem] = None,
+    first_step: int = 1,
+    on_response: Optional[Callable] = None,
+) -> SessionRun:
+    """
+    Start a test on bank (a compiled bank, or an item pool dict with
+    module_item_ids) or continue `session` from its issued `item`, and
+    answer through process_response until it stops or the answers run out.
+
+    answers is a sequence of correctness flags (answered in rt_seconds),
+    a function (step, item) -> (is_correct, rt_seconds), or None for
+    random_answers(seed). Response `step` (counted from first_step) is
+    submitted at started_at + step * step_seconds; on_response(session,
+    result) is called after each one.
+    """
+    if session is None:
+        res = orchestration_engine.start_new_test(
+            test_id, module_item_ids or bank.module_item_ids(), bank, started_at=started_at,
+            decision_tree=decision_tree, cfg=cfg,
+        )
+        session, item = res.session, res.first_item
+    if answers is None:
+        answers = random_answers(seed)
+    if not callable(answers):
+        flags = list(answers)
+        answers = lambda step, _: (flags[step - first_step], rt_seconds)  # noqa: E731
+        last_step = first_step + len(flags) - 1
+    else:
+        last_step = None
+
+    path, responses, result, step = [], [], None, first_step
+    while item is not None and (last_step is None or step <= last_step):
+        is_correct, rt = answers(step, item)
+        event = orchestration_engine.ResponseEvent(
+            item=item,
+            is_correct=is_correct,
+            rt_seconds=rt,
+            timestamp=started_at + timedelta(seconds=step * step_seconds),
+        )
+        result = orchestration_engine.process_response(
+            session,
+            module_id=item.module_id,
+            item=item,
+            is_correct=is_correct,
+            rt_seconds=rt,
+            response_timestamp=event.timestamp,
+            item_pool=bank,
+            decision_tree=decision_tree,
+            cfg=cfg,
+        )
+        path.append(item.id)
+        responses.append(event)
+        if on_response is not None:
+            on_response(session, result)
+        item = result.next_item
+        step += 1
+    return SessionRun(session, path, responses, result, item)
@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from app.adaptive_testing_module import risk
+from app.adaptive_testing_module.batch import NO_ITEM, SessionBatch
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import STARTED, run_session
+
+STEP_SECONDS = 20.0
+
+
+def _answer(session_index, item_id, rng_seed=11):
+    rng = random.Random(rng_seed * 100_003 + session_index * 1_009 + item_id)
+    return rng.random() < 0.5, rng.uniform(0.5, 8.0)
+
+
+def _run_sequential(bank, index):
+    run = run_session(
+        bank, lambda step, item: _answer(index, item.id), test_id=index, step_seconds=STEP_SECONDS
+    )
+    return run.path, run.session
+
+
+def _run_batch(bank, n):
+    batch = SessionBatch(n, bank, bank.module_item_ids())
+    current = batch.start()
+    issued = [[] for _ in range(n)]
+    step = 0
+    while np.any(current != NO_ITEM):
+        step += 1
+        answers = [
+            _answer(i, int(item_id)) if item_id != NO_ITEM else (False, 0.0)
+            for i, item_id in enumerate(current)
+        ]
+        for i, item_id in enumerate(current):
+            if item_id != NO_ITEM:
+                issued[i].append(int(item_id))
+        current = batch.step(
+            current,
+            np.array([a[0] for a in answers]),
+            np.array([a[1] for a in answers]),
+            np.full(n, step * STEP_SECONDS),
+        )
+    return issued, batch
+
+
+def test_batch_matches_sequential_engine():
+    bank = load_compiled_item_bank_from_csv()
+    n = 24
+    issued, batch = _run_batch(bank, n)
+
+    assert batch.stopped.all()
+    for i in range(n):
+        expected_items, session = _run_sequential(bank, i)
+        assert issued[i] == expected_items
+
+        state = batch.to_session_state(i, test_id=i, started_at=STARTED)
+        for module_id, stats in session.modules.items():
+            got = state.modules[module_id]
+            assert got.num_items == stats.num_items
+            assert got.items_remaining == stats.items_remaining
+            assert got.entropy == pytest.approx(stats.entropy, abs=1e-12)
+            assert (got.theta_eap, got.theta_map, got.theta_sd) == pytest.approx(
+                (stats.theta_eap, stats.theta_map, stats.theta_sd), abs=1e-12
+            )
+            assert list(got.theta_posterior) == pytest.approx(list(stats.theta_posterior))
+            assert (got.correct, got.slow_correct, got.rapid_guess) == (
+                stats.correct, stats.slow_correct, stats.rapid_guess
+            )
+        assert risk.compute_global_risk(state).risk_score == pytest.approx(
+            risk.compute_global_risk(session).risk_score
+        )
+
+
+def test_sessions_without_response_are_untouched():
+    bank = load_compiled_item_bank_from_csv()
+    batch = SessionBatch(2, bank)
+    first = batch.start()
+
+    nxt = batch.step(
+        np.array([first[0], NO_ITEM]), np.array([True, False]), np.array([2.0, 0.0]),
+        np.array([5.0, 0.0]),
+    )
+
+    assert nxt[1] == NO_ITEM and not batch.stopped[1]
+    assert batch.num_items[1].sum() == 0
+    assert batch.num_items[0].sum() == 1
@@ -0,0 +1,193 @@
+import numpy as np
+import pytest
+
+from app.adaptive_testing_module import bayes, bayes_vec, config, selection
+from app.adaptive_testing_module.state import SessionState
+
+
+def _uniform():
+    n = len(config.THETA_GRID)
+    return [1.0 / n] * n
+
+
+@pytest.mark.parametrize("difficulty", [-2.0, -0.5, 0.0, 1.3])
+@pytest.mark.parametrize("is_correct", [True, False])
+def test_update_matches_reference(difficulty, is_correct):
+    prior = bayes.update_theta_posterior_for_item(_uniform(), "ran", 0.5, True)
+
+    expected = bayes.update_theta_posterior_for_item(prior, "ran", difficulty, is_correct)
+    actual = bayes_vec.update_theta_posterior_for_item(prior, "ran", difficulty, is_correct)
+
+    assert actual.tolist() == pytest.approx(expected, abs=1e-12)
+
+
+def test_weak_strong_and_entropy_match_reference():
+    post = bayes.update_theta_posterior_for_item(_uniform(), "phonemic_awareness", -1.0, False)
+
+    ws = bayes.derive_weak_strong_probs(post)
+    p_weak, p_strong = bayes_vec.derive_weak_strong_probs(post)
+
+    assert float(p_weak) == pytest.approx(ws["p_weak"], abs=1e-12)
+    assert float(p_strong) == pytest.approx(ws["p_strong"], abs=1e-12)
+    assert float(bayes_vec.entropy_weak_strong(p_weak, p_strong)) == pytest.approx(
+        bayes.entropy_weak_strong(ws["p_weak"], ws["p_strong"]), abs=1e-12
+    )
+
+
+def test_stacked_posteriors():
+    posts = [
+        bayes.update_theta_posterior_for_item(_uniform(), "ran", b, c)
+        for b, c in [(-1.0, True), (0.0, False), (1.5, True)]
+    ]
+    p_weak, _ = bayes_vec.derive_weak_strong_probs(posts)
+
+    assert p_weak.shape == (3,)
+    for i, post in enumerate(posts):
+        assert p_weak[i] == pytest.approx(bayes.derive_weak_strong_probs(post)["p_weak"])
+
+
+def test_expected_entropy_matches_reference(monkeypatch):
+    session = SessionState.initialise(test_id=1, module_item_ids={"ran": [1]})
+    stats = session.modules["ran"]
+    item = selection.CandidateItem(id=1, module_id="ran", difficulty=0.5, max_time_seconds=5.0)
+
+    monkeypatch.setattr(config, "POSTERIOR_BACKEND", "python")
+    expected = selection.expected_entropy_after_item(stats, "ran", item)
+    monkeypatch.setattr(config, "POSTERIOR_BACKEND", "numpy")
+    actual = selection.expected_entropy_after_item(stats, "ran", item)
+
+    assert actual == pytest.approx(expected, abs=1e-12)
+
+
+def test_log_space_update_matches_probability_update(monkeypatch):
+    session = SessionState.initialise(test_id=1)
+    plain = session.modules["ran"]
+    logged = SessionState.initialise(test_id=1).modules["ran"]
+
+    monkeypatch.setattr(config, "LOG_SPACE_POSTERIOR", True)
+    for b, c in [(-1.0, True), (0.5, False), (1.0, True)]:
+        bayes.update_module_stats_for_item(logged, "ran", b, c)
+    monkeypatch.setattr(config, "LOG_SPACE_POSTERIOR", False)
+    for b, c in [(-1.0, True), (0.5, False), (1.0, True)]:
+        bayes.update_module_stats_for_item(plain, "ran", b, c)
+
+    assert list(logged.theta_posterior) == pytest.approx(list(plain.theta_posterior))
+    assert logged.entropy == pytest.approx(plain.entropy)
+
+
+def test_log_space_keeps_evidence_instead_of_resetting(monkeypatch):
+    monkeypatch.setattr(config, "LOG_SPACE_POSTERIOR", True)
+    stats = SessionState.initialise(test_id=1).modules["ran"]
+
+    # Correct answers to an extremely hard item underflow the probability-domain update
+    for _ in range(40):
+        bayes.update_module_stats_for_item(stats, "ran", 60.0, True)
+
+    assert stats.p_weak < 0.5
+    assert max(stats.theta_posterior) == pytest.approx(1.0)
+
+
+def test_log_posterior_survives_snapshot(monkeypatch):
+    monkeypatch.setattr(config, "LOG_SPACE_POSTERIOR", True)
+    session = SessionState.initialise(test_id=1)
+    bayes.update_module_stats_for_item(session.modules["ran"], "ran", 0.0, True)
+
+    restored = SessionState.from_snapshot(session.to_snapshot())
+
+    assert restored.modules["ran"].log_theta_posterior == pytest.approx(
+        list(session.modules["ran"].log_theta_posterior)
+    )
+    assert SessionState.from_snapshot(
+        SessionState.initialise(test_id=2).to_snapshot()
+    ).modules["ran"].log_theta_posterior is None
+
+
+@pytest.mark.parametrize("is_correct", [True, False])
+def test_fused_updates_match_unfused_chain(is_correct):
+    prior = bayes.update_theta_posterior_for_item(_uniform(), "ran", 0.5, True)
+    post = bayes.update_theta_posterior_for_item(prior, "ran", -0.7, is_correct)
+    ws = bayes.derive_weak_strong_probs(post)
+    entropy = bayes.entropy_weak_strong(ws["p_weak"], ws["p_strong"])
+
+    likelihood = bayes_vec.prob_correct_grid(config.ITEM_DISCRIMINATION["ran"], -0.7)
+    if not is_correct:
+        likelihood = 1.0 - likelihood
+    for summary in (
+        bayes.update_and_summarise(prior, "ran", -0.7, is_correct),
+        bayes_vec.update_and_summarise(prior, likelihood),
+    ):
+        assert list(summary.posterior) == pytest.approx(post, abs=1e-12)
+        assert (summary.p_weak, summary.p_strong, summary.entropy) == pytest.approx(
+            (ws["p_weak"], ws["p_strong"], entropy), abs=1e-12
+        )
+
+
+def test_outcome_entropies_match_per_outcome_updates():
+    prior = bayes.update_theta_posterior_for_item(_uniform(), "ran", -0.5, False)
+
+    p_correct, h_correct, h_incorrect = bayes.outcome_entropies(prior, "ran", 0.2)
+
+    expected = []
+    for outcome in (True, False):
+        ws = bayes.derive_weak_strong_probs(
+            bayes.update_theta_posterior_for_item(prior, "ran", 0.2, outcome)
+        )
+        expected.append(bayes.entropy_weak_strong(ws["p_weak"], ws["p_strong"]))
+    a = config.ITEM_DISCRIMINATION["ran"]
+    assert p_correct == pytest.approx(
+        sum(p * bayes.prob_correct(t, a, 0.2) for p, t in zip(prior, config.THETA_GRID))
+    )
+    assert (h_correct, h_incorrect) == pytest.approx(tuple(expected), abs=1e-12)
+
+
+def test_rt_model_moves_theta_only_through_the_speed_correlation():
+    cfg = config.default_config().replace(RT_MODEL=True)
+    p_c = bayes_vec.prob_correct_grid(cfg.discrimination("ran"), 0.0, cfg)
+    fast = bayes_vec.rt_likelihood(1.0, 5.0, "ran", cfg)
+    slow = bayes_vec.rt_likelihood(6.0, 5.0, "ran", cfg)
+    accuracy_only = bayes_vec.update_and_summarise(_uniform(), p_c, cfg)
+
+    # rho = 0: the theta marginal is the accuracy-only posterior
+    uncorrelated = cfg.replace(SPEED_ABILITY_CORRELATION={"ran": 0.0})
+    joint = bayes_vec.joint_prior(_uniform(), "ran", uncorrelated)
+    _, summary = bayes_vec.update_joint_and_summarise(joint, p_c, fast, uncorrelated)
+    assert summary.posterior.tolist() == pytest.approx(accuracy_only.posterior.tolist(), abs=1e-12)
+
+    joint = bayes_vec.joint_prior(_uniform(), "ran", cfg)
+    assert joint.sum(axis=1).tolist() == pytest.approx(_uniform(), abs=1e-12)
+    _, after_fast = bayes_vec.update_joint_and_summarise(joint, p_c, fast, cfg)
+    _, after_slow = bayes_vec.update_joint_and_summarise(joint, p_c, slow, cfg)
+    assert after_fast.p_strong > accuracy_only.p_strong > after_slow.p_strong
+
+
+def test_joint_update_is_vectorised_over_sessions():
+    cfg = config.default_config().replace(RT_MODEL=True)
+    joints = np.stack([bayes_vec.joint_prior(_uniform(), "ran", cfg)] * 3)
+    likelihoods = np.stack([bayes_vec.prob_correct_grid(1.35, b, cfg) for b in (-1.0, 0.0, 1.0)])
+    speed = bayes_vec.rt_likelihood([0.5, 2.5, 9.0], 5.0, "ran", cfg)
+
+    stacked, summary = bayes_vec.update_joint_and_summarise(joints, likelihoods, speed, cfg)
+    for k in range(3):
+        single, expected = bayes_vec.update_joint_and_summarise(joints[k], likelihoods[k], speed[k], cfg)
+        assert stacked[k].ravel().tolist() == pytest.approx(single.ravel().tolist(), abs=1e-15)
+        assert float(summary.p_weak[k]) == pytest.approx(expected.p_weak, abs=1e-12)
+        assert float(summary.entropy[k]) == pytest.approx(expected.entropy, abs=1e-12)
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python"])
+def test_theta_estimates_follow_every_update(monkeypatch, backend):
+    monkeypatch.setattr(config, "POSTERIOR_BACKEND", backend)
+    stats = SessionState.initialise(test_id=1).modules["ran"]
+    theta = np.array(config.THETA_GRID)
+    assert (stats.theta_eap, stats.theta_map) == (pytest.approx(0.0), -2.0)
+
+    for difficulty, is_correct in [(0.0, True), (0.5, True), (1.0, False)]:
+        bayes.update_module_stats_for_item(stats, "ran", difficulty, is_correct)
+        post = np.asarray(stats.theta_posterior)
+        eap = float(post @ theta)
+        assert stats.theta_eap == pytest.approx(eap, abs=1e-12)
+        assert stats.theta_sd == pytest.approx(np.sqrt(post @ (theta - eap) ** 2), abs=1e-12)
+        assert stats.theta_map == theta[np.argmax(post)]
+
+    stacked = bayes_vec.theta_estimates(np.stack([post, _uniform()]))
+    assert stacked.eap.tolist() == pytest.approx([stats.theta_eap, 0.0], abs=1e-12)
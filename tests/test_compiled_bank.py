@@ -0,0 +1,83 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+from app.adaptive_testing_module import bayes, config
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
+from app.simulations.item_bank import load_item_bank_from_csv
+from tests.conftest import run_session
+
+
+def test_likelihood_matrix_matches_prob_correct():
+    item_pool, _ = load_item_bank_from_csv()
+    bank = CompiledItemBank.from_item_pool(item_pool)
+
+    assert bank.p_correct.shape == (len(item_pool), len(config.THETA_GRID))
+    for item_id, item in item_pool.items():
+        a = config.ITEM_DISCRIMINATION.get(item.module_id, 1.0)
+        expected = [bayes.prob_correct(t, a, item.difficulty) for t in config.THETA_GRID]
+        assert bank.likelihood(item_id, True).tolist() == pytest.approx(expected)
+        assert bank.likelihood(item_id, False).tolist() == pytest.approx([1 - p for p in expected])
+
+
+def test_bank_is_a_read_only_item_pool():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    bank = CompiledItemBank.from_item_pool(item_pool)
+
+    assert dict(bank) == item_pool
+    assert bank.module_item_ids() == module_item_ids
+    with pytest.raises(ValueError):
+        bank.p_correct[0, 0] = 0.5
+
+
+def _with_item_parameters(item_pool):
+    # Every third item gets its own slope, every fourth a guessing floor
+    return {
+        item_id: dataclasses.replace(
+            item,
+            discrimination=0.6 + 0.1 * (item_id % 7) if item_id % 3 == 0 else None,
+            guessing=0.2 if item_id % 4 == 0 else 0.0,
+        )
+        for item_id, item in item_pool.items()
+    }
+
+
+def test_item_parameters_are_compiled_per_row():
+    item_pool = _with_item_parameters(load_item_bank_from_csv()[0])
+    bank = CompiledItemBank.from_item_pool(item_pool)
+
+    for item_id, item in item_pool.items():
+        a = item.discrimination or config.ITEM_DISCRIMINATION.get(item.module_id, 1.0)
+        expected = [bayes.prob_correct(t, a, item.difficulty, item.guessing) for t in config.THETA_GRID]
+        assert bank.discriminations[bank.row(item_id)] == a
+        assert bank.likelihood(item_id, True).tolist() == pytest.approx(expected)
+        assert np.exp(bank.log_likelihood(item_id, True)).tolist() == pytest.approx(expected)
+        assert np.exp(bank.log_likelihood(item_id, False)).tolist() == pytest.approx(
+            [1 - p for p in expected]
+        )
+
+
+def _run(module_item_ids, pool, cfg=None):
+    run = run_session(pool, lambda step, item: (step % 3 != 0, 2.0), cfg=cfg, module_item_ids=module_item_ids)
+    return run.path, run.result.global_risk.risk_score
+
+
+def test_item_parameters_agree_across_backends():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    item_pool = _with_item_parameters(item_pool)
+    bank = CompiledItemBank.from_item_pool(item_pool)
+    python = config.default_config().replace(POSTERIOR_BACKEND="python")
+
+    path, risk_score = _run(module_item_ids, bank)
+    assert _run(module_item_ids, item_pool) == (path, pytest.approx(risk_score))
+    assert _run(module_item_ids, item_pool, python) == (path, pytest.approx(risk_score))
+
+
+def test_engine_decisions_unchanged_with_compiled_bank():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    bank = CompiledItemBank.from_item_pool(item_pool)
+
+    path, risk_score = _run(module_item_ids, item_pool)
+
+    assert _run(module_item_ids, bank) == (path, pytest.approx(risk_score))
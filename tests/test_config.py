@@ -0,0 +1,62 @@
+import pytest
+
+from app.adaptive_testing_module import batch, config, decision_tree
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import run_session
+
+
+def _run(bank, cfg, answers):
+    return run_session(bank, answers, cfg=cfg).path
+
+
+def test_default_config_mirrors_module_constants(monkeypatch):
+    cfg = config.default_config()
+    assert cfg.min_info_gain == config.MIN_INFO_GAIN
+    assert cfg.theta_grid == tuple(config.THETA_GRID)
+    assert cfg.discrimination("ran") == config.ITEM_DISCRIMINATION["ran"]
+    assert config.default_config() is cfg
+
+    monkeypatch.setattr(config, "MIN_INFO_GAIN", 0.5)
+    assert config.default_config().min_info_gain == 0.5
+
+
+def test_engine_config_is_immutable_and_hashable():
+    cfg = config.default_config()
+    changed = cfg.replace(MIN_ITEMS_PER_MODULE=5, p_confident=0.9)
+
+    assert (changed.min_items_per_module, changed.p_confident) == (5, 0.9)
+    assert cfg.min_items_per_module == config.MIN_ITEMS_PER_MODULE
+    assert cfg.replace() == cfg and hash(cfg.replace()) == hash(cfg)
+    assert len({cfg, changed, cfg.replace(item_discrimination=dict(config.ITEM_DISCRIMINATION))}) == 2
+    with pytest.raises(AttributeError):
+        cfg.min_info_gain = 0.0
+
+
+def test_configurations_run_side_by_side_without_touching_globals():
+    bank = load_compiled_item_bank_from_csv()
+    default = config.default_config()
+    strict = default.replace(MIN_ITEMS_PER_MODULE=6, MAX_ITEMS_TOTAL=12)
+    answers = [True, False] * 10
+
+    strict_path = _run(bank, strict, answers)
+    default_path = _run(bank, default, answers)
+
+    assert strict_path != default_path
+    assert len(strict_path) == 12
+    assert default_path == _run(bank, None, answers)
+    assert config.MIN_ITEMS_PER_MODULE == default.min_items_per_module
+
+
+def test_rt_model_keeps_the_opening_item_and_bypasses_the_batch_engine():
+    bank = load_compiled_item_bank_from_csv()
+    rt = config.default_config().replace(RT_MODEL=True)
+
+    tree = decision_tree.compile_decision_tree(bank, max_depth=4, cfg=rt)
+    assert len(tree) == 1
+    assert tree.item_ids[0] == decision_tree.compile_decision_tree(bank, max_depth=1).item_ids[0]
+    assert tree.fingerprint != decision_tree.engine_fingerprint(bank)
+    with pytest.raises(ValueError):
+        batch.SessionBatch(2, bank, cfg=rt)
+
+    answers = [True, False] * 10
+    assert len(_run(bank, rt, answers)) <= rt.max_items_total
@@ -0,0 +1,69 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401
+from app import crud
+from app.adaptive_testing_module import orchestration_engine
+from app.db.database import Base
+from app.schemas.item import ItemCreate, ItemUpdate
+from app.services import items as items_service
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import STARTED
+
+
+def _active_bank():
+    bank = load_compiled_item_bank_from_csv()
+    return items_service.ActiveItemBank(
+        version=1, bank=bank, module_item_ids=bank.module_item_ids(), payloads={}
+    )
+
+
+def test_opening_tree_is_compiled_once_per_bank_and_config():
+    active_bank = _active_bank()
+    tree = items_service.get_opening_tree(active_bank)
+
+    assert len(tree) == 2 ** (items_service.OPENING_TREE_DEPTH + 1) - 1
+    assert items_service.get_opening_tree(active_bank) is tree
+    assert items_service.get_opening_tree(active_bank, depth=2) is not tree
+    assert items_service.get_opening_tree(active_bank, depth=0) is None
+    assert items_service.get_opening_tree(_active_bank()) is not tree
+
+
+def test_start_serves_the_cached_opening_item():
+    active_bank = _active_bank()
+    tree = items_service.get_opening_tree(active_bank)
+
+    live = orchestration_engine.start_new_test(
+        1, active_bank.module_item_ids, active_bank.bank, started_at=STARTED
+    )
+    cached = orchestration_engine.start_new_test(
+        1, active_bank.module_item_ids, active_bank.bank, started_at=STARTED,
+        decision_tree=tree,
+    )
+    assert cached.first_item == live.first_item
+    assert cached.session.tree_node == 0
+
+
+def test_active_bank_follows_the_version_stored_with_item_writes(monkeypatch):
+    monkeypatch.setattr(items_service, "_bank_cache", None)
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    # Item writes from another worker arrive through another DB session
+    other_worker = sessionmaker(bind=engine)()
+
+    assert items_service.get_active_item_bank(db).version == 0
+    for difficulty in (-1.0, 0.0, 1.0):
+        crud.item.create_item(other_worker, ItemCreate(module="ran", difficulty=difficulty, max_time_s=5.0))
+    active_bank = items_service.get_active_item_bank(db)
+    assert (active_bank.version, len(active_bank.bank)) == (3, 3)
+    assert items_service.get_active_item_bank(db) is active_bank
+
+    crud.item.update_item(other_worker, 2, ItemUpdate(difficulty=0.5))
+    updated = items_service.get_active_item_bank(db)
+    assert (updated.version, updated.bank[2].difficulty) == (4, 0.5)
+
+    crud.item.delete_item(other_worker, 1)
+    assert list(items_service.get_active_item_bank(db).bank) == [2, 3]
+    assert crud.item_bank_version.get_version(db) == 5
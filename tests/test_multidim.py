@@ -0,0 +1,111 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.adaptive_testing_module import batch, bayes, config, multidim
+from app.adaptive_testing_module.state import SessionState
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import run_session
+
+PA_RAN = {("phonemic_awareness", "ran"): 0.5}
+
+
+def _joint_config(**changes):
+    return config.default_config().replace(JOINT_THETA_POSTERIOR=True, **changes)
+
+
+def _run(bank, cfg, answers, session=None, item=None, start_step=1):
+    run = run_session(bank, answers, cfg=cfg, session=session, item=item, first_step=start_step)
+    return run.path, run.session, run.next_item, run.result
+
+
+def test_prior_keeps_the_module_marginals():
+    cfg = _joint_config()
+    prior = multidim.joint_prior(cfg)
+
+    assert prior.shape == (len(config.THETA_GRID),) * len(cfg.modules)
+    np.testing.assert_allclose(multidim.marginals(prior), [cfg.theta_prior] * 3, atol=1e-12)
+
+    independent = multidim.joint_prior(cfg.replace(MODULE_THETA_CORRELATION={}))
+    np.testing.assert_allclose(independent, np.einsum("i,j,k->ijk", *[cfg.theta_prior] * 3))
+
+    with pytest.raises(ValueError):
+        multidim.joint_prior(cfg.replace(MODULE_THETA_CORRELATION={
+            ("phonemic_awareness", "ran"): 0.9,
+            ("phonemic_awareness", "object_recognition"): 0.9,
+            ("ran", "object_recognition"): -0.9,
+        }))
+
+
+def test_a_response_moves_the_correlated_modules_only():
+    cfg = _joint_config(MODULE_THETA_CORRELATION=PA_RAN)
+    session = SessionState.initialise(1, cfg=cfg)
+    independent = SessionState.initialise(1).modules["phonemic_awareness"]
+    untouched = session.modules["object_recognition"].theta_posterior
+
+    likelihood = 1.0 - np.array([bayes.prob_correct(t, 1.4, 0.0) for t in cfg.theta_nodes])
+    multidim.propagate_response(session, "phonemic_awareness", likelihood, cfg)
+    bayes.update_module_stats_for_item(independent, "phonemic_awareness", 0.0, False)
+
+    np.testing.assert_allclose(
+        session.modules["phonemic_awareness"].theta_posterior, independent.theta_posterior
+    )
+    assert session.modules["ran"].p_weak > 0.5
+    assert session.modules["ran"].theta_eap < session.modules["object_recognition"].theta_eap
+    assert session.modules["object_recognition"].theta_posterior is untouched
+
+
+def test_uncorrelated_joint_posterior_matches_independent_modules():
+    bank = load_compiled_item_bank_from_csv()
+    answers = [True, False, False, True, True, False] * 4
+
+    path, session, _, out = _run(bank, _joint_config(MODULE_THETA_CORRELATION={}), answers)
+    expected_path, expected, _, expected_out = _run(bank, config.default_config(), answers)
+
+    assert path == expected_path
+    assert out.global_risk.risk_score == pytest.approx(expected_out.global_risk.risk_score)
+    assert all(stats.history is None for stats in session.modules.values())
+
+
+def test_joint_posterior_survives_snapshots():
+    cfg = _joint_config()
+    bank = load_compiled_item_bank_from_csv()
+    answers = [False, False, True, False, True, False, False, True]
+
+    _, session, item, _ = _run(bank, cfg, answers[:4])
+    for restored in (
+        SessionState.from_snapshot(session.to_binary_snapshot()),
+        SessionState.from_snapshot(json.loads(json.dumps(session.to_snapshot()))),
+    ):
+        np.testing.assert_array_equal(restored.joint_theta_posterior, session.joint_theta_posterior)
+        resumed, *_ = _run(bank, cfg, answers[4:], session=restored, item=item, start_step=5)
+        assert resumed == _run(bank, cfg, answers)[0][4:]
+
+
+def test_joint_posterior_follows_a_reordered_module_list():
+    cfg = _joint_config()
+    bank = load_compiled_item_bank_from_csv()
+    _, session, item, _ = _run(bank, cfg, [False, True, False])
+    restored = SessionState.from_snapshot(session.to_binary_snapshot())
+
+    reordered = cfg.replace(MODULES=list(reversed(cfg.modules)))
+    _run(bank, reordered, [False], session=restored, item=item, start_step=4)
+
+    np.testing.assert_allclose(
+        multidim.marginals(restored.joint_theta_posterior),
+        [restored.modules[m].theta_posterior for m in reordered.modules],
+        atol=1e-12,
+    )
+
+
+def test_unsupported_combinations_are_rejected():
+    bank = load_compiled_item_bank_from_csv()
+    with pytest.raises(ValueError):
+        SessionState.initialise(1, cfg=_joint_config(POSTERIOR_BACKEND="python"))
+    with pytest.raises(ValueError):
+        batch.SessionBatch(2, bank, cfg=_joint_config())
+    # The tensor grows with the cube of the grid
+    SessionState.initialise(1, cfg=_joint_config(THETA_QUADRATURE_POINTS=41))
+    with pytest.raises(ValueError):
+        SessionState.initialise(1, cfg=_joint_config(THETA_QUADRATURE_POINTS=42))
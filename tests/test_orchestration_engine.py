@@ -0,0 +1,134 @@
+import copy
+from datetime import timedelta
+
+import pytest
+
+from app.adaptive_testing_module import config, decision_tree, orchestration_engine
+from app.adaptive_testing_module.compiled_bank import CompiledItemBank
+from app.adaptive_testing_module.selection import CandidateItem
+from app.adaptive_testing_module.state import SessionState
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import STARTED, run_session
+
+
+def _start(bank, cfg=None):
+    res = orchestration_engine.start_new_test(
+        1, bank.module_item_ids(), bank, started_at=STARTED, cfg=cfg
+    )
+    return res.session, res.first_item
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [{}, {"POSTERIOR_BACKEND": "python"}, {"RT_MODEL": True}, {"JOINT_THETA_POSTERIOR": True}],
+)
+def test_speculated_items_match_actual_next_items(overrides):
+    cfg = config.default_config().replace(**overrides)
+    bank = load_compiled_item_bank_from_csv(cfg=cfg)
+
+    def speculate_and_check(session, item):
+        # Speculate on every item issued, then compare with both real outcomes
+        before = copy.deepcopy(session)
+        speculative = orchestration_engine.speculate_next_items(
+            session, item=item, item_pool=bank, expected_rt_seconds=3.0,
+            response_timestamp=session.last_update_at, cfg=cfg,
+        )
+        for is_correct, expected in ((True, speculative.if_correct), (False, speculative.if_incorrect)):
+            result = orchestration_engine.process_response(
+                copy.deepcopy(session),
+                module_id=item.module_id,
+                item=item,
+                is_correct=is_correct,
+                rt_seconds=3.0,
+                response_timestamp=session.last_update_at + timedelta(seconds=3),
+                item_pool=bank,
+                cfg=cfg,
+            )
+            assert result.next_item == expected
+
+        # The live session is not modified by speculation
+        assert session.to_snapshot() == before.to_snapshot()
+        assert session.risk_tracker is None or session.risk_tracker.modules == before.risk_tracker.modules
+
+    session, item = _start(bank, cfg)
+    speculate_and_check(session, item)
+    run_session(
+        bank, seed=3, cfg=cfg, session=session, item=item,
+        on_response=lambda session, result: result.next_item and speculate_and_check(session, result.next_item),
+    )
+
+
+def test_decision_tree_serves_the_same_items_as_live_evaluation():
+    bank = load_compiled_item_bank_from_csv()
+    tree = decision_tree.DecisionTree.from_dict(
+        decision_tree.compile_decision_tree(bank, max_depth=6).to_dict()
+    )
+    assert tree.is_valid_for(bank)
+
+    for answers in ([True] * 20, [False] * 20, [True, False] * 10):
+        live = run_session(bank, answers)
+        assert run_session(bank, answers, decision_tree=tree).path == live.path
+
+
+def test_replay_from_checkpoint_rebuilds_live_session():
+    bank = load_compiled_item_bank_from_csv()
+    session, item = _start(bank)
+    initial = copy.deepcopy(session)
+    checkpoints = []
+
+    run = run_session(
+        bank, lambda step, _: (step % 2 == 0, 1.5 + step), session=session, item=item, step_seconds=9.0,
+        on_response=lambda session, _: checkpoints.append(copy.deepcopy(session)),
+    )
+    # Replay the first six responses, from the start and from after two
+    events, live = run.responses[:6], checkpoints[5]
+    from_start = orchestration_engine.replay_events(initial, events, bank)
+    from_checkpoint = orchestration_engine.replay_events(checkpoints[1], events[2:], bank)
+
+    assert not live.stopped
+    assert from_start.to_snapshot() == live.to_snapshot()
+    assert from_checkpoint.to_snapshot() == live.to_snapshot()
+
+
+def test_session_leaves_a_tree_it_did_not_start_on():
+    bank = load_compiled_item_bank_from_csv()
+    tree = decision_tree.compile_decision_tree(bank, max_depth=3)
+    session, item = _start(bank)
+    # e.g. the bank or config changed between start and this response
+    session.tree_node = next(n for n, i in enumerate(tree.item_ids) if i != item.id)
+
+    answered_at = STARTED + timedelta(seconds=5)
+    live = orchestration_engine.process_response(
+        copy.deepcopy(session), module_id=item.module_id, item=item, is_correct=True,
+        rt_seconds=2.0, response_timestamp=answered_at, item_pool=bank,
+    )
+    result = orchestration_engine.process_response(
+        session, module_id=item.module_id, item=item, is_correct=True,
+        rt_seconds=2.0, response_timestamp=answered_at, item_pool=bank,
+        decision_tree=tree,
+    )
+    assert result.next_item == live.next_item
+    assert session.tree_node is None
+
+
+def test_session_ignores_a_tree_compiled_for_another_bank():
+    bank = load_compiled_item_bank_from_csv()
+    new_bank = CompiledItemBank(list(bank.values()) + [CandidateItem(999, "phonemic_awareness", 0.0, 5.0)])
+    tree = decision_tree.compile_decision_tree(bank, max_depth=3)
+    new_tree = decision_tree.compile_decision_tree(new_bank, max_depth=3)
+    res = orchestration_engine.start_new_test(1, bank.module_item_ids(), bank, started_at=STARTED, decision_tree=tree)
+    # Both trees open with the same item, so only the fingerprint tells them apart
+    assert new_tree.item_ids[0] == res.first_item.id and new_tree.fingerprint != tree.fingerprint
+
+    snapshot = res.session.to_binary_snapshot()
+    for is_correct in (True, False):
+        session = SessionState.from_snapshot(snapshot)
+        assert session.tree_fingerprint == tree.fingerprint
+        result = orchestration_engine.process_response(
+            session, module_id=res.first_item.module_id, item=res.first_item, is_correct=is_correct,
+            rt_seconds=2.0, response_timestamp=STARTED + timedelta(seconds=5), item_pool=new_bank,
+            decision_tree=new_tree,
+        )
+        assert session.tree_node is None and session.tree_fingerprint is None
+        assert result.next_item is None or result.next_item.id != 999
+        assert result.next_item is None or result.next_item.id in session.modules[result.next_item.module_id].items_remaining
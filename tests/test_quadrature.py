@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.adaptive_testing_module import batch, bayes, config, quadrature
+from app.adaptive_testing_module.state import SessionState
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import run_session
+
+
+def _quadrature_config(points=41, **changes):
+    return config.default_config().replace(THETA_QUADRATURE_POINTS=points, **changes)
+
+
+def test_quadrature_is_refined_around_the_reference_mass():
+    cfg = _quadrature_config(101)
+    quad = quadrature.build_quadrature(
+        cfg.theta_grid, cfg.theta_weak_threshold, 101,
+        cfg.theta_prior_mean, cfg.theta_prior_var, cfg.theta_quadrature_floor,
+    )
+    widths = np.diff(quad.edges)
+
+    assert cfg.theta_nodes == quad.nodes and len(cfg.theta_nodes) == 101
+    assert sum(cfg.theta_prior) == pytest.approx(1.0)
+    assert (quad.edges[0], quad.edges[-1]) == (cfg.theta_grid[0], cfg.theta_grid[-1])
+    assert cfg.theta_weak_threshold in quad.edges
+    # Cells near the centre of the ability distribution are the finest
+    centre = np.argmin(np.abs(np.array(quad.nodes)))
+    assert widths[centre] == widths.min() < widths[0]
+
+
+def test_quadrature_points_are_validated():
+    assert config.default_config().theta_nodes == tuple(config.THETA_GRID)
+    for points in (10, 202):
+        with pytest.raises(ValueError):
+            _quadrature_config(points)
+
+
+def test_p_weak_converges_with_the_number_of_points():
+    p_weak = {}
+    for points in (41, 201):
+        cfg = _quadrature_config(points)
+        stats = SessionState.initialise(1, cfg=cfg).modules["ran"]
+        np.testing.assert_array_equal(stats.theta_posterior, cfg.theta_prior)
+        for difficulty, is_correct in [(0.0, True), (0.5, False), (-0.3, True), (0.2, False)]:
+            bayes.update_module_stats_for_item(stats, "ran", difficulty, is_correct, cfg=cfg)
+        p_weak[points] = stats.p_weak
+
+    assert p_weak[41] == pytest.approx(p_weak[201], abs=1e-3)
+
+
+def _run(bank, cfg, answers):
+    run = run_session(bank, answers, cfg=cfg)
+    return run.path, run.session
+
+
+def test_engine_runs_on_the_quadrature_with_every_backend():
+    cfg = _quadrature_config(61)
+    bank = load_compiled_item_bank_from_csv(cfg=cfg)
+    assert bank.is_current(cfg) and not bank.is_current(config.default_config())
+    assert bank.p_correct.shape[1] == 61
+
+    answers = [True, True, False, True, False, False] * 4
+    path, session = _run(bank, cfg, answers)
+    python_path, _ = _run(bank, cfg.replace(POSTERIOR_BACKEND="python"), answers)
+    log_path, _ = _run(bank, cfg.replace(LOG_SPACE_POSTERIOR=True), answers)
+
+    assert path == python_path == log_path
+    assert len(session.modules["ran"].theta_posterior) == 61
+
+    sessions = batch.SessionBatch(1, bank, cfg=cfg)
+    np.testing.assert_array_equal(sessions.posteriors[0, 0], cfg.theta_prior)
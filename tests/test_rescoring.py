@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401
+from app import crud
+from app.db.database import Base
+from app.models import Item, ResultSet, Test, TestFeatures, TestItemLog, TestModuleSum
+from app.services import items as items_service, rescoring, results as results_service
+from app.simulations.item_bank import load_item_bank_from_csv
+from tests.conftest import STARTED, run_session
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+
+def _record_tests(db, num_tests):
+    """
+    Run complete adaptive tests on the CSV bank and store them as the API
+    does: a completed Test row, its TestItemLog rows and live results.
+    """
+    item_pool, _ = load_item_bank_from_csv()
+    db.add_all(
+        Item(id=it.id, module=it.module_id, difficulty=it.difficulty, max_time_s=it.max_time_seconds)
+        for it in item_pool.values()
+    )
+    db.commit()
+    bank = items_service.compile_item_bank(db.query(Item).all())
+
+    for test_id in range(1, num_tests + 1):
+        run = run_session(
+            bank, seed=test_id, test_id=test_id, started_at=STARTED + timedelta(hours=test_id), step_seconds=6.0
+        )
+        db.add_all(
+            TestItemLog(
+                test_id=test_id, item_id=event.item.id, module=event.item.module_id,
+                difficulty=event.item.difficulty, is_correct=event.is_correct,
+                response_time_s=event.rt_seconds, global_index=step, submitted_at=event.timestamp,
+            )
+            for step, event in enumerate(run.responses, start=1)
+        )
+        global_risk = run.result.global_risk
+        test = Test(
+            id=test_id, start_time=STARTED + timedelta(hours=test_id), status="completed",
+            final_risk_label=global_risk.risk_category, final_risk_score=global_risk.risk_score,
+        )
+        db.add(test)
+        results_service.save_test_results(db, test, global_risk, run.session.modules)
+    # An unfinished test is not re-scored
+    db.add(Test(id=num_tests + 1, start_time=STARTED, status="in_progress"))
+    db.commit()
+
+
+def test_unchanged_config_reproduces_the_live_results(db):
+    _record_tests(db, 12)
+
+    result_set = rescoring.rescore_completed_tests(db, label="baseline", chunk_size=5)
+
+    assert (result_set.status, result_set.num_tests) == ("completed", 12)
+    for test in db.query(Test).filter(Test.status == "completed"):
+        live = crud.test_features.get_features_by_test(db, test.id)
+        rescored = crud.test_features.get_features_by_test(db, test.id, result_set=result_set.id)
+        assert rescored.risk_label == live.risk_label == test.final_risk_label
+        assert rescored.p_risk_atrisk == pytest.approx(test.final_risk_score)
+        summaries = crud.test_module_sum.get_summaries_by_test(db, test.id, result_set=result_set.id)
+        assert {s.module: s.theta_eap_final for s in summaries} == pytest.approx(
+            {s.module: s.theta_eap_final for s in crud.test_module_sum.get_summaries_by_test(db, test.id)}
+        )
+    assert db.query(TestModuleSum).filter(TestModuleSum.result_set == result_set.id).count() == 36
+
+
+def test_rescoring_replays_the_logged_difficulty_after_a_recalibration(db):
+    _record_tests(db, 6)
+    for item in db.query(Item):
+        item.difficulty += 1.5
+    db.commit()
+
+    result_set = rescoring.rescore_completed_tests(db, label="recalibrated bank", chunk_size=4)
+
+    for test in db.query(Test).filter(Test.status == "completed"):
+        rescored = crud.test_features.get_features_by_test(db, test.id, result_set=result_set.id)
+        assert rescored.risk_label == test.final_risk_label
+        assert rescored.p_risk_atrisk == pytest.approx(test.final_risk_score)
+        summaries = crud.test_module_sum.get_summaries_by_test(db, test.id, result_set=result_set.id)
+        assert {s.module: s.theta_eap_final for s in summaries} == pytest.approx(
+            {s.module: s.theta_eap_final for s in crud.test_module_sum.get_summaries_by_test(db, test.id)}
+        )
+
+
+def test_new_thresholds_go_to_a_new_result_set_in_worker_processes(db):
+    _record_tests(db, 8)
+    live_labels = {t.id: t.final_risk_label for t in db.query(Test).filter(Test.status == "completed")}
+
+    first = rescoring.rescore_completed_tests(db, {"RISK_SCORE_HIGH": 0.0}, chunk_size=3, workers=2)
+    second = rescoring.rescore_completed_tests(db, {"RISK_SCORE_MODERATE": 1.0}, chunk_size=3)
+
+    assert second.id == first.id + 1
+    assert '"RISK_SCORE_HIGH": 0.0' in db.get(ResultSet, first.id).config_json
+    high = {f.test_id: f.risk_label for f in db.query(TestFeatures).filter(TestFeatures.result_set == first.id)}
+    assert high == {test_id: "high" for test_id in live_labels}
+    # Live results are untouched
+    assert {t.id: t.final_risk_label for t in db.query(Test).filter(Test.status == "completed")} == live_labels
+    assert db.query(TestFeatures).filter(TestFeatures.result_set == 0).count() == 8
+
+
+def test_unknown_override_is_rejected(db):
+    with pytest.raises(TypeError):
+        rescoring.rescore_completed_tests(db, {"NOT_A_SETTING": 1})
+    assert rescoring.parse_override('MODULE_WEIGHTS={"ran": 1.0}') == ("MODULE_WEIGHTS", {"ran": 1.0})
+    assert rescoring.parse_override("POSTERIOR_BACKEND=python") == ("POSTERIOR_BACKEND", "python")
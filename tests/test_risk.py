@@ -0,0 +1,37 @@
+import copy
+
+from app.adaptive_testing_module import orchestration_engine, risk
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import STARTED, random_answers, run_session
+
+
+def test_incremental_risk_matches_full_recomputation():
+    bank = load_compiled_item_bank_from_csv()
+
+    def check(session, result):
+        live = risk.current_risk(session)
+        full = risk.compute_global_risk(session)
+        assert live == full
+        assert live.explanation == full.explanation
+        assert copy.deepcopy(session).risk_tracker.modules == session.risk_tracker.modules
+
+    run = run_session(bank, random_answers(3, max_rt_seconds=6.0), on_response=check)
+    assert run.result.global_risk == risk.compute_global_risk(run.session)
+
+
+def test_explanation_is_built_on_first_access(monkeypatch):
+    bank = load_compiled_item_bank_from_csv()
+    session = orchestration_engine.start_new_test(
+        1, bank.module_item_ids(), bank, started_at=STARTED
+    ).session
+    calls = []
+    build = risk.build_explanation_object
+    monkeypatch.setattr(
+        risk, "build_explanation_object", lambda *args: calls.append(args) or build(*args)
+    )
+
+    result = risk.current_risk(session)
+    assert calls == []
+    assert result.explanation["global"]["risk_category"] == result.risk_category
+    assert result.explanation is result.explanation
+    assert len(calls) == 1
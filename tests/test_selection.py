@@ -0,0 +1,118 @@
+from datetime import timedelta
+
+import pytest
+
+from app.adaptive_testing_module import bayes, config, orchestration_engine, selection, stopping
+from app.adaptive_testing_module.state import SessionState
+from app.simulations.item_bank import load_item_bank_from_csv
+from tests.conftest import STARTED
+
+
+def test_stopping_and_selection_share_gain_table():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    selection.SHARED_GAIN_MEMO.clear()
+    res = orchestration_engine.start_new_test(1, module_item_ids, item_pool, started_at=STARTED)
+    session, item = res.session, res.first_item
+
+    selection.GAIN_CACHE_STATS.reset()
+    orchestration_engine.process_response(
+        session,
+        module_id=item.module_id,
+        item=item,
+        is_correct=True,
+        rt_seconds=2.0,
+        response_timestamp=STARTED + timedelta(seconds=5),
+        item_pool=item_pool,
+    )
+
+    remaining = sum(
+        len(m.items_remaining)
+        for m in session.modules.values()
+        if not stopping.is_module_settled(m)
+    )
+    # Every remaining gain is computed once by stopping, then reused by selection
+    assert selection.GAIN_CACHE_STATS.evaluated == remaining
+    assert selection.GAIN_CACHE_STATS.hits > 0
+
+
+def test_gain_table_invalidated_by_posterior_update():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    res = orchestration_engine.start_new_test(1, module_item_ids, item_pool)
+    stats = res.session.modules["phonemic_awareness"]
+    item = item_pool[next(iter(stats.items_remaining))]
+
+    before = selection.cached_information_gain(stats, "phonemic_awareness", item)
+    bayes.update_module_stats_for_item(stats, "phonemic_awareness", item.difficulty, True)
+    after = selection.cached_information_gain(stats, "phonemic_awareness", item)
+
+    assert after == selection.information_gain_for_item(stats, "phonemic_awareness", item)
+    assert after != before
+
+
+def test_batched_expected_entropy_matches_per_item():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    res = orchestration_engine.start_new_test(1, module_item_ids, item_pool)
+    stats = res.session.modules["ran"]
+    bayes.update_module_stats_for_item(stats, "ran", 0.5, False)
+    items = [item_pool[i] for i in module_item_ids["ran"]]
+
+    batched = selection.expected_entropies_for_items(stats, "ran", items)
+
+    for item, value in zip(items, batched):
+        assert abs(value - selection.expected_entropy_after_item(stats, "ran", item)) < 1e-12
+
+
+def test_shared_gain_memo_reuses_gains_across_sessions_by_history():
+    item_pool, module_item_ids = load_item_bank_from_csv()
+    selection.SHARED_GAIN_MEMO.clear()
+    sessions = [
+        orchestration_engine.start_new_test(i, module_item_ids, item_pool).session
+        for i in (1, 2)
+    ]
+    ran = [item_pool[i] for i in module_item_ids["ran"]]
+    # Same responses in a different order give the same history signature
+    for session, order in zip(sessions, (ran[:2], ran[1::-1])):
+        for item, is_correct in zip(order, (item is ran[0] for item in order)):
+            bayes.update_module_stats_for_item(
+                session.modules["ran"], "ran", item.difficulty, is_correct
+            )
+    first, second = (s.modules["ran"] for s in sessions)
+    assert first.history == second.history
+
+    selection.GAIN_CACHE_STATS.reset()
+    gains = selection.information_gains_for_items(first, "ran", ran[2:])
+    assert selection.information_gains_for_items(second, "ran", ran[2:]) == gains
+    assert selection.GAIN_CACHE_STATS.evaluated == len(ran[2:])
+    # Order only changes the posterior in the last bits
+    assert gains == pytest.approx(
+        [selection.information_gain_for_item(second, "ran", item) for item in ran[2:]], abs=1e-12
+    )
+
+
+@pytest.mark.parametrize("backend", ["numpy", "python"])
+def test_history_is_dropped_when_the_posterior_falls_back_to_the_prior(backend):
+    cfg = config.default_config().replace(POSTERIOR_BACKEND=backend)
+    stats = SessionState.initialise(1, cfg=cfg).modules["ran"]
+    bayes.update_module_stats_for_item(stats, "ran", 0.0, True, cfg=cfg)
+    assert stats.history
+
+    # No mass left after the update (underflow): uniform prior fallback
+    stats.theta_posterior = [0.0] * len(cfg.theta_nodes)
+    bayes.update_module_stats_for_item(stats, "ran", 0.5, False, cfg=cfg)
+
+    assert list(stats.theta_posterior) == list(cfg.theta_prior)
+    assert stats.history is None
+
+
+def test_shared_gain_memo_evicts_least_recently_used():
+    memo = selection.SharedGainMemo(max_size=2)
+    a = memo.table("a")
+    memo.table("b")
+    assert memo.table("a") is a
+    memo.table("c")
+
+    assert len(memo) == 2 and memo.evictions == 1
+    assert memo.table("a") is a
+    assert (memo.hits, memo.misses) == (2, 3)
+    memo.table("b")
+    assert memo.misses == 4
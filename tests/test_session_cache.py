@@ -0,0 +1,67 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401
+from app.adaptive_testing_module import snapshot_codec
+from app.adaptive_testing_module.selection import CandidateItem
+from app.adaptive_testing_module.state import SessionState
+from app.db.database import Base
+from app.models import Test, TestItemLog
+from app.services import test_service
+from app.services.test_service import SessionCache
+from tests.conftest import STARTED
+
+
+def test_session_cache_hit_requires_matching_marker():
+    cache = SessionCache(max_size=4, ttl_seconds=60)
+    session = SessionState.initialise(test_id=1)
+    marker = datetime(2024, 1, 1, 12, 0, 0)
+
+    cache.put(1, session, marker)
+    assert cache.get(1, datetime(2024, 1, 1, 12, 0, 1)) is None
+    # A stale lookup drops the entry; the caller falls back to the snapshot
+    assert cache.get(1, marker) is None
+
+    cache.put(1, session, marker)
+    assert cache.get(1, marker) is session
+    # Checked out until written back
+    assert cache.get(1, marker) is None
+
+
+def test_session_cache_lru_and_ttl_eviction():
+    cache = SessionCache(max_size=2, ttl_seconds=60)
+    for test_id in (1, 2, 3):
+        cache.put(test_id, SessionState.initialise(test_id=test_id), None)
+    assert cache.get(1, None) is None
+    assert cache.get(3, None) is not None
+
+    expired = SessionCache(max_size=2, ttl_seconds=-1)
+    expired.put(1, SessionState.initialise(test_id=1), None)
+    assert expired.get(1, None) is None
+
+
+def test_snapshot_of_another_bank_version_gets_its_remaining_items_rebuilt():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    old_pool = {1: CandidateItem(1, "ran", 0.0, 5.0), 2: CandidateItem(2, "ran", 0.5, 5.0)}
+    new_pool = {2: old_pool[2], 3: CandidateItem(3, "ran", -0.5, 5.0)}
+
+    test = Test(id=1, start_time=STARTED, status="in_progress")
+    session = SessionState.initialise(test_id=1, module_item_ids={"ran": [1, 2]})
+    session.modules["ran"].items_remaining.discard(2)
+    db.add_all([test, TestItemLog(test_id=1, item_id=2, module="ran")])
+    test_service.save_session_snapshot(db, test, session, bank_version=1)
+    db.commit()
+
+    # The session cached under bank version 1 is a miss for version 2
+    rebuilt = test_service.load_session_state(test, db, new_pool, bank_version=2)
+    assert rebuilt is not session
+    assert rebuilt.modules["ran"].items_remaining == [3]
+    assert test_service.load_session_state(test, db, old_pool, bank_version=1).modules["ran"].items_remaining == [1]
+    with pytest.raises(snapshot_codec.BankVersionMismatch):
+        SessionState.from_snapshot(test.session_blob, expected_bank_version=2)
@@ -0,0 +1,127 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.adaptive_testing_module import config, snapshot_codec
+from app.adaptive_testing_module.state import SessionState
+from app.simulations.item_bank import load_compiled_item_bank_from_csv
+from tests.conftest import run_session
+
+# Sub-second start time, to check timestamps round-trip exactly
+STARTED_PRECISELY = datetime(2024, 1, 1, 10, 0, 0, 123456)
+
+
+def _played_session(steps=4, cfg=None):
+    bank = load_compiled_item_bank_from_csv()
+    answers = [step % 2 == 0 for step in range(steps)]
+    return run_session(
+        bank, answers, cfg=cfg, test_id=7, started_at=STARTED_PRECISELY, step_seconds=7.0, rt_seconds=2.5
+    ).session
+
+
+def test_binary_snapshot_round_trips_losslessly():
+    session = _played_session()
+    session.tree_node = 12
+    session.tree_fingerprint = "0f" * 20
+    session.modules["ran"].last_started_at = datetime(2024, 1, 1, 10, 0, 3, 5)
+
+    blob = session.to_binary_snapshot(bank_version=3)
+    restored = SessionState.from_snapshot(blob)
+
+    assert restored.to_snapshot() == session.to_snapshot()
+    assert len(blob) < len(json.dumps(session.to_snapshot())) / 2.5
+    assert snapshot_codec.decode_session_with_version(blob)[1] == 3
+
+
+def test_modules_are_decoded_by_name(monkeypatch):
+    session = _played_session()
+    blob = session.to_binary_snapshot()
+
+    # A deploy that reorders the module list does not remap the records
+    monkeypatch.setattr(config, "MODULES", list(reversed(config.MODULES)))
+    restored = SessionState.from_snapshot(blob)
+
+    assert restored.to_snapshot() == session.to_snapshot()
+
+
+def test_binary_snapshot_keeps_log_posterior(monkeypatch):
+    monkeypatch.setattr(config, "LOG_SPACE_POSTERIOR", True)
+    session = _played_session(steps=2)
+
+    restored = SessionState.from_snapshot(session.to_binary_snapshot())
+
+    assert restored.to_snapshot() == session.to_snapshot()
+
+
+def test_float32_snapshot_is_close():
+    session = _played_session()
+
+    restored = SessionState.from_snapshot(session.to_binary_snapshot(float32=True))
+
+    assert restored.modules["ran"].theta_posterior == pytest.approx(
+        list(session.modules["ran"].theta_posterior), rel=1e-6
+    )
+
+
+def test_legacy_json_snapshot_still_loads():
+    session = _played_session()
+    snapshot = json.loads(json.dumps(session.to_snapshot()))
+    for module_id, stats in session.modules.items():
+        snapshot["modules"][module_id]["items_remaining"] = list(stats.items_remaining)
+    del snapshot["tree_node"]
+
+    restored = SessionState.from_snapshot(snapshot)
+
+    assert restored.to_snapshot() == session.to_snapshot()
+
+
+def test_decode_rejects_bad_input():
+    blob = _played_session().to_binary_snapshot(bank_version=2)
+
+    with pytest.raises(ValueError):
+        snapshot_codec.decode_session(b"{}")
+    with pytest.raises(ValueError):
+        snapshot_codec.decode_session(blob[:-20])
+    empty = SessionState.initialise(1, cfg=config.default_config().replace(JOINT_THETA_POSTERIOR=True))
+    empty.modules = {}
+    with pytest.raises(ValueError):
+        snapshot_codec.decode_session(empty.to_binary_snapshot())
+    with pytest.raises(ValueError):
+        snapshot_codec.decode_session(blob, expected_bank_version=3)
+    unknown_format = bytearray(blob)
+    unknown_format[3] = snapshot_codec.SNAPSHOT_FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        snapshot_codec.decode_session(bytes(unknown_format))
+
+
+def test_history_round_trips_and_legacy_json_snapshots_load_without_it():
+    session = _played_session()
+    assert session.modules["ran"].history
+    assert all(len(entry) == 4 for entry in session.modules["ran"].history)
+
+    for restored in (
+        SessionState.from_snapshot(session.to_binary_snapshot()),
+        SessionState.from_snapshot(json.loads(json.dumps(session.to_snapshot()))),
+    ):
+        assert restored.modules["ran"].history == session.modules["ran"].history
+
+    snapshot = session.to_snapshot()
+    for stats in snapshot["modules"].values():
+        del stats["history"]
+    assert SessionState.from_snapshot(snapshot).modules["ran"].history is None
+
+
+def test_joint_rt_posterior_round_trips():
+    session = _played_session(cfg=config.default_config().replace(RT_MODEL=True))
+    joint = session.modules["phonemic_awareness"].joint_posterior
+    assert joint.shape == (len(config.THETA_GRID), len(config.SPEED_GRID))
+
+    for restored in (
+        SessionState.from_snapshot(session.to_binary_snapshot()),
+        SessionState.from_snapshot(json.loads(json.dumps(session.to_snapshot()))),
+    ):
+        assert restored.to_snapshot() == session.to_snapshot()
+    assert SessionState.from_snapshot(
+        session.to_binary_snapshot(float32=True)
+    ).modules["phonemic_awareness"].joint_posterior.ravel().tolist() == pytest.approx(joint.ravel().tolist(), rel=1e-6)
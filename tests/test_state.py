@@ -0,0 +1,44 @@
+import pytest
+
+from app.adaptive_testing_module.state import RemainingItems, SessionState
+
+
+def test_remaining_items_set_semantics():
+    remaining = RemainingItems([12, 10, 11, 15])
+
+    assert list(remaining) == [10, 11, 12, 15]
+    assert 11 in remaining and 13 not in remaining and "x" not in remaining
+    remaining.remove(11)
+    remaining.discard(99)
+    assert len(remaining) == 3 and 11 not in remaining
+    with pytest.raises(ValueError):
+        remaining.remove(11)
+
+
+def test_remaining_items_snapshot_roundtrip_and_legacy_lists():
+    session = SessionState.initialise(
+        test_id=1, module_item_ids={"ran": list(range(100, 140))}
+    )
+    session.modules["ran"].items_remaining.remove(105)
+
+    snapshot = session.to_snapshot()
+    assert snapshot["modules"]["ran"]["items_remaining"]["base"] == 100
+
+    restored = SessionState.from_snapshot(snapshot)
+    assert restored.modules["ran"].items_remaining == session.modules["ran"].items_remaining
+    assert not restored.modules["object_recognition"].items_remaining
+
+    snapshot["modules"]["ran"]["items_remaining"] = [100, 101, 107]
+    legacy = SessionState.from_snapshot(snapshot)
+    assert list(legacy.modules["ran"].items_remaining) == [100, 101, 107]
+
+
+@pytest.mark.parametrize("ids", [[], [5], [3, 4, 9, 17], list(range(100, 140, 3))])
+def test_remaining_items_bitmap_round_trip(ids):
+    remaining = RemainingItems(ids)
+    base, bitmap = remaining.to_bitmap()
+
+    restored = RemainingItems.from_bitmap(base, bitmap)
+
+    assert restored == ids
+    assert len(restored) == len(ids)